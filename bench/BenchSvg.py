@@ -0,0 +1,269 @@
+import sys
+sys.path.append('./vector_interpolation')
+
+import Svg
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+
+# Generated transform attribute by transform kind
+transforms = {
+    'translate': lambda rand: f'translate({rand.uniform(0, 1000)}, {rand.uniform(0, 1000)})',
+    'rotate': lambda rand: f'rotate({rand.uniform(-180, 180)}, {rand.uniform(0, 1000)}, {rand.uniform(0, 1000)})',
+    'scale': lambda rand: f'translate({rand.uniform(0, 1000)}, {rand.uniform(0, 1000)}) scale({rand.uniform(0.5, 2)})',
+    'matrix': lambda rand: 'matrix(%g %g %g %g %g %g)' % (
+        rand.uniform(0.5, 2), rand.uniform(-1, 1), rand.uniform(-1, 1), rand.uniform(0.5, 2), rand.uniform(0, 1000), rand.uniform(0, 1000)
+    ),
+}
+
+
+def generateShapes(shapes, segments, rand, transformMix = ('translate',), start = 0):
+    """
+    Generate Krita exported like <path> elements strings
+
+    Parameters
+    ----------
+    shapes : int
+        Number of <path> shapes
+    segments : int
+        Number of cubic segments by shape
+    rand : random.Random
+        Random generator
+    transformMix : str[]
+        Transform kinds, see transforms, used in turn by shapes
+    start : int
+        First shape id number
+    """
+    paths = []
+    for i in range(shapes):
+        d = ['M%g %g' % (rand.uniform(0, 100), rand.uniform(0, 100))]
+        for _ in range(segments):
+            d.append('C%g %g %g %g %g %g' % tuple(rand.uniform(-100, 100) for _ in range(6)))
+        d.append('Z')
+
+        paths.append(
+            f'<path id="shape{start + i}" transform="{transforms[transformMix[i % len(transformMix)]](rand)}" fill="none" '
+            f'stroke="#0005ff" stroke-width="0.24" stroke-linecap="square" stroke-linejoin="bevel" '
+            f'd="{"".join(d)}" sodipodi:nodetypes="c{"s" * segments}"/>'
+        )
+
+    return paths
+
+
+def generateLayer(shapes, segments, seed = 0, transformMix = ('translate',), keyframes = 1):
+    """
+    Generate a Krita exported vector layer like svg string
+
+    Parameters
+    ----------
+    shapes : int
+        Number of <path> shapes by keyframe
+    segments : int
+        Number of cubic segments by shape
+    seed : int
+        Random seed
+    transformMix : str[]
+        Transform kinds, see transforms, used in turn by shapes
+    keyframes : int
+        Number of keyframes: shape i of each keyframe has the same
+        segments count and transform kind
+    """
+    rand = random.Random(seed)
+
+    s = '<?xml version="1.0" standalone="no"?>\n'
+    s += '<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 20010904//EN" "http://www.w3.org/TR/2001/REC-SVG-20010904/DTD/svg10.dtd">\n'
+    s += '<!-- Created using Krita: https://krita.org -->\n'
+    s += '<svg xmlns="http://www.w3.org/2000/svg"\n'
+    s += '    xmlns:xlink="http://www.w3.org/1999/xlink"\n'
+    s += '    xmlns:krita="http://krita.org/namespaces/svg/krita"\n'
+    s += '    xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd"\n'
+    s += '    width="1200pt"\n    height="1200pt"\n    viewBox="0 0 1200 1200">\n<defs/>\n'
+
+    paths = []
+    for key in range(keyframes):
+        paths += generateShapes(shapes, segments, rand, transformMix, key * shapes)
+    s += ''.join(paths) + '\n</svg>\n'
+
+    return s
+
+
+def bench(f, repeat):
+    """Return f() best execution time over repeat runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        t = time.perf_counter() - start
+        best = t if best is None or t < best else best
+
+    return best
+
+
+def peakMemory(f):
+    """Return f() traced memory peak in bytes"""
+    tracemalloc.start()
+    try:
+        f()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchParse(shapes, segments, repeat = 3):
+    """
+    Benchmark layer parsing
+
+    Parameters
+    ----------
+    shapes : int
+        Number of <path> shapes
+    segments : int
+        Number of cubic segments by shape
+    repeat : int
+        Number of runs, best one is kept
+    """
+    svg = generateLayer(shapes, segments)
+
+    def parse():
+        for child in Svg.Svg(svg).children:
+            pass
+
+    t = bench(parse, repeat)
+    print(f'parse: {shapes} shapes x {segments} segments, {len(svg) / 1e6:.2f} MB: '
+          f'{t * 1000:.1f} ms, {shapes * segments / t:,.0f} segments/s')
+
+    return t
+
+
+def benchPhases(shapes, segments, steps, transformMix = ('translate',), engine = None, repeat = 3, memory = True):
+    """
+    Benchmark each interpolation phase separately: parse, clone,
+    interpolate and toString, on a layer of two keyframes of shapes.
+
+    Return the phase -> {time, throughput, unit, memory} results
+    object. Throughput is in segments by second for parse and clone,
+    in segment-frames (segments x steps) by second for interpolate and
+    toString, as given by unit.
+
+    Parameters
+    ----------
+    shapes : int
+        Number of <path> shapes by keyframe
+    segments : int
+        Number of cubic segments by shape
+    steps : int
+        Number of interpolations
+    transformMix : str[]
+        Transform kinds, see transforms, used in turn by shapes
+    engine : None|str
+        Interpolation engine
+    repeat : int
+        Number of runs, best one is kept
+    memory : bool
+        Also measure each phase memory peak, in one more run
+    """
+    s = generateLayer(shapes, segments, transformMix = transformMix, keyframes = 2)
+    pairs = [(i + 1, i + 1 + shapes) for i in range(shapes)]
+
+    svg = Svg.Svg(s)
+    svg.children[:]
+    result = svg.interpolateMany(pairs, steps, engine = engine)
+
+    def parse():
+        Svg.Svg(s).children[:]
+
+    def clone():
+        svg.clone()
+        for child in svg.children:
+            child.clone()
+
+    def interpolate():
+        svg.interpolateMany(pairs, steps, engine = engine)
+
+    def toString():
+        result.toString()
+
+    phases = {
+        'parse': (parse, 2 * shapes * segments, 'segments/s'),
+        'clone': (clone, 2 * shapes * segments, 'segments/s'),
+        'interpolate': (interpolate, shapes * segments * steps, 'segment-frames/s'),
+        'toString': (toString, shapes * segments * steps, 'segment-frames/s'),
+    }
+
+    results = {}
+    for name, (f, count, unit) in phases.items():
+        t = bench(f, repeat)
+        results[name] = {'time': t, 'throughput': count / t, 'unit': unit}
+        if memory:
+            results[name]['memory'] = peakMemory(f)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Get the messages of the phases slower than their baseline time by
+    more than threshold
+
+    Parameters
+    ----------
+    results : object
+        Phase -> results object, as returned by benchPhases()
+    baseline : object
+        Baseline phase -> results object
+    threshold : float
+        Allowed slowdown ratio, as 0.2 for 20%
+    """
+    regressions = []
+    for name, result in results.items():
+        if name in baseline and result['time'] > baseline[name]['time'] * (1 + threshold):
+            regressions.append(
+                f'{name}: {result["time"] * 1000:.1f} ms, '
+                f'{result["time"] / baseline[name]["time"] - 1:+.0%} from baseline {baseline[name]["time"] * 1000:.1f} ms'
+            )
+
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Vector interpolation benchmarks')
+    parser.add_argument('--shapes', type=int, default=200, help='number of shapes in the generated layer')
+    parser.add_argument('--segments', type=int, default=500, help='number of segments by shape')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs by benchmark')
+    parser.add_argument('--steps', type=int, default=10, help='number of interpolations')
+    parser.add_argument('--transforms', default='translate', help='comma separated transform kinds mix: ' + ', '.join(transforms))
+    parser.add_argument('--engine', choices=['python', 'numpy'], default=None, help='interpolation engine')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='do not measure memory peaks')
+    parser.add_argument('--save-baseline', metavar='FILE', help='store results as baseline json file')
+    parser.add_argument('--baseline', metavar='FILE', help='fail if a phase is slower than this baseline json file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown ratio from baseline (default: 0.2)')
+    args = parser.parse_args()
+
+    transformMix = args.transforms.split(',')
+    for kind in transformMix:
+        if kind not in transforms:
+            parser.error(f'unknown transform kind "{kind}"')
+
+    benchParse(args.shapes, args.segments, args.repeat)
+
+    results = benchPhases(args.shapes, args.segments, args.steps, transformMix, args.engine, args.repeat, args.memory)
+    print(f'phases: {args.shapes} shapes x {args.segments} segments x {args.steps} steps, '
+          f'{",".join(transformMix)} transforms, {Svg.Engine.get(args.engine).name} engine')
+    for name, result in results.items():
+        memory = f', {result["memory"] / 1e6:.1f} MB peak' if 'memory' in result else ''
+        print(f'  {name}: {result["time"] * 1000:.1f} ms, {result["throughput"]:,.0f} {result["unit"]}{memory}')
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f'slower: {regression}')
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,74 @@
+import sys
+sys.path.append('.')
+
+from vector_interpolation.__main__ import main
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+
+class TestCli(unittest.TestCase):
+    asset = os.path.dirname(os.path.realpath(__file__)) + '/assets/test_two_path.svg'
+
+    def test_ids(self):
+        """Test interpolating two nodes of one file into standard output"""
+        with mock.patch('sys.stdout', new_callable = io.StringIO) as stdout:
+            self.assertEqual(main([self.asset, '--ids', 'shape0', 'shape1', '--steps', '2', '--precision', '2']), 0, 'Command should succeed')
+
+        self.assertEqual(stdout.getvalue().count('<path '), 2, 'Output should have one path by step')
+
+    def test_frames(self):
+        """Test writing one file by step from two keyframe files"""
+        with tempfile.TemporaryDirectory() as directory:
+            pattern = os.path.join(directory, 'frame-{:02d}.svg')
+            self.assertEqual(main([self.asset, self.asset, '-n', '3', '-o', pattern]), 0, 'Command should succeed')
+
+            self.assertEqual(sorted(os.listdir(directory)), ['frame-01.svg', 'frame-02.svg', 'frame-03.svg'], 'One file by step should be written')
+            with open(pattern.format(2)) as f:
+                self.assertEqual(f.read().count('<path '), 2, 'Frame should have one path by file path')
+
+    def test_reordered(self):
+        """Test pairing the shapes of reordered files by id, definitions being written once"""
+        reordered = self.asset.replace('.svg', '_reordered.svg')
+        with mock.patch('sys.stdout', new_callable = io.StringIO) as stdout:
+            self.assertEqual(main([self.asset, reordered, '-n', '2', '-p', '3']), 0, 'Command should succeed')
+
+        output = stdout.getvalue()
+        self.assertEqual(output.count('<defs'), 1, 'Definitions should be written once')
+        self.assertEqual(output.count('transform="translate(109.152, 46.062)"'), 2, 'First shape should keep its transform')
+        self.assertEqual(output.count('transform="translate(142.185, 276.239)"'), 2, 'Second shape should keep its transform')
+
+    def test_workers(self):
+        """Test worker processes output is the serial one"""
+        reordered = self.asset.replace('.svg', '_reordered.svg')
+        outputs = []
+        for workers in ['1', '2']:
+            with mock.patch('sys.stdout', new_callable = io.StringIO) as stdout:
+                self.assertEqual(main([self.asset, reordered, '-n', '3', '-w', workers]), 0, 'Command should succeed')
+            outputs.append(stdout.getvalue())
+        self.assertEqual(outputs[1], outputs[0], 'Worker processes output should be the serial one')
+
+        with tempfile.TemporaryDirectory() as directory:
+            pattern = os.path.join(directory, 'frame-{:02d}.svg')
+            self.assertEqual(main([self.asset, '--ids', 'shape0', 'shape1', 'shape0', '-n', '2', '-w', '3', '-o', pattern]), 0, 'Command should succeed')
+
+            self.assertEqual(len(os.listdir(directory)), 4, 'One file by keyframes step should be written')
+
+    def test_errors(self):
+        """Test command errors"""
+        with mock.patch('sys.stderr', new_callable = io.StringIO) as stderr:
+            self.assertEqual(main([self.asset, '--ids', 'shape0', 'missing']), 1, 'Unknown id should fail')
+            self.assertEqual(main([self.asset]), 1, 'One file without ids should fail')
+
+        self.assertIn('Cannot find node "missing"', stderr.getvalue(), 'Error should be reported')
+
+        for argv in [['-n', '0'], ['-n', '-2'], ['--chunk', '0'], ['-o', '{}{}'], ['-o', '{x}.svg'], ['-o', 'frame{.svg']]:
+            with mock.patch('sys.stderr', new_callable = io.StringIO) as stderr, self.assertRaises(SystemExit, msg = f'{argv} should be refused'):
+                main([self.asset, self.asset] + argv)
+            self.assertIn('error: argument', stderr.getvalue(), f'{argv} error should be reported')
+
+
+if __name__ == '__main__':
+    unittest.main()
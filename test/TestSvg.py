@@ -2,8 +2,10 @@ import sys
 sys.path.append('./vector_interpolation')
 
 import Svg
+import io
 import os
 import unittest
+from unittest import mock
 
 
 class TestSvg(unittest.TestCase):
@@ -135,12 +137,17 @@ class TestSvg(unittest.TestCase):
 
         err = False
         try:
-            parser.interpolate(1, 2, 2, debug= True)
+            parser.interpolate(1, 2, 2, debug= True, resample= False)
         except RuntimeError as e:
             err = e
         self.assertEqual(type(err), RuntimeError, 'Runtime error should be thrown')
         self.assertRegex(str(err), r'^Nodes are not compatible for interpolation', 'Runtime error messager incorrect')
 
+        # Different command count paths are resampled by default
+        intp = parser.interpolate(1, 2, 2, debug= True)
+        self.assertEqual(len(intp.children), 2, 'Resampled interpolation should have 2 children')
+        self.assertEqual(bytes(intp.children[0].data.operations), b'MCCCCZ', 'Resampled interpolation commands incorrect')
+
         # Test different command operation interpolation error.
         f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_incompatible_path_interpolation.operation.svg', 'r')
         svg = f.read()
@@ -218,6 +225,707 @@ class TestSvg(unittest.TestCase):
         self.assertEqual(intp.children[0].transform[0].operation, 'matrix', 'Interpolation transform should be a matrix')
         self.assertEqual(intp.children[0].transform[0].values, [1.1636557947061799, 0.0, 0.0, 0.993835549478444, 841.2003324608875, 585.2269691975885], 'Interpolation transform matrix values incorrect')
 
+    def test_engines(self):
+        """Test python and numpy engines generate the same interpolation"""
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_two_path.svg', 'r')
+        svg = f.read()
+        f.close()
+        parser = Svg.Svg(svg)
+
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_two_path.intp.svg', 'r')
+        expected = f.read()
+        f.close()
+
+        self.assertEqual(parser.interpolate(1, 2, 5, engine='python').toString(), expected, 'Python engine interpolation incorrect')
+        if not Svg.numpy:
+            self.skipTest('numpy is not installed')
+        self.assertEqual(parser.interpolate(1, 2, 5, engine='numpy').toString(), expected, 'Numpy engine interpolation incorrect')
+
+        matrix = Svg.Engine.get('numpy').lerp([0.0, 10.0], [10.0, 20.0], [0.25, 0.5])
+        self.assertEqual(matrix.shape, (2, 2), 'Numpy engine matrix should be (steps, values)')
+        self.assertEqual(Svg.Engine.get('numpy').rows(matrix), Svg.Engine.get('python').lerp([0.0, 10.0], [10.0, 20.0], [0.25, 0.5]), 'Engines matrix incorrect')
+
+    def test_path_data(self):
+        """Test compact path geometry"""
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_two_path.svg', 'r')
+        svg = f.read()
+        f.close()
+        parser = Svg.Svg(svg)
+        path = parser.children[1]
+
+        self.assertEqual(bytes(path.data.operations), b'MCCCCZ', 'Path operations incorrect')
+        self.assertEqual(list(path.data.offsets), [0, 2, 8, 14, 20, 26, 26], 'Path commands offsets incorrect')
+        self.assertEqual(len(path.data.values), 26, 'Path should have 26 values')
+        self.assertEqual(path.commands[-1].operation, 'Z', 'Path last command should be Z')
+        self.assertFalse(hasattr(path.commands[0], '__dict__'), 'Path command view should use slots')
+
+        # Interpolated paths share the commands and own their values only
+        intp = parser.interpolate(1, 2, 2)
+        for child in intp.children:
+            self.assertIs(child.data.operations, path.data.operations, 'Interpolated path should share operations')
+            self.assertIs(child.data.offsets, path.data.offsets, 'Interpolated path should share offsets')
+            self.assertEqual(child.data.values.typecode, 'd', 'Interpolated path values should be a double array')
+
+    def test_path_data_parsing(self):
+        """Test path d attribute tokenizer"""
+        tests = {
+            'M28.6083 0.0181163C6.62254 0.580711 -0.674592 14.0765 0.0482714 27.8581Z': 'M 28.6083 0.0181163C 6.62254 0.580711 -0.674592 14.0765 0.0482714 27.8581Z',
+            'm1,2 l3 4 h5 v6 z': 'm 1.0 2.0l 3.0 4.0h 5.0v 6.0z',
+            'M1e-5 2E3L-1.5e+2 .5': 'M 1e-05 2000.0L -150.0 0.5',
+            'M0.5.5-1-2': 'M 0.5 0.5L -1.0 -2.0',
+            'M0 0a10 10 0 01.5 2': 'M 0.0 0.0a 10.0 10.0 0.0 0.0 1.0 0.5 2.0',
+            'M0 0L1 2 3 4': 'M 0.0 0.0L 1.0 2.0L 3.0 4.0',
+            'M0 0L1 2L3': 'M 0.0 0.0L 1.0 2.0',
+            'M 1 2 L inf 3': 'M 1.0 2.0',
+            'M 1 2 L 3 infinity': 'M 1.0 2.0',
+            'M nan 1': '',
+        }
+        for d, expected in tests.items():
+            self.assertEqual(Svg.Attribute.PathData(d).toString(), expected, f'Path "{d}" parsing incorrect')
+
+        data = Svg.Attribute.PathData('M0 0L1 2 3 4')
+        self.assertEqual(bytes(data.operations), b'MLL', 'Implicit commands should be distinct commands')
+
+    def test_clone(self):
+        """Test structural node cloning"""
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_two_path.svg', 'r')
+        svg = f.read()
+        f.close()
+        parser = Svg.Svg(svg)
+        path = parser.children[1]
+
+        clone = path.clone()
+        self.assertEqual(type(clone), Svg.Node.Path, 'Clone should be a Svg.Node.Path')
+        self.assertIsNot(clone.el, path.el, 'Clone should have its own element')
+        self.assertEqual(clone.el.attrib, path.el.attrib, 'Clone element attributes incorrect')
+        self.assertIs(clone.data, path.data, 'Clone should share the path geometry')
+        self.assertEqual(clone.toString(), path.toString(), 'Clone string conversion incorrect')
+
+        clone.el.attrib['id'] = 'clone'
+        clone.transform[0].values[0] = 0.0
+        self.assertEqual(path.el.attrib['id'], 'shape0', 'Clone attributes should not change source attributes')
+        self.assertEqual(path.transform[0].values[0], 109.151727300548, 'Clone transform should not change source transform')
+
+        # Interpolation does no XML or regex parsing once nodes are created
+        parser.children[2]
+        with mock.patch.object(Svg.ET, 'fromstring', side_effect=AssertionError('XML parsed')), \
+             mock.patch.object(Svg.re, 'findall', side_effect=AssertionError('Regex run')):
+            parser.interpolate(1, 2, 5)
+
+    def test_serializer(self):
+        """Test streaming serialization"""
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_two_path.svg', 'r')
+        svg = f.read()
+        f.close()
+        parser = Svg.Svg(svg)
+        intp = parser.interpolate(1, 2, 5)
+
+        # Write into a file object
+        out = io.StringIO()
+        intp.write(out)
+        self.assertEqual(out.getvalue(), intp.toString(), 'Written document should be the string conversion')
+
+        # Fixed precision numbers
+        path = parser.children[1]
+        self.assertEqual(
+            path.toString(parser.getXmlns(), precision=2),
+            '<path transform="translate(109.15, 46.06)" fill="none" stroke="#ff0000" stroke-width="0.24" stroke-linecap="square" stroke-linejoin="bevel" d="M 28.61 0.02C 6.62 0.58 -0.67 14.08 0.05 27.86C 0.77 41.65 12.53 59.97 32.93 59.54C 52.54 59.12 62.00 47.92 61.97 32.18C 61.94 18.49 55.57 -0.67 28.61 0.02Z" sodipodi:nodetypes="cssss" />',
+            'Fixed precision path toString() incorrect'
+        )
+
+        # Element content, namespaced attributes and escaping
+        parser = Svg.Svg('<svg xmlns="http://www.w3.org/2000/svg" xmlns:krita="http://krita.org/namespaces/svg/krita" krita:version="5"><defs><linearGradient id="a&amp;b"><stop offset="0" /></linearGradient></defs><text>a &lt; b</text></svg>')
+        self.assertEqual(
+            parser.toString(),
+            '<svg xmlns="http://www.w3.org/2000/svg" xmlns:krita="http://krita.org/namespaces/svg/krita" krita:version="5">\n\t<defs><linearGradient id="a&amp;b"><stop offset="0" /></linearGradient></defs>\n\t<text>a &lt; b</text>\n</svg>',
+            'Document with element content string conversion incorrect'
+        )
+
+    def test_from_shapes(self):
+        """Test document creation from the selected shapes only"""
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_two_path.svg', 'r')
+        svg = f.read()
+        f.close()
+        parser = Svg.Svg(svg)
+        xmlns = parser.getXmlns()
+        shapes = [parser.children[1].toString(xmlns), parser.children[2].toString(xmlns)]
+        shapes[0] = shapes[0].replace('<path ', '<path id="shape0" ')
+
+        selection = Svg.Svg.fromShapes(shapes, {'width': '297.6pt', 'height': '420.96pt', 'viewBox': '0 0 297.6 420.96'})
+        self.assertEqual(len(selection.children), 2, 'Selection document should only have the 2 shapes')
+        self.assertEqual(type(selection.children[0]), Svg.Node.Path, 'Selection first children type should be Svg.Node.Path')
+
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_two_path.intp.svg', 'r')
+        expected = f.read()
+        f.close()
+        self.assertEqual(selection.interpolate('shape0', 1, 5).toString(), expected, 'Selection interpolation incorrect')
+
+        err = False
+        try:
+            Svg.Svg.fromShapes(['<path unknown:attr="1" />'])
+        except RuntimeError as e:
+            err = e
+        self.assertEqual(type(err), RuntimeError, 'Runtime error should be thrown on invalid shapes')
+
+    def test_lazy_children(self):
+        """Test children nodes are created on first access"""
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_two_path.svg', 'r')
+        svg = f.read()
+        f.close()
+        parser = Svg.Svg(svg)
+
+        self.assertEqual(len(parser.children), 3, 'Svg should have 3 children')
+        self.assertFalse(any(parser.children.loaded(i) for i in range(3)), 'Svg children should not be created on parsing')
+
+        path = parser.children[1]
+        self.assertTrue(parser.children.loaded(1), 'Accessed child should be created')
+        self.assertFalse(parser.children.loaded(2), 'Not accessed child should not be created')
+        self.assertIs(parser.children[1], path, 'Created child should be cached')
+
+        nodes = parser.iterchildren()
+        self.assertEqual(type(next(nodes)), Svg.Node.Node, 'First generated child should be a Svg.Node.Node')
+        self.assertFalse(parser.children.loaded(2), 'Not generated child should not be created')
+        self.assertEqual([type(n) for n in nodes], [Svg.Node.Path, Svg.Node.Path], 'Generated children types incorrect')
+        self.assertEqual([type(n) for n in parser.children[1:]], [Svg.Node.Path, Svg.Node.Path], 'Children slice types incorrect')
+
+    def test_children_index(self):
+        """Test children lookup by id, position and node"""
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_face.svg', 'r')
+        svg = f.read()
+        f.close()
+        parser = Svg.Svg(svg)
+
+        node = parser.getNode('shape3')
+        self.assertEqual(node.el.attrib['id'], 'shape3', 'Node found by id incorrect')
+        self.assertFalse(parser.children.loaded(2), 'Finding a node by id should not create other nodes')
+        self.assertIs(parser.getNode(parser.children.index(node)), node, 'Node position incorrect')
+        self.assertIs(parser.getNode(node), node, 'Node object lookup should return the node')
+        self.assertIsNone(parser.children.find('unknown'), 'Unknown id should not be found')
+
+        err = False
+        try:
+            parser.interpolate('shape2', 'unknown', 1)
+        except RuntimeError as e:
+            err = e
+        self.assertEqual(type(err), RuntimeError, 'Runtime error should be thrown for unknown id')
+
+        # Appended nodes are indexed, first node of an id is kept
+        parser.interpolate('shape2', 'shape3', 1, False)
+        self.assertEqual(parser.children.index(parser.children[-1]), len(parser.children) - 1, 'Appended node position incorrect')
+        self.assertIs(parser.getNode('shape2'), parser.children[4], 'Id should reference the first node')
+
+    def test_interpolate_many(self):
+        """Test many node pairs interpolation"""
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_face.svg', 'r')
+        svg = f.read()
+        f.close()
+        parser = Svg.Svg(svg)
+        pairs = [('shape0', 'shape1'), ('shape2', 'shape3'), ('shape31', 'shape08')]
+
+        # Combined document: the same as each pair interpolation
+        intp = parser.interpolateMany(pairs, 3)
+        self.assertEqual(len(intp.children), 9, 'Interpolation should have 3 steps by pair')
+        for i, (node1, node2) in enumerate(pairs):
+            single = parser.interpolate(node1, node2, 3)
+            for j in range(3):
+                self.assertEqual(intp.children[i * 3 + j].toString(), single.children[j].toString(), f'Pair {i} step {j} incorrect')
+
+        # One document by step
+        frames = parser.interpolateMany(pairs, 3, split=True)
+        self.assertEqual(len(frames), 3, 'Split interpolation should have one document by step')
+        for j, frame in enumerate(frames):
+            self.assertEqual(len(frame.children), 3, f'Step {j} document should have one node by pair')
+            for i in range(3):
+                self.assertEqual(frame.children[i].toString(), intp.children[i * 3 + j].toString(), f'Step {j} pair {i} incorrect')
+
+        # Pairs are all checked before interpolation
+        err = False
+        try:
+            parser.interpolateMany([('shape0', 'shape1'), (0, 1)], 3, False)
+        except RuntimeError as e:
+            err = e
+        self.assertEqual(type(err), RuntimeError, 'Runtime error should be thrown')
+        self.assertEqual(len(parser.children), 8, 'No node should be added on error')
+
+    def test_frames(self):
+        """Test frame sequence generation"""
+        f = open(os.path.dirname(os.path.realpath(__file__)) + '/assets/test_two_path.svg', 'r')
+        svg = f.read()
+        f.close()
+        parser = Svg.Svg(svg)
+        intp = parser.interpolate(1, 2, 5)
+
+        frames = parser.frames([(1, 2)], 5, chunk=2)
+        self.assertEqual(type(frames).__name__, 'generator', 'Frames should be generated')
+        frames = list(frames)
+        self.assertEqual(len(frames), 5, 'There should be one frame by step')
+        for i, frame in enumerate(frames):
+            self.assertEqual(len(frame.children), 1, f'Frame {i} should have one node')
+            self.assertEqual(frame.children[0].toString(), intp.children[i].toString(), f'Frame {i} node incorrect')
+            self.assertIs(frame.el, frames[0].el, 'Frames should share the document shell')
+        self.assertEqual(frames[0].toString().split('>')[0], intp.toString().split('>')[0], 'Frame document shell incorrect')
+
+        nodes, slices, start, end, columns = parser.interpolationPairs([(1, 2)])
+        ps = Svg.Timing.factors(5)[2:4]
+        prepared = [frame.children[0].toString() for frame in parser.preparedFrames(nodes, slices, start, end, columns, ps)]
+        self.assertEqual(prepared, [intp.children[i].toString() for i in [2, 3]], 'Prepared frames range incorrect')
+
+    def test_cubic_conversion(self):
+        """Test path conversion into cubic Bézier curves"""
+        data = Svg.Attribute.PathData('M0 0L30 0h30v30Q60 60 30 60T0 60c0-10 0-20 0-30s0-20 0-30z')
+        cubic = data.cubic()
+        self.assertEqual(bytes(cubic.operations), b'MCCCCCCCZ', 'Cubic path commands incorrect')
+        self.assertEqual(list(cubic.values[2:8]), [10.0, 0.0, 20.0, 0.0, 30.0, 0.0], 'Line conversion incorrect')
+        self.assertEqual(list(cubic.values[20:26]), [60.0, 50.0, 50.0, 60.0, 30.0, 60.0], 'Quadratic curve conversion incorrect')
+        self.assertEqual(list(cubic.values[26:32]), [10.0, 60.0, 0.0, 60.0, 0.0, 60.0], 'Smooth quadratic curve conversion incorrect')
+        self.assertEqual(list(cubic.values[32:38]), [0.0, 50.0, 0.0, 40.0, 0.0, 30.0], 'Relative curve conversion incorrect')
+        self.assertEqual(list(cubic.values[38:44]), [0.0, 20.0, 0.0, 10.0, 0.0, 0.0], 'Smooth curve conversion incorrect')
+        self.assertIs(cubic.cubic(), cubic, 'Cubic path conversion should return the path')
+
+        # Half circle arc
+        arc = Svg.Attribute.PathData('M0 0A10 10 0 0 1 20 0').cubic()
+        self.assertEqual(bytes(arc.operations), b'MCC', 'Half circle should be 2 curves')
+        self.assertAlmostEqual(arc.values[6], 10.0, msg='Arc middle point x incorrect')
+        self.assertAlmostEqual(arc.values[7], -10.0, msg='Arc middle point y incorrect')
+        self.assertEqual(list(arc.values[-2:]), [20.0, 0.0], 'Arc end point incorrect')
+
+    def test_resampling(self):
+        """Test paths resampling to the same curve count"""
+        for engine in ['python', 'numpy']:
+            if engine == 'numpy' and not Svg.numpy:
+                continue
+            engine = Svg.Engine.get(engine)
+
+            # Curves split by length
+            curves = [0, 0] + [1, 0, 2, 0, 3, 0] + [3, 3, 3, 6, 3, 9]
+            self.assertEqual(list(engine.distribute([1.0, 3.0], 6)), [2, 4], f'{engine.name} pieces distribution incorrect')
+            self.assertEqual(list(engine.distribute([0.0, 0.0], 3)), [2, 1], f'{engine.name} zero length distribution incorrect')
+            lengths = engine.curveLengths(curves)
+            self.assertAlmostEqual(lengths[0], 3.0, msg=f'{engine.name} curve length incorrect')
+            self.assertAlmostEqual(lengths[1], 9.0, msg=f'{engine.name} curve length incorrect')
+
+            split = engine.splitCurves(curves, [1, 3])
+            self.assertEqual(len(split), 26, f'{engine.name} split curves count incorrect')
+            for a, b in zip(split, [0, 0, 1, 0, 2, 0, 3, 0, 3, 1, 3, 2, 3, 3, 3, 4, 3, 5, 3, 6, 3, 7, 3, 8, 3, 9]):
+                self.assertAlmostEqual(a, b, msg=f'{engine.name} split curves incorrect')
+
+            data1, data2 = Svg.Attribute.PathData.resampled(
+                Svg.Attribute.PathData('M0 0L3 0L3 9Z').cubic(),
+                Svg.Attribute.PathData('M0 0C1 1 2 2 3 3C4 4 5 5 6 6C7 7 8 8 9 9C1 1 1 1 1 1C0 0 0 0 0 0Z').cubic(),
+                engine
+            )
+            self.assertEqual(bytes(data1.operations), bytes(data2.operations), f'{engine.name} resampled paths commands should be the same')
+            self.assertEqual(bytes(data1.operations), b'MCCCCCZ', f'{engine.name} resampled paths commands incorrect')
+
+    def test_alignment(self):
+        """Test closed paths start point and direction alignment"""
+        square = Svg.Attribute.PathData('M0 0L10 0L10 10L0 10Z').cubic()
+        for engine in ['python', 'numpy']:
+            if engine == 'numpy' and not Svg.numpy:
+                continue
+            engine = Svg.Engine.get(engine)
+
+            points1 = [float(v) for v in range(12)]
+            points2 = [float(v * v % 7) for v in range(12)]
+            for k, c in enumerate(engine.correlation(points1, points2)):
+                expected = sum(points1[i] * points2[(i + 2 * k) % 12] for i in range(12))
+                self.assertAlmostEqual(c, expected, msg=f'{engine.name} correlation incorrect')
+
+            rotated = Svg.Attribute.PathData('M10 10L0 10L0 0L10 0Z').cubic()
+            self.assertEqual(list(rotated.aligned(square, engine).values), list(square.values), f'{engine.name} rotated square alignment incorrect')
+
+            reversed = Svg.Attribute.PathData('M10 10L10 0L0 0L0 10Z').cubic()
+            for a, b in zip(reversed.aligned(square, engine).values, square.values):
+                self.assertAlmostEqual(a, b, msg=f'{engine.name} reversed square alignment incorrect')
+
+            self.assertIs(square.aligned(square, engine), square, f'{engine.name} aligned path should be returned')
+
+        # Alignment option
+        svg = Svg.Svg('<svg xmlns="http://www.w3.org/2000/svg"><path id="a" d="M0 0L10 0L10 10L0 10Z"/><path id="b" d="M10 10L0 10L0 0L10 0Z"/></svg>')
+        path1, path2 = svg.children[0].prepare(svg.children[1])
+        self.assertIs(path2, svg.children[1], 'Paths should not be aligned by default')
+        path1, path2 = svg.children[0].prepare(svg.children[1], align = True)
+        self.assertEqual(list(path2.data.values), list(square.values), 'Aligned path incorrect')
+        self.assertEqual(bytes(path1.data.operations), bytes(path2.data.operations), 'Aligned paths commands should be the same')
+
+    def test_subpath_matching(self):
+        """Test compound paths subpaths matching"""
+        for engine in ['python', 'numpy']:
+            if engine == 'numpy' and not Svg.numpy:
+                continue
+            engine = Svg.Engine.get(engine)
+
+            costs = [[4, 1, 3], [2, 0, 5], [3, 2, 2]]
+            self.assertEqual(engine.assignment(costs), [1, 0, 2], f'{engine.name} assignment incorrect')
+            self.assertEqual(engine.assignment([[3, 1, 2], [1, 5, 4]]), [1, 0], f'{engine.name} rectangular assignment incorrect')
+
+            # Holes in reverse order, one more hole in the second path
+            data1, data2 = Svg.Attribute.PathData.matched(
+                Svg.Attribute.PathData('M0 0L100 0L100 100L0 100ZM10 10L20 10L20 20ZM80 80L90 80L90 90Z').cubic(),
+                Svg.Attribute.PathData('M82 82L92 82L92 92ZM12 12L22 12L22 22ZM1 1L101 1L101 101L1 101ZM50 50L51 50L51 51Z').cubic(),
+                engine
+            )
+            self.assertEqual([len(data1.subpaths()), len(data2.subpaths())], [4, 4], f'{engine.name} matched subpaths count incorrect')
+            self.assertEqual(list(data2.values[:2]), [1.0, 1.0], f'{engine.name} outline match incorrect')
+            self.assertEqual(list(data2.values[26:28]), [12.0, 12.0], f'{engine.name} first hole match incorrect')
+            self.assertEqual(list(data2.values[46:48]), [82.0, 82.0], f'{engine.name} second hole match incorrect')
+            self.assertEqual(bytes(data1.operations[-2:]), b'MZ', f'{engine.name} unmatched subpath should be collapsed')
+            self.assertAlmostEqual(data1.values[-2], 50.6, msg=f'{engine.name} collapsed subpath should be on mean point')
+            self.assertAlmostEqual(data1.values[-1], 50.3, msg=f'{engine.name} collapsed subpath should be on mean point')
+
+        svg = Svg.Svg('<svg xmlns="http://www.w3.org/2000/svg"><path id="a" d="M0 0L10 0L10 10ZM20 0L30 0L30 10Z"/><path id="b" d="M20 0L30 0L30 10ZM0 0L10 0L10 10L0 10Z"/></svg>')
+        intp = svg.interpolate(0, 1, 1)
+        self.assertEqual(bytes(intp.children[0].data.operations), b'MCCCCZMCCCZ', 'Matched interpolation commands incorrect')
+
+    def test_transform_decomposition(self):
+        """Test transform lists interpolation by matrix decomposition"""
+        Transform = Svg.Attribute.Transform
+        for s, matrix in [
+            ('translate(10 20)', [1, 0, 0, 1, 10, 20]),
+            ('scale(2)', [2, 0, 0, 2, 0, 0]),
+            ('rotate(90)', [0, 1, -1, 0, 0, 0]),
+            ('rotate(90 10 0)', [0, 1, -1, 0, 10, -10]),
+            ('skewX(45)', [1, 0, 1, 1, 0, 0]),
+            ('matrix(1 2 3 4 5 6)', [1, 2, 3, 4, 5, 6]),
+            ('matrix(1e-1 0 0 1 0 0)', [0.1, 0, 0, 1, 0, 0]),
+        ]:
+            for a, b in zip(Transform(s).matrix(), matrix):
+                self.assertAlmostEqual(a, b, msg=f'{s} matrix incorrect')
+
+        for matrix in [[1, 2, 3, 4, 5, 6], [-1, 0, 0, 1, 10, 0], [0, 1, -1, 0, 0, 0], [0, 0, 1, 2, 0, 0]]:
+            for a, b in zip(Transform.compose(Transform.decompose(matrix)), matrix):
+                self.assertAlmostEqual(a, b, msg=f'{matrix} decomposition incorrect')
+
+        svg = Svg.Svg(
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<path id="a" transform="translate(100 0) rotate(-90)" d="M0 0L10 0"/>'
+            '<path id="b" transform="translate(0 100) scale(2) rotate(90)" d="M0 0L10 0"/>'
+            '</svg>'
+        )
+        for engine in ['python', 'numpy']:
+            if engine == 'numpy' and not Svg.numpy:
+                continue
+
+            # Half way rotation of a rotated shape does not shrink it
+            intp = svg.interpolate(0, 1, 1, engine = engine)
+            transform = intp.children[0].transform[0]
+            self.assertEqual(transform.operation, 'matrix', f'{engine} interpolation transform should be a matrix')
+            for a, b in zip(transform.values, [1.5, 0, 0, 1.5, 50, 50]):
+                self.assertAlmostEqual(a, b, msg=f'{engine} interpolation transform incorrect')
+
+    def test_bake_transforms(self):
+        """Test transforms baking into geometry"""
+        svg = Svg.Svg(
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<path id="a" transform="translate(10 20) scale(2)" d="M0 0L10 0L10 10Z" sodipodi:nodetypes="ccc" xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd"/>'
+            '<path id="b" d="M0 0L30 0L30 30Z"/>'
+            '<path id="c" transform="rotate(90)" d="M0 0h10v10z"/>'
+            '</svg>'
+        )
+        for engine in ['python', 'numpy']:
+            if engine == 'numpy' and not Svg.numpy:
+                continue
+
+            baked = svg.children[0].baked(engine)
+            self.assertEqual(baked.transform, [], f'{engine} baked path should have no transform')
+            self.assertEqual(list(baked.data.values), [10.0, 20.0, 30.0, 20.0, 30.0, 40.0], f'{engine} baked path coordinates incorrect')
+            self.assertNotIn('transform', baked.toString(), f'{engine} baked path should not have a transform attribute')
+            self.assertIn('nodetypes', baked.toString(), f'{engine} baked path commands are unchanged')
+            self.assertEqual(svg.children[0].transform[0].operation, 'translate', 'Source path should not be modified')
+
+            # Relative and horizontal commands are converted
+            baked = svg.children[2].baked(engine)
+            self.assertEqual(bytes(baked.data.operations), b'MCCCZ', f'{engine} baked path commands incorrect')
+            self.assertAlmostEqual(baked.data.values[6], 0.0, msg=f'{engine} baked path coordinates incorrect')
+            self.assertAlmostEqual(baked.data.values[7], 10.0, msg=f'{engine} baked path coordinates incorrect')
+
+            intp = svg.interpolate(0, 1, 1, engine = engine, bake = True)
+            self.assertEqual(intp.children[0].transform, [], f'{engine} baked interpolation should have no transform')
+            self.assertEqual(intp.children[0].data.toString(), 'M 5.0 10.0L 30.0 10.0L 30.0 35.0Z', f'{engine} baked interpolation incorrect')
+
+    def test_paint_interpolation(self):
+        """Test style and presentation attributes interpolation"""
+        Paint = Svg.Attribute.Paint
+        self.assertEqual(Paint.color('#f00'), (1.0, 0.0, 0.0), 'Short hex color incorrect')
+        self.assertEqual(Paint.color('rgb(255, 0, 100%)'), (1.0, 0.0, 1.0), 'rgb() color incorrect')
+        self.assertEqual(Paint.color('lime'), (0.0, 1.0, 0.0), 'Color keyword incorrect')
+        self.assertIsNone(Paint.color('url(#gradient)'), 'Gradient should not be a color')
+        self.assertEqual(Paint.parse('stroke-width', '2px'), ('number', (2.0,), 'px'), 'Width parsing incorrect')
+        self.assertIs(Svg.Attribute.Style.parse('fill:red; stroke:blue'), Svg.Attribute.Style.parse('fill:red; stroke:blue'), 'Styles should be cached')
+        for c in [0.0, 0.02, 0.5, 1.0]:
+            self.assertAlmostEqual(Paint.toSrgb(Paint.toLinear(c)), c, msg='Linear RGB conversion incorrect')
+
+        svg = Svg.Svg(
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<path id="a" fill="#000000" stroke="none" style="stroke-width:1px;opacity:1" d="M0 0L10 0"/>'
+            '<path id="b" fill="#ffffff" stroke="#ff0000" style="stroke-width:3px;opacity:1" d="M0 0L10 10"/>'
+            '</svg>'
+        )
+        for engine in ['python', 'numpy']:
+            if engine == 'numpy' and not Svg.numpy:
+                continue
+
+            intp = svg.interpolate(0, 1, 1, engine = engine)
+            s = intp.children[0].toString()
+            self.assertIn('fill="#bcbcbc"', s, f'{engine} fill should be interpolated in linear RGB')
+            self.assertIn('stroke="none"', s, f'{engine} stroke should not be interpolated')
+            self.assertIn('style="stroke-width:2.0px;opacity:1"', s, f'{engine} style should be interpolated')
+            self.assertIn('d="M 0.0 0.0L 10.0 5.0"', s, f'{engine} geometry should be interpolated')
+
+    def test_timing(self):
+        """Test interpolation timings"""
+        self.assertEqual(Svg.Timing.factors(3), [0.25, 0.5, 0.75], 'Linear timing incorrect')
+        self.assertEqual(Svg.Timing.factors(3, 'linear'), Svg.Timing.factors(3), 'Linear easing incorrect')
+        self.assertEqual(Svg.Timing.factors(2, [0.1, 0.9]), [0.1, 0.9], 'Explicit timing incorrect')
+        self.assertEqual(Svg.Timing.factors(3, lambda p: p * p), [0.0625, 0.25, 0.5625], 'Timing function incorrect')
+
+        # Linear cubic Bézier curve
+        for a, b in zip(Svg.Timing.factors(3, 'cubic-bezier(0.25, 0.25, 0.75, 0.75)'), [0.25, 0.5, 0.75]):
+            self.assertAlmostEqual(a, b, msg='Cubic Bézier timing incorrect')
+
+        ease = Svg.Timing.factors(3, 'ease-in-out')
+        self.assertLess(ease[0], 0.25, 'Ease in should start slowly')
+        self.assertAlmostEqual(ease[1], 0.5, msg='Ease in out should be symmetric')
+        self.assertAlmostEqual(ease[0] + ease[2], 1.0, msg='Ease in out should be symmetric')
+
+        for timing in ['bounce', 'cubic-bezier(2, 0, 1, 1)', 'cubic-bezier(a, 1, 1, 1)', 'cubic-bezier(0, 1, 1, nan)', 'cubic-bezier()', [0.5], [0.1, float('nan'), 0.9]]:
+            with self.assertRaises(RuntimeError):
+                Svg.Timing.factors(3, timing)
+
+        svg = Svg.Svg('<svg xmlns="http://www.w3.org/2000/svg"><path d="M0 0L10 0"/><path d="M0 0L10 100"/></svg>')
+        intp = svg.interpolate(0, 1, 2, timing = [0.1, 0.3])
+        self.assertEqual([child.data.values[3] for child in intp.children], [10.0, 30.0], 'Timing interpolation incorrect')
+
+    def test_keyframes(self):
+        """Test spline interpolation through keyframes"""
+        svg = Svg.Svg(
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<path id="a" transform="translate(0 0)" d="M0 0L10 0"/>'
+            '<path id="b" transform="translate(10 0)" d="M0 0L10 10"/>'
+            '<path id="c" transform="translate(20 0)" d="M0 0L10 0L20 0"/>'
+            '<path id="d" transform="translate(40 0)" d="M0 0L10 10"/>'
+            '</svg>'
+        )
+        self.assertEqual(Svg.Svg.keyFactors(3, 1), [0.5, 1.5], 'Keyframes factors incorrect')
+
+        results = []
+        for engine in ['python', 'numpy']:
+            if engine == 'numpy' and not Svg.numpy:
+                continue
+            engine = Svg.Engine.get(engine)
+
+            # Two keyframes spline is linear
+            matrix = engine.rows(engine.spline([[0.0, 10.0], [10.0, 30.0]], [0.25, 0.5]))
+            for row, expected in zip(matrix, [[2.5, 15.0], [5.0, 20.0]]):
+                for a, b in zip(row, expected):
+                    self.assertAlmostEqual(a, b, msg=f'{engine.name} two keyframes spline should be linear')
+
+            # Spline goes through keyframes
+            matrix = engine.rows(engine.spline([[0.0], [10.0], [0.0], [20.0]], [0.0, 1.0, 2.0, 3.0]))
+            for row, expected in zip(matrix, [0.0, 10.0, 0.0, 20.0]):
+                self.assertAlmostEqual(row[0], expected, msg=f'{engine.name} spline should go through keyframes')
+
+            intp = svg.interpolateKeys(['a', 'b', 'c', 'd'], 1, engine = engine)
+            self.assertEqual(len(intp.children), 3, f'{engine.name} keyframes interpolation should have one step by span')
+            for child in intp.children:
+                self.assertEqual(child.data.operations, intp.children[0].data.operations, f'{engine.name} keyframes should be resampled together')
+            results.append([child.toString() for child in intp.children])
+            self.assertAlmostEqual(intp.children[1].transform[0].values[0], 14.375, msg=f'{engine.name} spline translation incorrect')
+
+            frames = svg.interpolateKeys(['a', 'b', 'c'], 2, engine = engine, split = True)
+            self.assertEqual(len(frames), 4, f'{engine.name} keyframes frames count incorrect')
+
+        if len(results) == 2:
+            self.assertEqual(results[0], results[1], 'Engines keyframes interpolations should be the same')
+
+        with self.assertRaises(RuntimeError):
+            svg.interpolateKeys(['a'], 1)
+
+    def test_groups(self):
+        """Test groups interpolation with their children"""
+        svg = Svg.Svg(
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<g id="a" transform="translate(0 0)" fill="#000000"><path id="x" d="M0 0L10 0"/><path id="y" transform="translate(5 5)" d="M0 0L0 10"/></g>'
+            '<g id="b" transform="translate(10 0)" fill="#ffffff"><path id="y" transform="translate(15 5)" d="M0 0L0 20"/><path id="x" d="M0 0L20 10"/></g>'
+            '<g id="c"><path d="M0 0L10 0"/></g>'
+            '</svg>'
+        )
+        a, b, c = svg.children
+        self.assertIsInstance(a, Svg.Node.Group, 'Group node type incorrect')
+        self.assertTrue(a.canInterpolate(b), 'Groups with same children should interpolate')
+        self.assertFalse(a.canInterpolate(c), 'Groups with different children count should not interpolate')
+
+        results = []
+        for engine in ['python', 'numpy']:
+            if engine == 'numpy' and not Svg.numpy:
+                continue
+
+            intp = svg.interpolate('a', 'b', 1, engine = engine)
+            group = intp.children[0]
+            self.assertEqual(
+                intp.toString(),
+                '<svg xmlns="http://www.w3.org/2000/svg">\n\t<g transform="translate(5.0, 0.0)" fill="#bcbcbc">'
+                '<path d="M 0.0 0.0L 15.0 5.0" />'
+                '<path transform="translate(10.0, 5.0)" d="M 0.0 0.0L 0.0 15.0" /></g>\n</svg>',
+                f'{engine} group interpolation incorrect'
+            )
+
+            baked = svg.interpolate('a', 'b', 1, engine = engine, bake = True).children[0]
+            self.assertEqual(baked.transform, [], f'{engine} baked group should have no transform')
+            self.assertEqual(list(baked.children[1].data.values), [15.0, 5.0, 15.0, 20.0], f'{engine} baked group children incorrect')
+            results.append(group.toString())
+
+        if len(results) == 2:
+            self.assertEqual(results[0], results[1], 'Engines group interpolations should be the same')
+
+        # Transforms and paint layout is read once by interpolation, not by step
+        with mock.patch.object(Svg.Node.Node, 'paintKeys', autospec = True, side_effect = Svg.Node.Node.paintKeys) as paintKeys, \
+             mock.patch.object(Svg.Node.Node, 'transformKeys', autospec = True, side_effect = Svg.Node.Node.transformKeys) as transformKeys:
+            svg.interpolate('a', 'b', 1)
+            calls = (paintKeys.call_count, transformKeys.call_count)
+            svg.interpolate('a', 'b', 20)
+            self.assertEqual((paintKeys.call_count, transformKeys.call_count), (2 * calls[0], 2 * calls[1]), 'Layout should not be read by step')
+
+        # Only the last interpolation layout is kept
+        a.childrenLayout(b)
+        a.valuesLayout(b)
+        a.childrenLayout([b, b])
+        a.valuesLayout([b, b])
+        self.assertEqual((a.lastLayout[0], a.lastChildrenLayout[0]), ((b, b), (b, b)), 'Past layouts should not be kept')
+
+    def test_shapes(self):
+        """Test basic shapes interpolation"""
+        svg = Svg.Svg(
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<rect id="a" x="0" y="0" width="10" height="20"/>'
+            '<rect id="b" x="10" y="0" width="30" height="20" rx="4"/>'
+            '<circle id="c" cx="5" cy="5" r="5"/>'
+            '<polygon id="d" points="0,0 10,0 10,10"/>'
+            '<polygon id="e" points="0,0 20,0 20,20"/>'
+            '<polygon id="f" points="0,0 20,0 20,20 0,20"/>'
+            '<line id="g" x1="0" y1="0" x2="10" y2="0"/>'
+            '<path id="h" d="M0 0L10 10"/>'
+            '</svg>'
+        )
+        self.assertIsInstance(svg.getNode('a'), Svg.Node.Rect, 'Rect node type incorrect')
+        self.assertEqual(svg.getNode('b').values, [10.0, 0.0, 30.0, 20.0, 4.0, 4.0], 'Rect auto corner radius incorrect')
+        self.assertEqual(
+            list(svg.getNode('c').pathData().values[-2:]), [10.0, 5.0],
+            'Circle path conversion should close on its start point'
+        )
+
+        for engine in ['python', 'numpy']:
+            if engine == 'numpy' and not Svg.numpy:
+                continue
+
+            self.assertEqual(
+                svg.interpolate('a', 'b', 1, engine = engine).children[0].toString(),
+                '<{http://www.w3.org/2000/svg}rect x="5.0" y="0.0" width="20.0" height="20.0" rx="2.0" ry="2.0" />',
+                f'{engine} rect interpolation incorrect'
+            )
+            self.assertEqual(
+                svg.interpolate('d', 'e', 1, engine = engine).children[0].el.tag, '{http://www.w3.org/2000/svg}polygon',
+                f'{engine} polygons with the same points count should stay polygons'
+            )
+            self.assertEqual(
+                svg.interpolate('d', 'e', 1, engine = engine).children[0].values, [0.0, 0.0, 15.0, 0.0, 15.0, 15.0],
+                f'{engine} polygon interpolation incorrect'
+            )
+
+            # Different primitives are interpolated as paths
+            for pair in [('a', 'c'), ('e', 'f'), ('b', 'c')]:
+                intp = svg.interpolate(*pair, 1, engine = engine).children[0]
+                self.assertIsInstance(intp, Svg.Node.Path, f'{engine} {pair} should be interpolated as paths')
+            self.assertEqual(
+                svg.interpolate('g', 'h', 1, engine = engine).children[0].data.toString(), 'M 0.0 0.0L 10.0 5.0',
+                f'{engine} line and path interpolation incorrect'
+            )
+
+            intp = svg.interpolateKeys(['a', 'b', 'c'], 1, engine = engine)
+            self.assertEqual(len(intp.children), 2, f'{engine} mixed shapes keyframes interpolation incorrect')
+
+        # Relative or absolute units cannot be converted into path lengths
+        svg = Svg.Svg(
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<rect id="a" x="0" y="0" width="50%" height="20"/>'
+            '<circle id="b" cx="5px" cy="5" r="5"/>'
+            '<circle id="c" cx="5" cy="5" r="1cm"/>'
+            '</svg>'
+        )
+        self.assertEqual(svg.getNode('b').toPath().data.values[-2:].tolist(), [10.0, 5.0], 'Pixel unit should be converted')
+        for pair in [('a', 'b'), ('b', 'c')]:
+            with self.assertRaises(RuntimeError, msg = f'{pair} units conversion should fail'):
+                svg.interpolate(*pair, 1)
+
+    def test_instrumentation(self):
+        """Test phase timers and counters"""
+        instrumentation = Svg.Instrumentation()
+        self.assertIs(instrumentation.phase('parse'), Svg.Instrumentation.disabled, 'Disabled phase should be a no-op')
+        instrumentation.count('nodes')
+        self.assertEqual(instrumentation.results(), {'timings': {}, 'counters': {}}, 'Disabled instrumentation should not record')
+
+        s = (
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<path id="a" d="M0 0L10 0L10 10"/>'
+            '<path id="b" d="M0 0L20 0L20 20"/>'
+            '</svg>'
+        )
+        Svg.instrumentation.enable(profile = True)
+        try:
+            Svg.instrumentation.startProfile()
+            svg = Svg.Svg(s)
+            svg.interpolate('a', 'b', 4).toString()
+        finally:
+            Svg.instrumentation.disable()
+
+        results = Svg.instrumentation.results()
+        self.assertEqual(sorted(results['timings']), ['create', 'interpolate', 'parse', 'prepare', 'toString'], 'Phases incorrect')
+        self.assertEqual(results['timings']['interpolate']['calls'], 1, 'Phase calls incorrect')
+        self.assertEqual(results['counters'], {'nodes': 2, 'segments': 6, 'values': 6, 'steps': 4}, 'Counters incorrect')
+        self.assertIn('interpolate', Svg.instrumentation.profileStats(), 'Profile should be captured')
+
+        Svg.instrumentation.reset()
+        self.assertEqual(Svg.instrumentation.results(), {'timings': {}, 'counters': {}}, 'Reset should clear results')
+        self.assertIsNone(Svg.instrumentation.profileStats(), 'Reset should clear profile')
+
+        # Each job gets a fresh profile
+        Svg.instrumentation.enable(profile = True)
+        try:
+            Svg.instrumentation.startProfile()
+            svg.interpolate('a', 'b', 1)
+            self.assertIn('interpolate', Svg.instrumentation.profileStats(), 'First job profile should be captured')
+            Svg.instrumentation.reset()
+            Svg.instrumentation.startProfile()
+            Svg.Svg(s)
+            self.assertNotIn('interpolate', Svg.instrumentation.profileStats(), 'Next job profile should not be stale')
+        finally:
+            Svg.instrumentation.disable()
+            Svg.instrumentation.reset()
+
+    def test_streamed_frames_document(self):
+        """Test writing frames nodes as they are generated into one document"""
+        svg = Svg.Svg(
+            '<svg xmlns="http://www.w3.org/2000/svg" width="10">'
+            '<path id="a" transform="translate(0 0)" d="M0 0L10 0"/>'
+            '<path id="b" transform="translate(10 0)" d="M0 0L10 10"/>'
+            '<path id="c" transform="translate(20 0)" d="M0 0L20 0"/>'
+            '</svg>'
+        )
+
+        frames = svg.frames([['a', 'b']], 3, chunk = 1)
+        self.assertEqual(
+            ''.join(svg.clone().iterString(children = (node for frame in frames for node in frame.children))),
+            svg.interpolate('a', 'b', 3).toString(),
+            'Streamed frames document should be the interpolation document'
+        )
+
+        frames = svg.keyFrames(['a', 'b', 'c'], 2, chunk = 1)
+        self.assertEqual(
+            ''.join(svg.clone().iterString(children = (node for frame in frames for node in frame.children))),
+            svg.interpolateKeys(['a', 'b', 'c'], 2).toString(),
+            'Streamed keyframes document should be the keyframes interpolation document'
+        )
+        self.assertEqual(''.join(svg.clone().iterString(children = iter(()))), '<svg xmlns="http://www.w3.org/2000/svg" width="10" />', 'Empty document incorrect')
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
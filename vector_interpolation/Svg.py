@@ -1,5 +1,17 @@
+import contextlib
+import functools
+import math
 import re
+import time
 import xml.etree.ElementTree as ET
+from array import array
+from itertools import chain
+
+# Optional numpy support, pure python engine is used as fallback
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # Attribute namespace
 class Attribute:
@@ -25,6 +37,7 @@ class Attribute:
         clone() : Command
             Clone command
         """
+        __slots__ = ('operation', 'values')
 
         def __init__(self, s = None):
             """
@@ -36,12 +49,10 @@ class Attribute:
             self.values = []
 
             if s:
-                self.operation = re.search(r'[M|L|H|V|C|S|Q|T|A|Z]', s)[0]
-                values = re.findall(r'[0-9\.-]+', s)
-                
-                self.values = []
-                for v in values:
-                    self.values.append(float(v))
+                data = Attribute.PathData(s)
+                if len(data):
+                    self.operation = chr(data.operations[0])
+                    self.values = data.values.tolist()
 
         def toString(self):
             s = self.operation
@@ -51,406 +62,4035 @@ class Attribute:
 
             return s
 
-    # "transform" attribute
-    class Transform:
-        """ 
-        Transform attributes
+    # Path "d" attribute
+    class PathData:
+        """
+        Path d attribute compact geometry.
+
+        Commands are stored as one operation byte array and one
+        coordinates array, instead of one Command object by segment.
+        PathData objects are shared between nodes and must not be
+        modified once created: use withValues() to get new geometry.
+
+        The d attribute is read in one linear pass: a compiled scanner
+        splits operations from their arguments, which are read by
+        str.split() and float(). Arcs (packed flags), packed numbers or
+        invalid data use the slower number tokenizer. Implicit command
+        repetitions (as "L 1 2 3 4") are stored as distinct commands. On
+        invalid data, parsing stops at the last complete command, as SVG
+        renderers do.
+
+        Attributes
+        ----------
+        operations : bytearray
+            Operation character code of each command
+        values : array('d')
+            Values of all the commands
+        offsets : array('l')
+            Command values start offset in values. The last offset is
+            the values length.
+
+        Methods
+        -------
+        withValues(values: float[]) : PathData
+            Get a geometry with the same commands and the given values.
+        toString() : str
+            Get the d attribute string.
         """
+        __slots__ = ('operations', 'values', 'offsets')
+
+        # Operations splitter
+        splitter = re.compile(r'([MmZzLlHhVvCcSsQqTtAa])')
+
+        # Command and number tokens scanner
+        tokenizer = re.compile(r'[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?|[MmZzLlHhVvCcSsQqTtAa]')
+
+        # Command operation values count
+        arity = {
+            'M': 2, 'm': 2, 'L': 2, 'l': 2, 'H': 1, 'h': 1, 'V': 1, 'v': 1,
+            'C': 6, 'c': 6, 'S': 4, 's': 4, 'Q': 4, 'q': 4, 'T': 2, 't': 2,
+            'A': 7, 'a': 7, 'Z': 0, 'z': 0,
+        }
+
+        # Operation of implicit command repetitions
+        repeat = {'M': 'L', 'm': 'l'}
+
         def __init__(self, s = None):
             """
-            Paremeters
-            ==========
+            Parameters
+            ----------
             s : string
-               Transform attribute value
+                Path d attribute value
             """
-            self.operation = None
-            self.values = []
+            self.operations = bytearray()
+            self.values = array('d')
+            self.offsets = array('l', [0])
 
             if s:
-                m = re.search(r'^\s*([a-zA-Z_][a-zA-Z0-9_]*)\(?([^\)]*)\)?', s)
-                self.operation = m[1]
-                if m[2]:
-                    for v in re.findall(r'[0-9\.-]+', m[2]):
-                        self.values.append(float(v))
-        
-        def clone(self):
-            """Clone transform operation"""
-            new = self.__class__(self.operation)
-            new.values = []
-            
-            for v in self.values:
-                new.values.append(v)
+                self.parse(s)
 
-            return new
-        
-        def interpolated(self, transform, p):
+        def parse(self, s):
             """
-            Get interpolated transform
+            Append the commands of a d attribute string.
 
             Parameters
-            =========
-            transform : Transform
-                Interpolation final transform
-            p: float
-                Interpolation factor
+            ----------
+            s : string
+                Path d attribute value
             """
-            # Handle different operation
-            t1 = self
-            t2 = transform
+            arity = self.arity
+            repeat = self.repeat
 
-            if t1.operation == 'translate' and t2.operation == 'matrix':
-                t1 = self.translateToMatrix(t1)
-            elif t1.operation == 'matrix' and t2.operation == 'translate':
-                t2 = self.translateToMatrix(t2)
-            if t1.operation != t2.operation:
-                raise RuntimeError('Cannot interpolate a different transform operation')
+            # Split operations and their arguments, then read each argument
+            # list with str.split(). Arcs, packed numbers ("0.5.5", "1-2"),
+            # non finite numbers or invalid data are left to the number
+            # tokenizer.
+            parts = self.splitter.split(s.replace(',', ' '))
+            if parts[0].strip():
+                return self.parseTokens(self.tokenizer.findall(s))
 
-            # Load transform values
-            values = []
-            for i, v1 in enumerate(t1.values):
-                try:
-                    v2 = t2.values[i]
-                except IndexError:
-                    v2 = 0.0
+            args = [part.split() for part in parts[2::2]]
+            operations = bytearray()
+            offsets = []
+            offset = len(self.values)
+            for operation, values in zip(parts[1::2], args):
+                size = arity[operation]
+                count = len(values)
+                if operation == 'A' or operation == 'a' or (count % size or not count if size else count):
+                    return self.parseTokens(self.tokenizer.findall(s))
 
-                values.append([v1, v2])
-            
-            # Load second transform values if this transform has more
-            if len(transform.values) > len(values):
-                l = len(values)
-                for i in range(len(transform.values) - l):
-                    values.append([0.0, transform.values[i + l]])
-            
-            intp = t1.clone()
-            intp.values = []
-            for v in values:
-                intp.values.append((v[1] - v[0]) * p + v[0])
+                if not size:
+                    operations.append(ord(operation))
+                    offsets.append(offset)
+                    continue
 
-            return intp
+                count //= size
+                operations.append(ord(operation))
+                if count > 1:
+                    operations += repeat.get(operation, operation).encode('ascii') * (count - 1)
+                offsets += range(offset + size, offset + size * count + 1, size)
+                offset += size * count
 
-        def toString(self):
-            """ Transform string """
-            s = self.operation + '('
-            for i in range(len(self.values)):
-                s += ', ' if i else ''
-                s += str(self.values[i])
-            s += ')'
+            try:
+                values = array('d', map(float, chain.from_iterable(args)))
+            except ValueError:
+                return self.parseTokens(self.tokenizer.findall(s))
 
-            return s
-        
-        def translateToMatrix(self, trans):
+            # float() also reads "inf" and "nan": leave non finite sums,
+            # as overflowing ones, to the tokenizer
+            if not math.isfinite(sum(values)):
+                return self.parseTokens(self.tokenizer.findall(s))
+
+            self.operations += operations
+            self.values += values
+            self.offsets += array('l', offsets)
+
+        def parseTokens(self, tokens):
             """
-            Transform a translate transform into a matrix transform
+            Append the commands of a d attribute tokens list, handling
+            packed arc flags and stopping on invalid data.
 
             Parameters
             ----------
-            trans: Transform
-              Translate operation
+            tokens : str[]
+                Command and number tokens
             """
-            if trans.operation == 'translate':
-                matrix = self.__class__()
-                matrix.operation = 'matrix'
-                matrix.values = [1, 0, 0, 1]
-                matrix.values.append(trans.values[0] if len(trans.values) > 0 else 0)
-                matrix.values.append(trans.values[1] if len(trans.values) > 1 else 0)
+            operations = self.operations
+            values = self.values
+            offsets = self.offsets
+            arity = self.arity
 
-                return matrix
+            operation = None
+            count = 0
+            size = 0
+            i = 0
+            while i < len(tokens):
+                token = tokens[i]
+                i += 1
 
-            return trans
+                n = arity.get(token)
+                if n is not None:
+                    # Command token
+                    if count:
+                        break
+                    operation = token
+                    size = n
+                    if not n:
+                        operations.append(ord(token))
+                        offsets.append(len(values))
+                    continue
 
-# Node namespace
-class Node:
-    """
-    -----------------------------------------------
-    |                 Nodes                       |
-    -----------------------------------------------
-    """
+                # Number token
+                if not size:
+                    break
+                if (operation == 'A' or operation == 'a') and (count == 3 or count == 4) and len(token) > 1:
+                    # Arc flags may be packed with next number ("a1 1 0 01.5 2")
+                    if token[0] != '0' and token[0] != '1':
+                        break
+                    i -= 1
+                    tokens[i] = token[1:]
+                    token = token[0]
 
-    # Node main class
-    class Node:
-        """
-        SVG node main class.
+                values.append(float(token))
+                count += 1
+                if count == size:
+                    operations.append(ord(operation))
+                    offsets.append(len(values))
+                    operation = self.repeat.get(operation, operation)
+                    count = 0
 
-        Attributes
-        ----------
-        el: ET.Element
-            DOM element.
-        transform: Attribute.Transform[]
-            List of transormations
-        
-        Methods
-        -------
-        clone(): Node
-            Clone node.
-        canInterpolate(node: Node): bool
-            Inheritable. Check if the interation is compatible with the given node.
-        toString(): str
-            Transform into string.
-        """
+            # Drop values of an incomplete command
+            if count:
+                del values[offsets[-1]:]
 
-        def __init__(self, s):
+        def __len__(self):
+            return len(self.operations)
+
+        def __getitem__(self, i):
+            """Get command i as Command"""
+            if i < 0:
+                i += len(self.operations)
+            if i < 0 or i >= len(self.operations):
+                raise IndexError('Path command index out of range')
+
+            command = Attribute.Command()
+            command.operation = chr(self.operations[i])
+            command.values = self.values[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+            return command
+
+        def __iter__(self):
+            for i in range(len(self.operations)):
+                yield self[i]
+
+        def isCubic(self):
             """
-            Parameters
-            ----------
-            s : string|ET.Element
-                Node xml representation or element
+            Check the path only has absolute M, C and Z commands, with
+            Z commands closing on their subpath start point.
             """
-            self.el = s if type(s) == ET.Element else ET.fromstring(s)
+            if self.operations.translate(None, b'MCZ') or self.operations[:1] not in (b'', b'M') or b'ZC' in self.operations:
+                return False
 
-            self.transform = []
-            if self.el.attrib.get('transform'):
-                m = re.findall(r"([a-zA-Z][a-zA-Z0-9_]*\([^\)]*\))", self.el.attrib['transform'])
-                for t in m:
-                    self.transform.append(Attribute.Transform(t))
+            start = 0
+            for i, operation in enumerate(self.operations):
+                if operation == 77:
+                    start = self.offsets[i]
+                elif operation == 90 and i and self.values[self.offsets[i] - 2:self.offsets[i]] != self.values[start:start + 2]:
+                    return False
+
+            return True
 
-        def interpolated(self, node, p):
+        def cubic(self):
             """
-            Return a node interpolation between current and a given
-            node.
+            Get the same path with only absolute M, C and Z commands.
+            Lines, quadratic curves and arcs are converted into cubic
+            Bézier curves, and a line is added before Z commands not
+            closing on their subpath start point.
+            """
+            if self.isCubic():
+                return self
 
-            Create a node with its transformations interpolated
+            new = self.__class__()
+            operations = new.operations
+            values = new.values
+            offsets = new.offsets
 
-            Parameters
-            ----------
-            node : Node
-                Interpolation limit
-            p : float
-                Interpolation multiplier
-            """
+            def curve(x1, y1, x2, y2, x3, y3):
+                operations.append(67)
+                values.extend((x1, y1, x2, y2, x3, y3))
+                offsets.append(len(values))
 
-            if len(self.transform) > 1 or len(node.transform) > 1:
-                raise RuntimeError('Interpolation can only manage a maximum of one transform')
+            def line(x0, y0, x1, y1):
+                curve(x0 + (x1 - x0) / 3, y0 + (y1 - y0) / 3, x0 + (x1 - x0) * 2 / 3, y0 + (y1 - y0) * 2 / 3, x1, y1)
 
-            # Copy current node
-            new = self.clone()
+            def quadratic(x0, y0, qx, qy, x1, y1):
+                curve(x0 + (qx - x0) * 2 / 3, y0 + (qy - y0) * 2 / 3, x1 + (qx - x1) * 2 / 3, y1 + (qy - y1) * 2 / 3, x1, y1)
 
-            # Get transforms. Handle case one of node has no transform and the other does
-            transforms = []
-            if len(self.transform) == len(node.transform):
-                transforms += self.transform
-                transforms += node.transform
-            else:
-                if len(self.transform) < len(node.transform):
-                    transforms.append(node.transform[0].clone())
-                    transforms.append(node.transform[0])
-                    for i, _ in enumerate(transforms[0].values):
-                        transforms[0].values[i] = 0.0
-                if len(node.transform) < len(self.transform):
-                    transforms.append(self.transform[0])
-                    transforms.append(self.transform[0].clone())
-                    for i, _ in enumerate(transforms[1].values):
-                        transforms[1].values[i] = 0.0
-            # Change transforms to interpolated
-            if len(transforms):
-                new.transform = [transforms[0].interpolated(transforms[1], p)]
+            # Current point, subpath start point, last curve control points
+            x = y = sx = sy = 0.0
+            cx = cy = qx = qy = None
+            moved = False
+            for i, operation in enumerate(self.operations.decode('ascii')):
+                v = self.values[self.offsets[i]:self.offsets[i + 1]]
+                absolute = operation.upper()
+                dx, dy = (0.0, 0.0) if absolute == operation else (x, y)
+                ccx = ccy = qqx = qqy = None
+
+                if not moved and absolute == 'Z':
+                    # Nothing to close
+                    continue
+                if not moved and absolute != 'M':
+                    # Subpath without M command starts on current point
+                    operations.append(77)
+                    values.extend((x, y))
+                    offsets.append(len(values))
+                    sx = x
+                    sy = y
+                moved = absolute != 'Z'
+
+                if absolute == 'M':
+                    x = sx = v[0] + dx
+                    y = sy = v[1] + dy
+                    operations.append(77)
+                    values.extend((x, y))
+                    offsets.append(len(values))
+                elif absolute == 'Z':
+                    if x != sx or y != sy:
+                        line(x, y, sx, sy)
+                    operations.append(90)
+                    offsets.append(len(values))
+                    x = sx
+                    y = sy
+                elif absolute == 'L':
+                    line(x, y, v[0] + dx, v[1] + dy)
+                    x, y = v[0] + dx, v[1] + dy
+                elif absolute == 'H':
+                    line(x, y, v[0] + dx, y)
+                    x = v[0] + dx
+                elif absolute == 'V':
+                    line(x, y, x, v[0] + dy)
+                    y = v[0] + dy
+                elif absolute == 'C' or absolute == 'S':
+                    if absolute == 'C':
+                        x1, y1 = v[0] + dx, v[1] + dy
+                        v = v[2:]
+                    else:
+                        # Reflection of previous curve second control point
+                        x1, y1 = (2 * x - cx, 2 * y - cy) if cx is not None else (x, y)
+                    ccx, ccy = v[0] + dx, v[1] + dy
+                    curve(x1, y1, ccx, ccy, v[2] + dx, v[3] + dy)
+                    x, y = v[2] + dx, v[3] + dy
+                elif absolute == 'Q' or absolute == 'T':
+                    if absolute == 'Q':
+                        qqx, qqy = v[0] + dx, v[1] + dy
+                        v = v[2:]
+                    else:
+                        # Reflection of previous quadratic curve control point
+                        qqx, qqy = (2 * x - qx, 2 * y - qy) if qx is not None else (x, y)
+                    quadratic(x, y, qqx, qqy, v[0] + dx, v[1] + dy)
+                    x, y = v[0] + dx, v[1] + dy
+                elif absolute == 'A':
+                    for c in self.arc(x, y, v[0], v[1], v[2], v[3], v[4], v[5] + dx, v[6] + dy):
+                        curve(*c)
+                    x, y = v[5] + dx, v[6] + dy
+
+                cx, cy, qx, qy = ccx, ccy, qqx, qqy
 
             return new
 
-        def canInterpolate(self, node):
-            """ 
-            Check if the node can interpolate the given node.
+        @staticmethod
+        def arc(x1, y1, rx, ry, angle, large, sweep, x2, y2):
+            """
+            Get the cubic Bézier curves approximating an arc, as lists of
+            curve command values.
+
+            See SVG "Elliptical arc implementation notes".
+            """
+            if x1 == x2 and y1 == y2:
+                return []
+
+            rx = abs(rx)
+            ry = abs(ry)
+            if not rx or not ry:
+                return [(x1 + (x2 - x1) / 3, y1 + (y2 - y1) / 3, x1 + (x2 - x1) * 2 / 3, y1 + (y2 - y1) * 2 / 3, x2, y2)]
+
+            cos = math.cos(math.radians(angle))
+            sin = math.sin(math.radians(angle))
+
+            # Center parameterization
+            mx = (x1 - x2) / 2
+            my = (y1 - y2) / 2
+            x1p = cos * mx + sin * my
+            y1p = -sin * mx + cos * my
+
+            scale = x1p ** 2 / rx ** 2 + y1p ** 2 / ry ** 2
+            if scale > 1:
+                rx *= math.sqrt(scale)
+                ry *= math.sqrt(scale)
+
+            num = rx ** 2 * ry ** 2 - rx ** 2 * y1p ** 2 - ry ** 2 * x1p ** 2
+            den = rx ** 2 * y1p ** 2 + ry ** 2 * x1p ** 2
+            coef = math.sqrt(max(0.0, num / den)) if den else 0.0
+            if bool(large) == bool(sweep):
+                coef = -coef
+            cxp = coef * rx * y1p / ry
+            cyp = -coef * ry * x1p / rx
+            cx = cos * cxp - sin * cyp + (x1 + x2) / 2
+            cy = sin * cxp + cos * cyp + (y1 + y2) / 2
+
+            theta = math.atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+            delta = math.atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx) - theta
+            if sweep and delta < 0:
+                delta += 2 * math.pi
+            elif not sweep and delta > 0:
+                delta -= 2 * math.pi
+
+            # One curve by quarter of ellipse at most
+            n = max(1, math.ceil(abs(delta) / (math.pi / 2) - 1e-9))
+            delta /= n
+            t = 4 / 3 * math.tan(delta / 4)
+
+            def point(ux, uy):
+                return cx + rx * ux * cos - ry * uy * sin, cy + rx * ux * sin + ry * uy * cos
+
+            curves = []
+            for i in range(n):
+                a = theta + i * delta
+                b = a + delta
+                c1 = point(math.cos(a) - t * math.sin(a), math.sin(a) + t * math.cos(a))
+                c2 = point(math.cos(b) + t * math.sin(b), math.sin(b) - t * math.cos(b))
+                end = point(math.cos(b), math.sin(b)) if i < n - 1 else (x2, y2)
+                curves.append(c1 + c2 + end)
+
+            return curves
+
+        def subpaths(self):
+            """
+            Get the (start, stop) commands ranges of each subpath. Each
+            subpath starts with a M command.
+            """
+            subpaths = []
+            start = 0
+            for i, operation in enumerate(self.operations):
+                if (operation == 77 or operation == 109) and i:
+                    subpaths.append((start, i))
+                    start = i
+            if len(self.operations):
+                subpaths.append((start, len(self.operations)))
+
+            return subpaths
+
+        def curves(self, start, stop):
+            """
+            Get the chained cubic Bézier curves of a cubic path subpath:
+            start point then 6 values by curve.
 
             Parameters
             ----------
-            node : Node
-                Compared node.
+            start : int
+                Subpath M command position
+            stop : int
+                Subpath end
             """
-            return type(node) == self.__class__
+            return self.values[self.offsets[start]:self.offsets[stop]].tolist()
 
-        def clone(self):
-            """ Clone node """
-            new = self.__class__(ET.tostring(self.el))
-            return new
-        
-        def interpolate(self, node, steps):
+        def features(self, start, stop):
             """
-            Return list of interpolation between current node and given node
+            Get the (x, y, size, closed) matching features of a subpath:
+            mean point, square root of its control polygon area and
+            closed flag.
 
             Parameters
-            -----------
-            node: Node
-                Interpreation limit node
-            steps: int
-                Number of interpretations between current node and given node
+            ----------
+            start : int
+                Subpath M command position
+            stop : int
+                Subpath end
             """
+            xs = self.values[self.offsets[start]:self.offsets[stop]:2]
+            ys = self.values[self.offsets[start] + 1:self.offsets[stop]:2]
+            n = len(xs)
+            if not n:
+                return 0.0, 0.0, 0.0, False
 
-            intl = []
-
-            if not self.canInterpolate(node):
-                raise RuntimeError('Node not compatible with node for interpolation')
-            
-            for i in range(steps):
-                p = (i+1) / (steps + 1)
-                intl.append(self.interpolated(node, p))
-            
-            return intl
+            area = 0.0
+            px = xs[-1]
+            py = ys[-1]
+            for x, y in zip(xs, ys):
+                area += px * y - x * py
+                px = x
+                py = y
 
-        def stringAttributes(self):
-            """Get list of overrided attributes by toString()"""
-            
-            # Attributes replacing self.el attributes
-            attr = {'id': None}
+            return sum(xs) / n, sum(ys) / n, abs(area / 2) ** 0.5, self.operations[stop - 1] == 90
 
-            if len(self.transform):
-                # Build transformation attribute to override el trans attribute
-                trans = ''
-                for t in self.transform:
-                    trans += ';' + t.toString() if trans else t.toString()
-                attr['transform'] = trans
-            
-            return attr
+        @classmethod
+        def matched(cls, data1, data2, engine):
+            """
+            Get two cubic paths with matching subpaths from two cubic
+            paths. Subpaths are matched by minimal assignment on their
+            position and size, open and closed subpaths being matched
+            together only when unavoidable. Second path subpaths are
+            reordered to follow their first path match. Unmatched
+            subpaths are matched with a subpath collapsed on their mean
+            point, added at the end of the second path or the first
+            path.
 
-        def toString(self, xmlns = {}, addXmlns = False):
-            """ 
-            String conversion
-        
             Parameters
             ----------
-            self : object
-                Converted node
-            xmlns : object
-                Url -> node SVG xmlns object
-            addXmlns : bool
-                Add xmlns into root node
+            data1 : PathData
+                First cubic path
+            data2 : PathData
+                Second cubic path
+            engine : Engine.Python
+                Interpolation engine
             """
-            # Initialize string
-            s = f'<{self.el.tag}'
+            subpaths1 = data1.subpaths()
+            subpaths2 = data2.subpaths()
+            features1 = [data1.features(*subpath) for subpath in subpaths1]
+            features2 = [data2.features(*subpath) for subpath in subpaths2]
 
-            if addXmlns:
-                for url in xmlns:
-                    s += f' xmlns{':' + xmlns[url] if xmlns[url] else ''}="{url}"'
-
-            # Load attributes
-            stringAttributes = self.stringAttributes()
-            attrib = {}
-            for a in self.el.attrib:
-                # We first load ET.Element attributes
-                attrib[a] = self.el.attrib[a]
-            for a in stringAttributes:
-                # Then override managed attributes
-                attrib[a] = stringAttributes[a]
-            for a in attrib:
-                s += f' {a}="{attrib[a]}"' if attrib[a] != None else ''
-
-            s += ' />'
-            # Replace namespace link by namepace names
-            for url in xmlns:
-                s = s.replace('{' + url + '}', f'{xmlns[url]}:' if xmlns[url] else '')
-            
-            return s
-    
-    # <path> node
-    class Path(Node):
-        """
-        SVG node <path>
+            # Assign subpaths of the path with less subpaths
+            if len(subpaths1) <= len(subpaths2):
+                matches = engine.assignment(engine.subpathCosts(features1, features2))
+            else:
+                reverse = engine.assignment(engine.subpathCosts(features2, features1))
+                matches = [None] * len(subpaths1)
+                for i, j in enumerate(reverse):
+                    matches[j] = i
 
-        Attributes
-        ----------
-        commands: Path.Command[]
-            List of path commands
-        
-        Methods
-        -------
-        clone(): Path
-            Clone path.
-        parseValues()
-            Parse values.
-        """
+            new1 = cls()
+            new2 = cls()
+            for i, j in enumerate(matches):
+                new1.appendSubpath(data1, *subpaths1[i])
+                if j is None:
+                    new2.appendPoint(*features1[i][:2], features1[i][3])
+                else:
+                    new2.appendSubpath(data2, *subpaths2[j])
 
-        def __init__(self, s):
+            matched = set(matches)
+            for j, subpath in enumerate(subpaths2):
+                if j not in matched:
+                    new1.appendPoint(*features2[j][:2], features2[j][3])
+                    new2.appendSubpath(data2, *subpath)
+
+            return new1, new2
+
+        def appendSubpath(self, data, start, stop):
             """
+            Append a subpath of another path.
+
             Parameters
             ----------
-            s : string|ET.Element
-                Node xml representation or element
+            data : PathData
+                Source path
+            start : int
+                Subpath M command position
+            stop : int
+                Subpath end
             """
-            super().__init__(s)
-
-            # Parse values
-            d = self.el.attrib['d'] if self.el.attrib.get('d') else ''
-            commands = re.findall(r"[M|L|H|V|C|S|Q|T|A|Z][0-9-\.\s]*", d)
-            self.commands = []
-            for command in commands:
-                self.commands.append(Attribute.Command(command))
+            offset = len(self.values) - data.offsets[start]
+            self.operations += data.operations[start:stop]
+            self.values.extend(data.values[data.offsets[start]:data.offsets[stop]])
+            self.offsets.extend(o + offset for o in data.offsets[start + 1:stop + 1])
 
-        def canInterpolate(self, node):
-            """ 
-            Check if the node can interpolate the given node.
+        def appendPoint(self, x, y, closed):
+            """
+            Append a single point subpath.
 
             Parameters
             ----------
-            node : Node
-                Compared node.
+            x : float
+                Point x
+            y : float
+                Point y
+            closed : bool
+                Close the subpath
             """
-            if not super().canInterpolate(node):
-                return False
-            
-            l = len(self.commands)
-            if l != len(node.commands):
-                return False
-
-            for i in range(l):
-                c1 = self.commands[i]
-                c2 = node.commands[i]
+            self.operations.append(77)
+            self.values.extend((x, y))
+            self.offsets.append(len(self.values))
 
-                if c1.operation != c2.operation:
-                    return False
+            if closed:
+                self.operations.append(90)
+                self.offsets.append(len(self.values))
 
-            return True
-        
-        def interpolate(self, node, steps):
-            '''
-            Return list of interpolation between current node a1nd given node
+        def appendCommand(self, operation, values = ()):
+            """
+            Append a command.
 
             Parameters
-            -----------
-            node: Node
-                Interpreation limit node
-            steps: int
-                Number of interpretations between current node and given node
-            '''
-            intr = super().interpolate(node, steps)
-
-            for i, path in enumerate(intr):
-                path = intr[i]
-                p = (i + 1) / (steps + 1)
-                
-                for c, command in enumerate(path.commands):
-                    values = command.values
+            ----------
+            operation : str
+                Command operation
+            values : float[]
+                Command values
+            """
+            self.operations.append(ord(operation))
+            self.values.extend(values)
+            self.offsets.append(len(self.values))
 
-                    command.values = []
-                    for v, v1 in enumerate(values):
-                        v2 = node.commands[c].values[v]
-                        command.values.append((v2 - v1) * p + v1)
+        @classmethod
+        def resampled(cls, data1, data2, engine):
+            """
+            Get two cubic paths with the same commands from two cubic
+            paths with the same subpaths count. The subpath with less
+            curves of each subpath pair is split, spreading extra
+            curves by curve length.
 
+            Parameters
+            ----------
+            data1 : PathData
+                First cubic path
+            data2 : PathData
+                Second cubic path
+            engine : Engine.Python
+                Interpolation engine
+            """
+            subpaths1 = data1.subpaths()
+            subpaths2 = data2.subpaths()
+            if len(subpaths1) != len(subpaths2):
+                raise RuntimeError('Cannot resample paths with a different subpath count')
 
-            return intr
+            new1 = cls()
+            new2 = cls()
+            for (start1, stop1), (start2, stop2) in zip(subpaths1, subpaths2):
+                closed = data1.operations[stop1 - 1] == 90
+                if closed != (data2.operations[stop2 - 1] == 90):
+                    raise RuntimeError('Cannot resample a closed path with an open path')
 
-        
-        def stringAttributes(self): 
-            """Get list of overrided attributes by toString()"""
-            attr = super().stringAttributes()
-            attr['d'] = ''
+                curves1 = data1.curves(start1, stop1)
+                curves2 = data2.curves(start2, stop2)
+                n = (max(len(curves1), len(curves2)) - 2) // 6
+                new1.appendCurves(curves1, n, closed, engine)
+                new2.appendCurves(curves2, n, closed, engine)
 
-            for command in self.commands:
-                attr['d'] += command.toString()
+            return new1, new2
 
-            return attr
+        def appendCurves(self, curves, n, closed, engine):
+            """
+            Append a subpath of n curves from a subpath curves.
 
+            Parameters
+            ----------
+            curves : float[]
+                Source subpath chained curves
+            n : int
+                Number of curves
+            closed : bool
+                Close the subpath
+            engine : Engine.Python
+                Interpolation engine
+            """
+            if len(curves) == 2:
+                # Single point subpath: degenerated curves on the point
+                curves = curves + curves * 3 * n
+            elif (len(curves) - 2) // 6 < n:
+                curves = engine.resampleCurves(curves, n)
 
-# Svg file
-class Svg:
-    """
-    SVG file
+            self.operations.append(77)
+            self.operations += b'C' * n
+            self.offsets.append(len(self.values) + 2)
+            self.offsets.extend(range(len(self.values) + 8, len(self.values) + len(curves) + 1, 6))
+            self.values.extend(curves)
 
-    Properties
-    ----------
-    children : Node[]
-        SVG children nodes
-    el : ET.Element
-        DOM Element
-    """
+            if closed:
+                self.operations.append(90)
+                self.offsets.append(len(self.values))
 
+        def aligned(self, data, engine):
+            """
+            Get the cubic path with each closed subpath rotated on
+            another start point, and reversed if needed, to get the
+            lowest sum of squared point distances with the matching
+            subpath of a cubic path with the same commands. The path
+            is returned if nothing changed.
+
+            Parameters
+            ----------
+            data : PathData
+                Cubic path to match
+            engine : Engine.Python
+                Interpolation engine
+            """
+            values = None
+            for start, stop in self.subpaths():
+                if self.operations[stop - 1] != 90 or stop - start < 3:
+                    continue
+
+                # Closed subpaths curves points end on the start point
+                first = self.offsets[start] + 2
+                last = self.offsets[stop]
+                shift, reverse = engine.alignment(data.values[first:last].tolist(), self.values[first:last].tolist(), 3)
+                if not shift and not reverse:
+                    continue
+
+                if values is None:
+                    values = array('d', self.values)
+                points = self.values[first:last].tolist()
+                if reverse:
+                    points = Engine.Python.reversedPoints(points)
+                points = points[shift * 2:] + points[:shift * 2]
+                values[first - 2:last] = array('d', points[-2:] + points)
+
+            return self if values is None else self.withValues(values)
+
+        def transformed(self, matrix, engine):
+            """
+            Get the path with its coordinates transformed by an affine
+            matrix. Paths with commands other than absolute M, L, C, S,
+            Q, T and Z are converted to cubic Bézier curves first.
+
+            Parameters
+            ----------
+            matrix : float[]
+                (a, b, c, d, e, f) affine matrix
+            engine : Engine.Python
+                Interpolation engine
+            """
+            data = self.cubic() if self.operations.translate(None, b'MLCSQTZ') else self
+
+            return data.withValues(engine.transformPoints(data.values, matrix))
+
+        def withValues(self, values):
+            """
+            Get a geometry with the same commands and the given values.
+
+            Parameters
+            ----------
+            values : float[]
+                New values, with the same length as current values
+            """
+            new = self.__class__.__new__(self.__class__)
+            new.operations = self.operations
+            new.offsets = self.offsets
+            new.values = values if type(values) == array else array('d', values)
+
+            return new
+
+        def toString(self, number = str):
+            """
+            Path d attribute string
+
+            Parameters
+            ----------
+            number : callable
+                Number formatter
+            """
+            values = list(map(number, self.values))
+            offsets = self.offsets
+
+            s = []
+            for i, operation in enumerate(self.operations.decode('ascii')):
+                s.append(operation)
+                if offsets[i] < offsets[i + 1]:
+                    s.append(' ')
+                    s.append(' '.join(values[offsets[i]:offsets[i + 1]]))
+
+            return ''.join(s)
+
+    # "transform" attribute
+    class Transform:
+        """ 
+        Transform attributes
+
+        Transform lists are interpolated as one affine matrix,
+        decomposed into translation, rotation, scale and skew.
+
+        Attributes
+        ----------
+        operation : str
+            Transform operation
+        values : float[]
+            Transform operation values
+
+        Methods
+        -------
+        matrix() : float[]
+            Get the transform (a, b, c, d, e, f) affine matrix.
+        composed(transforms: Transform[]) : float[]
+            Get the affine matrix of a transform list.
+        decompose(matrix: float[]) : float[]
+            Decompose an affine matrix.
+        compose(values: float[]) : float[]
+            Get the affine matrix of a decomposition.
+        """
+        # Transform values numbers
+        number = re.compile(r'[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?')
+
+        # Identity affine matrix
+        identity = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+        def __init__(self, s = None):
+            """
+            Paremeters
+            ==========
+            s : string
+               Transform attribute value
+            """
+            self.operation = None
+            self.values = []
+
+            if s:
+                m = re.search(r'^\s*([a-zA-Z_][a-zA-Z0-9_]*)\(?([^\)]*)\)?', s)
+                self.operation = m[1]
+                if m[2]:
+                    for v in self.number.findall(m[2]):
+                        self.values.append(float(v))
+        
+        def clone(self):
+            """Clone transform operation"""
+            new = self.__class__()
+            new.operation = self.operation
+            new.values = list(self.values)
+
+            return new
+        
+        def interpolated(self, transform, p):
+            """
+            Get interpolated transform. Translations are interpolated
+            as translations, other transforms as decomposed matrices.
+
+            Parameters
+            =========
+            transform : Transform
+                Interpolation final transform
+            p: float
+                Interpolation factor
+            """
+            m1 = self.matrix()
+            m2 = transform.matrix()
+
+            intp = self.__class__()
+            if m1[:4] == m2[:4] == list(self.identity[:4]):
+                intp.operation = 'translate'
+                intp.values = [(v2 - v1) * p + v1 for v1, v2 in zip(m1[4:], m2[4:])]
+            else:
+                d1, d2 = self.decomposedPair(m1, m2)
+                intp.operation = 'matrix'
+                intp.values = self.compose([(v2 - v1) * p + v1 for v1, v2 in zip(d1, d2)])
+
+            return intp
+
+        def matrix(self):
+            """Get the transform (a, b, c, d, e, f) affine matrix"""
+            v = self.values
+            if self.operation == 'matrix':
+                return (list(v) + [0.0] * 6)[:6]
+            if self.operation == 'translate':
+                return [1.0, 0.0, 0.0, 1.0, v[0] if len(v) > 0 else 0.0, v[1] if len(v) > 1 else 0.0]
+            if self.operation == 'scale':
+                sx = v[0] if len(v) > 0 else 1.0
+                return [sx, 0.0, 0.0, v[1] if len(v) > 1 else sx, 0.0, 0.0]
+            if self.operation == 'rotate':
+                a = math.radians(v[0] if len(v) > 0 else 0.0)
+                cos, sin = math.cos(a), math.sin(a)
+                cx = v[1] if len(v) > 2 else 0.0
+                cy = v[2] if len(v) > 2 else 0.0
+                # Rotation around (cx, cy)
+                return [cos, sin, -sin, cos, cx - cos * cx + sin * cy, cy - sin * cx - cos * cy]
+            if self.operation == 'skewX':
+                return [1.0, 0.0, math.tan(math.radians(v[0] if v else 0.0)), 1.0, 0.0, 0.0]
+            if self.operation == 'skewY':
+                return [1.0, math.tan(math.radians(v[0] if v else 0.0)), 0.0, 1.0, 0.0, 0.0]
+
+            raise RuntimeError(f'Unknown transform operation "{self.operation}"')
+
+        @staticmethod
+        def multiply(m1, m2):
+            """
+            Get the product of two affine matrices.
+
+            Parameters
+            ----------
+            m1 : float[]
+                (a, b, c, d, e, f) left matrix
+            m2 : float[]
+                (a, b, c, d, e, f) right matrix
+            """
+            a1, b1, c1, d1, e1, f1 = m1
+            a2, b2, c2, d2, e2, f2 = m2
+
+            return [
+                a1 * a2 + c1 * b2,
+                b1 * a2 + d1 * b2,
+                a1 * c2 + c1 * d2,
+                b1 * c2 + d1 * d2,
+                a1 * e2 + c1 * f2 + e1,
+                b1 * e2 + d1 * f2 + f1,
+            ]
+
+        @classmethod
+        def composed(cls, transforms):
+            """
+            Get the affine matrix of a transform list.
+
+            Parameters
+            ----------
+            transforms : Transform[]
+                Transform list, applied from the last one
+            """
+            if len(transforms) == 1:
+                return transforms[0].matrix()
+
+            matrix = list(cls.identity)
+            for transform in transforms:
+                matrix = cls.multiply(matrix, transform.matrix())
+
+            return matrix
+
+        @staticmethod
+        def decompose(matrix):
+            """
+            Decompose an affine matrix into its (tx, ty, rotation, sx,
+            sy, skew) values: matrix is translate(tx, ty) rotate(rotation)
+            scale(sx, sy) and a skew shearing x by skew times y.
+            Reflections are kept as negative x scale.
+
+            Parameters
+            ----------
+            matrix : float[]
+                (a, b, c, d, e, f) affine matrix
+            """
+            a, b, c, d, e, f = matrix
+
+            sx = math.hypot(a, b)
+            if not sx:
+                # Null first column: only y scale and rotation remain
+                return [e, f, math.atan2(-c, d), 0.0, math.hypot(c, d), 0.0]
+
+            if a * d - b * c < 0:
+                sx = -sx
+            cos = a / sx
+            sin = b / sx
+
+            return [e, f, math.atan2(sin, cos), sx, cos * d - sin * c, (cos * c + sin * d) / sx]
+
+        @staticmethod
+        def compose(values):
+            """
+            Get the affine matrix of a decomposition.
+
+            Parameters
+            ----------
+            values : float[]
+                (tx, ty, rotation, sx, sy, skew) values, as returned by
+                decompose()
+            """
+            tx, ty, rotation, sx, sy, skew = values
+            cos, sin = math.cos(rotation), math.sin(rotation)
+
+            return [sx * cos, sx * sin, cos * sx * skew - sin * sy, sin * sx * skew + cos * sy, tx, ty]
+
+        @classmethod
+        def decomposedPair(cls, m1, m2):
+            """
+            Decompose two affine matrices to interpolate, with rotations
+            taking the shortest way.
+
+            Parameters
+            ----------
+            m1 : float[]
+                (a, b, c, d, e, f) interpolation start matrix
+            m2 : float[]
+                (a, b, c, d, e, f) interpolation end matrix
+            """
+            d1, d2 = cls.decomposedKeys([m1, m2])
+
+            return d1, d2
+
+        @classmethod
+        def decomposedKeys(cls, matrices):
+            """
+            Decompose keyframes affine matrices to interpolate, with
+            rotations taking the shortest way from one keyframe to the
+            next one.
+
+            Parameters
+            ----------
+            matrices : float[][]
+                (a, b, c, d, e, f) keyframes matrices
+            """
+            keys = [cls.decompose(matrix) for matrix in matrices]
+            for previous, key in zip(keys, keys[1:]):
+                key[2] -= 2 * math.pi * round((key[2] - previous[2]) / (2 * math.pi))
+
+            return keys
+
+        def toString(self, number = str):
+            """
+            Transform string
+
+            Parameters
+            ----------
+            number : callable
+                Number formatter
+            """
+            return self.operation + '(' + ', '.join(map(number, self.values)) + ')'
+        
+        def translateToMatrix(self, trans):
+            """
+            Transform a translate transform into a matrix transform
+
+            Parameters
+            ----------
+            trans: Transform
+              Translate operation
+            """
+            if trans.operation == 'translate':
+                matrix = self.__class__()
+                matrix.operation = 'matrix'
+                matrix.values = trans.matrix()
+
+                return matrix
+
+            return trans
+
+    # "style" attribute
+    class Style:
+        """
+        Style attribute declarations. The last parsed declarations are
+        cached by style string, as shapes often share the same style.
+
+        Methods
+        -------
+        parse(s: str) : dict
+            Get the declarations of a style attribute.
+        toString(declarations: dict) : str
+            Get the style attribute of declarations.
+        """
+        @staticmethod
+        @functools.lru_cache(maxsize = 1024)
+        def parse(s):
+            """
+            Get the name -> value declarations of a style attribute.
+            Returned declarations are shared and must not be modified.
+
+            Parameters
+            ----------
+            s : str
+                Style attribute value
+            """
+            declarations = {}
+            for declaration in s.split(';'):
+                name, _, value = declaration.partition(':')
+                if value.strip():
+                    declarations[name.strip()] = value.strip()
+
+            return declarations
+
+        @staticmethod
+        def toString(declarations):
+            """
+            Get the style attribute of declarations.
+
+            Parameters
+            ----------
+            declarations : dict
+                Name -> value declarations
+            """
+            return ';'.join(f'{name}:{value}' for name, value in declarations.items())
+
+    # Paint properties
+    class Paint:
+        """
+        Interpolated paint properties. Colors are interpolated in
+        linear-light RGB, widths and opacities as numbers with their
+        unit.
+
+        A paint value is a (kind, values, unit) tuple, kind being
+        "color" or "number". The last parsed values are cached by
+        property value string.
+
+        Methods
+        -------
+        parse(name: str, s: str) : tuple|None
+            Get a property paint value.
+        toString(value: tuple, number: callable) : str
+            Get a paint value string.
+        """
+        # Interpolated properties kind
+        properties = {
+            'fill': 'color',
+            'stroke': 'color',
+            'stroke-width': 'number',
+            'opacity': 'number',
+            'fill-opacity': 'number',
+            'stroke-opacity': 'number',
+        }
+
+        # Basic color keywords
+        keywords = {
+            'black': '#000000', 'silver': '#c0c0c0', 'gray': '#808080', 'white': '#ffffff',
+            'maroon': '#800000', 'red': '#ff0000', 'purple': '#800080', 'fuchsia': '#ff00ff',
+            'green': '#008000', 'lime': '#00ff00', 'olive': '#808000', 'yellow': '#ffff00',
+            'navy': '#000080', 'blue': '#0000ff', 'teal': '#008080', 'aqua': '#00ffff',
+        }
+
+        # Number with unit
+        numberUnit = re.compile(r'\s*([-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?)\s*([a-zA-Z%]*)\s*')
+
+        # rgb() color
+        rgb = re.compile(r'\s*rgb\(\s*([^,\s]+)\s*,?\s*([^,\s]+)\s*,?\s*([^,\s\)]+)\s*\)\s*')
+
+        @classmethod
+        def parse(cls, name, s):
+            """
+            Get a property (kind, values, unit) paint value, or None if
+            the value cannot be interpolated, as "none" or gradients.
+
+            Parameters
+            ----------
+            name : str
+                Property name
+            s : str
+                Property value
+            """
+            return cls.parseValue(cls.properties[name], s)
+
+        @staticmethod
+        @functools.lru_cache(maxsize = 1024)
+        def parseValue(kind, s):
+            """
+            Get a (kind, values, unit) paint value of a kind, or None.
+
+            Parameters
+            ----------
+            kind : str
+                "color" or "number"
+            s : str
+                Property value
+            """
+            if kind == 'color':
+                rgb = Attribute.Paint.color(s)
+                return ('color', tuple(Attribute.Paint.toLinear(c) for c in rgb), '') if rgb else None
+
+            m = Attribute.Paint.numberUnit.fullmatch(s)
+
+            return ('number', (float(m[1]),), m[2]) if m else None
+
+        @classmethod
+        def color(cls, s):
+            """
+            Get the (r, g, b) sRGB components, from 0 to 1, of a color
+            value, or None for other paints.
+
+            Parameters
+            ----------
+            s : str
+                Color value: #rgb, #rrggbb, rgb() or basic keyword
+            """
+            s = cls.keywords.get(s.strip().lower(), s.strip())
+            if s.startswith('#') and len(s) in (4, 7):
+                try:
+                    if len(s) == 4:
+                        return tuple(int(c * 2, 16) / 255 for c in s[1:])
+                    return tuple(int(s[i:i + 2], 16) / 255 for i in (1, 3, 5))
+                except ValueError:
+                    return None
+
+            m = cls.rgb.fullmatch(s)
+            if m:
+                try:
+                    return tuple(
+                        min(max(float(c[:-1]) / 100 if c.endswith('%') else float(c) / 255, 0.0), 1.0)
+                        for c in m.groups()
+                    )
+                except ValueError:
+                    return None
+
+            return None
+
+        @staticmethod
+        def toLinear(c):
+            """Get the linear-light value of a sRGB component"""
+            return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+        @staticmethod
+        def toSrgb(c):
+            """Get the sRGB value of a linear-light component"""
+            c = min(max(c, 0.0), 1.0)
+            return c * 12.92 if c <= 0.0031308 else 1.055 * c ** (1 / 2.4) - 0.055
+
+        @classmethod
+        def toString(cls, value, number = str):
+            """
+            Get a paint value string.
+
+            Parameters
+            ----------
+            value : tuple
+                (kind, values, unit) paint value
+            number : callable
+                Number formatter
+            """
+            kind, values, unit = value
+            if kind == 'color':
+                return '#' + ''.join('%02x' % round(cls.toSrgb(c) * 255) for c in values)
+
+            return number(values[0]) + unit
+
+# Engine namespace
+class Engine:
+    """
+    ---------------------------------------------
+    |          Interpolation engines            |
+    ---------------------------------------------
+    """
+
+    # Pure python engine
+    class Python:
+        """
+        Pure python interpolation engine.
+
+        Interpolated values are given as a matrix with one row per
+        interpolation step and one column per interpolated value.
+
+        Methods
+        -------
+        lerp(start: float[], end: float[], ps: float[]): matrix
+            Linear interpolation of start to end values for each p.
+        rows(matrix): float[][]
+            Get matrix rows as python float lists.
+        interpolate(start: float[], end: float[], ps: float[], transforms: int[]): matrix
+            Linear interpolation with decomposed transforms composed back.
+        spline(keys: float[][], ps: float[]): matrix
+            Catmull-Rom spline interpolation through keyframes values.
+        resampleCurves(curves: float[], n: int): float[]
+            Split cubic Bézier curves into n curves.
+        alignment(points1: float[], points2: float[], stride: int): tuple
+            Get the best rotation of a closed point sequence.
+        assignment(costs: float[][]): int[]
+            Get the minimal cost assignment of a cost matrix.
+        """
+        name = 'python'
+
+        # Number of chords used to estimate curves length
+        samples = 16
+
+        def lerp(self, start, end, ps):
+            """
+            Get linear interpolation matrix.
+
+            Parameters
+            ----------
+            start : float[]
+                Interpolation start values
+            end : float[]
+                Interpolation end values
+            ps : float[]
+                Interpolation factors, one by step
+            """
+            values = list(zip(start, end))
+            return [[(v2 - v1) * p + v1 for v1, v2 in values] for p in ps]
+
+        def rows(self, matrix):
+            """Get matrix rows as lists of floats"""
+            return matrix
+
+        def interpolate(self, start, end, ps, transforms = ()):
+            """
+            Get interpolation matrix, with decomposed transform matrices
+            composed back.
+
+            Parameters
+            ----------
+            start : float[]
+                Interpolation start values
+            end : float[]
+                Interpolation end values
+            ps : float[]
+                Interpolation factors, one by step
+            transforms : int[]
+                Positions of the decomposed matrices in values
+            """
+            return self.composeTransforms(self.lerp(start, end, ps), transforms)
+
+        def spline(self, keys, ps):
+            """
+            Get Catmull-Rom spline interpolation matrix through
+            keyframes values. The spline is extended beyond the first
+            and the last keyframes by linear extrapolation, so two
+            keyframes give a linear interpolation.
+
+            Parameters
+            ----------
+            keys : float[][]
+                Keyframes values, one list by keyframe
+            ps : float[]
+                Interpolation factors, one by step, from 0 (first
+                keyframe) to the keyframes count - 1 (last keyframe)
+            """
+            last = len(keys) - 1
+            points = [[2 * a - b for a, b in zip(keys[0], keys[1])]] + list(keys) + [[2 * a - b for a, b in zip(keys[-1], keys[-2])]]
+
+            matrix = []
+            for p in ps:
+                span = min(int(p), last - 1)
+                w0, w1, w2, w3 = self.splineWeights(p - span)
+                matrix.append([
+                    w0 * v0 + w1 * v1 + w2 * v2 + w3 * v3
+                    for v0, v1, v2, v3 in zip(*points[span:span + 4])
+                ])
+
+            return matrix
+
+        @staticmethod
+        def splineWeights(u):
+            """
+            Get the 4 control points weights of a uniform Catmull-Rom
+            spline span.
+
+            Parameters
+            ----------
+            u : float|numpy.ndarray
+                Position in the span, from 0 to 1
+            """
+            u2 = u * u
+            u3 = u2 * u
+
+            return (
+                (-u3 + 2 * u2 - u) / 2,
+                (3 * u3 - 5 * u2 + 2) / 2,
+                (-3 * u3 + 4 * u2 + u) / 2,
+                (u3 - u2) / 2,
+            )
+
+        def composeTransforms(self, matrix, transforms):
+            """
+            Replace decomposed transform matrices of an interpolation
+            matrix by their affine matrix.
+
+            Parameters
+            ----------
+            matrix : matrix
+                Interpolation matrix
+            transforms : int[]
+                Positions of the (tx, ty, rotation, sx, sy, skew)
+                decompositions in rows
+            """
+            for row in matrix:
+                for i in transforms:
+                    row[i:i + 6] = Attribute.Transform.compose(row[i:i + 6])
+
+            return matrix
+
+        def curveLengths(self, curves):
+            """
+            Estimate cubic Bézier curves lengths from sampled chords.
+
+            Parameters
+            ----------
+            curves : float[]
+                Chained curves: start point then 6 values by curve, as
+                the values of a "M x y C ... C ..." path.
+            """
+            ts = [i / self.samples for i in range(1, self.samples + 1)]
+            weights = [((1 - t) ** 3, 3 * t * (1 - t) ** 2, 3 * t * t * (1 - t), t ** 3) for t in ts]
+
+            lengths = []
+            for c in range(2, len(curves), 6):
+                x0, y0, x1, y1, x2, y2, x3, y3 = curves[c - 2:c + 6]
+                length = 0.0
+                px = x0
+                py = y0
+                for w0, w1, w2, w3 in weights:
+                    x = w0 * x0 + w1 * x1 + w2 * x2 + w3 * x3
+                    y = w0 * y0 + w1 * y1 + w2 * y2 + w3 * y3
+                    length += ((x - px) ** 2 + (y - py) ** 2) ** 0.5
+                    px = x
+                    py = y
+                lengths.append(length)
+
+            return lengths
+
+        def distribute(self, lengths, n):
+            """
+            Get the number of pieces of each curve to get n curves,
+            spreading pieces by curve length. Each curve has at least
+            one piece.
+
+            Parameters
+            ----------
+            lengths : float[]
+                Curves lengths
+            n : int
+                Total number of pieces, not lower than curves count
+            """
+            total = sum(lengths)
+            if not total:
+                lengths = [1.0] * len(lengths)
+                total = float(len(lengths))
+
+            extra = n - len(lengths)
+            shares = [extra * l / total for l in lengths]
+            counts = [1 + int(share) for share in shares]
+
+            # Give remaining pieces to the largest share remainders
+            remaining = n - sum(counts)
+            order = sorted(range(len(shares)), key = lambda i: int(shares[i]) - shares[i])
+            for i in order[:remaining]:
+                counts[i] += 1
+
+            return counts
+
+        def splitCurves(self, curves, counts):
+            """
+            Split each cubic Bézier curve into counts[i] curves of same
+            parameter length.
+
+            Parameters
+            ----------
+            curves : float[]
+                Chained curves: start point then 6 values by curve
+            counts : int[]
+                Number of pieces of each curve
+            """
+            new = list(curves[:2])
+            for i, k in enumerate(counts):
+                x0, y0, x1, y1, x2, y2, x3, y3 = curves[i * 6:i * 6 + 8]
+                for j in range(k):
+                    a = j / k
+                    b = (j + 1) / k
+                    for t1, t2, t3 in ((a, a, b), (a, b, b), (b, b, b)):
+                        w0, w1, w2, w3 = Engine.Python.blossom(t1, t2, t3)
+                        new.append(w0 * x0 + w1 * x1 + w2 * x2 + w3 * x3)
+                        new.append(w0 * y0 + w1 * y1 + w2 * y2 + w3 * y3)
+
+            return new
+
+        def resampleCurves(self, curves, n):
+            """
+            Split cubic Bézier curves to get n curves, spreading extra
+            curves by curve length.
+
+            Parameters
+            ----------
+            curves : float[]
+                Chained curves: start point then 6 values by curve
+            n : int
+                Number of curves, not lower than curves count
+            """
+            return self.splitCurves(curves, self.distribute(self.curveLengths(curves), n))
+
+        def correlation(self, points1, points2):
+            """
+            Get the circular cross-correlation of two point sequences:
+            sum of the dot products of points1[i] and points2[i + k]
+            for each shift k, computed by FFT.
+
+            Parameters
+            ----------
+            points1 : float[]
+                Flat x, y points list
+            points2 : float[]
+                Flat x, y points list, with the same length
+            """
+            n = len(points1) // 2
+            size = 1 << (2 * n - 1).bit_length()
+
+            # Second sequence is repeated so the zero-padded correlation
+            # is circular for shifts lower than n.
+            a = [complex(x, y) for x, y in zip(points1[0::2], points1[1::2])]
+            b = [complex(x, y) for x, y in zip(points2[0::2], points2[1::2])]
+            fa = self.fft(a + [0j] * (size - n))
+            fb = self.fft(b + b + [0j] * (size - 2 * n))
+
+            c = self.fft([u.conjugate() * v for u, v in zip(fa, fb)], True)
+
+            return [v.real / size for v in c[:n]]
+
+        def alignment(self, points1, points2, stride = 1):
+            """
+            Get the (shift, reverse) rotation of a closed point sequence
+            with the lowest sum of squared distances to another one.
+
+            Parameters
+            ----------
+            points1 : float[]
+                Flat x, y points list
+            points2 : float[]
+                Flat x, y points list to rotate, with the same length
+            stride : int
+                Shifts are multiples of stride points
+            """
+            # Sums of squared distances only differ by the correlation
+            direct = self.correlation(points1, points2)
+            reverse = self.correlation(points1, self.reversedPoints(points2))
+            best = (0, False)
+            score = direct[0]
+            tolerance = 1e-9 * (sum(v * v for v in points1) + sum(v * v for v in points2))
+            for correlation, reversed in ((direct, False), (reverse, True)):
+                for shift in range(0, len(correlation), stride):
+                    if correlation[shift] > score + tolerance:
+                        best = (shift, reversed)
+                        score = correlation[shift]
+
+            return best
+
+        def subpathCosts(self, features1, features2):
+            """
+            Get the subpaths matching cost matrix: squared distance of
+            their mean point and of their size. Matching open and
+            closed subpaths costs more than any other assignment.
+
+            Parameters
+            ----------
+            features1 : tuple[]
+                Subpaths (x, y, size, closed) features
+            features2 : tuple[]
+                Subpaths (x, y, size, closed) features
+            """
+            costs = [
+                [(x1 - x2) ** 2 + (y1 - y2) ** 2 + (s1 - s2) ** 2 for x2, y2, s2, _ in features2]
+                for x1, y1, s1, _ in features1
+            ]
+            penalty = (max((max(row) for row in costs), default=0.0) + 1) * (len(costs) + 1)
+            for i, (_, _, _, closed1) in enumerate(features1):
+                for j, (_, _, _, closed2) in enumerate(features2):
+                    if closed1 != closed2:
+                        costs[i][j] += penalty
+
+            return costs
+
+        def assignment(self, costs):
+            """
+            Get the minimal cost assignment of a (n, m) cost matrix
+            with n <= m by the Hungarian algorithm, in O(n² m): the
+            column assigned to each row.
+
+            Parameters
+            ----------
+            costs : float[][]
+                Cost matrix
+            """
+            n = len(costs)
+            m = len(costs[0]) if n else 0
+            inf = float('inf')
+
+            # Row and column potentials, column rows (1-based, 0 for
+            # none) and augmenting path previous columns.
+            u = [0.0] * (n + 1)
+            v = [0.0] * (m + 1)
+            rows = [0] * (m + 1)
+            way = [0] * (m + 1)
+            for i in range(1, n + 1):
+                rows[0] = i
+                j0 = 0
+                minv = [inf] * (m + 1)
+                used = [False] * (m + 1)
+                while rows[j0]:
+                    used[j0] = True
+                    i0 = rows[j0]
+                    row = costs[i0 - 1]
+                    delta = inf
+                    j1 = 0
+                    for j in range(1, m + 1):
+                        if not used[j]:
+                            cur = row[j - 1] - u[i0] - v[j]
+                            if cur < minv[j]:
+                                minv[j] = cur
+                                way[j] = j0
+                            if minv[j] < delta:
+                                delta = minv[j]
+                                j1 = j
+                    for j in range(m + 1):
+                        if used[j]:
+                            u[rows[j]] += delta
+                            v[j] -= delta
+                        else:
+                            minv[j] -= delta
+                    j0 = j1
+
+                # Augment along the path
+                while j0:
+                    j1 = way[j0]
+                    rows[j0] = rows[j1]
+                    j0 = j1
+
+            matches = [None] * n
+            for j in range(1, m + 1):
+                if rows[j]:
+                    matches[rows[j] - 1] = j - 1
+
+            return matches
+
+        def transformPoints(self, values, matrix):
+            """
+            Get points transformed by an affine matrix.
+
+            Parameters
+            ----------
+            values : float[]
+                Flat x, y points list
+            matrix : float[]
+                (a, b, c, d, e, f) affine matrix
+            """
+            a, b, c, d, e, f = matrix
+            new = []
+            for x, y in zip(values[0::2], values[1::2]):
+                new.append(a * x + c * y + e)
+                new.append(b * x + d * y + f)
+
+            return new
+
+        @staticmethod
+        def reversedPoints(points):
+            """
+            Get a closed point sequence of cubic curves ending on its
+            start point in the reverse direction, with the same start
+            point.
+
+            Parameters
+            ----------
+            points : float[]
+                Flat x, y points list
+            """
+            pairs = list(zip(points[0::2], points[1::2]))
+            pairs = pairs[-2::-1] + pairs[-1:]
+
+            return [v for pair in pairs for v in pair]
+
+        @staticmethod
+        def fft(values, inverse = False):
+            """
+            Unscaled radix-2 fast Fourier transform.
+
+            Parameters
+            ----------
+            values : complex[]
+                Values, with a power of two length
+            inverse : bool
+                Compute the inverse transform
+            """
+            n = len(values)
+            values = list(values)
+
+            # Bit reversal permutation
+            j = 0
+            for i in range(1, n):
+                bit = n >> 1
+                while j & bit:
+                    j ^= bit
+                    bit >>= 1
+                j |= bit
+                if i < j:
+                    values[i], values[j] = values[j], values[i]
+
+            sign = 1 if inverse else -1
+            size = 2
+            while size <= n:
+                half = size // 2
+                twiddles = [complex(math.cos(sign * 2 * math.pi * k / size), math.sin(sign * 2 * math.pi * k / size)) for k in range(half)]
+                for start in range(0, n, size):
+                    for k in range(half):
+                        u = values[start + k]
+                        v = values[start + k + half] * twiddles[k]
+                        values[start + k] = u + v
+                        values[start + k + half] = u - v
+                size *= 2
+
+            return values
+
+        @staticmethod
+        def blossom(t1, t2, t3):
+            """
+            Get the control point weights of a cubic Bézier curve
+            blossom B(t1, t2, t3).
+            """
+            return (
+                (1 - t1) * (1 - t2) * (1 - t3),
+                t1 * (1 - t2) * (1 - t3) + (1 - t1) * t2 * (1 - t3) + (1 - t1) * (1 - t2) * t3,
+                t1 * t2 * (1 - t3) + t1 * (1 - t2) * t3 + (1 - t1) * t2 * t3,
+                t1 * t2 * t3,
+            )
+
+    # Numpy engine
+    class Numpy(Python):
+        """
+        Numpy interpolation engine.
+
+        All the steps are computed in one (steps, values) broadcast
+        operation.
+        """
+        name = 'numpy'
+
+        def lerp(self, start, end, ps):
+            """
+            Get linear interpolation matrix.
+
+            Parameters
+            ----------
+            start : float[]
+                Interpolation start values
+            end : float[]
+                Interpolation end values
+            ps : float[]
+                Interpolation factors, one by step
+            """
+            start = numpy.asarray(start, dtype=numpy.float64)
+            end = numpy.asarray(end, dtype=numpy.float64)
+            ps = numpy.asarray(ps, dtype=numpy.float64)
+
+            return (end - start)[numpy.newaxis, :] * ps[:, numpy.newaxis] + start[numpy.newaxis, :]
+
+        def rows(self, matrix):
+            """Get matrix rows as lists of floats"""
+            return matrix.tolist()
+
+        def spline(self, keys, ps):
+            """
+            Get Catmull-Rom spline interpolation matrix through
+            keyframes values, all steps of all spans being evaluated in
+            one operation on the stacked (keys, values) array.
+
+            Parameters
+            ----------
+            keys : float[][]
+                Keyframes values, one list by keyframe
+            ps : float[]
+                Interpolation factors, one by step, from 0 (first
+                keyframe) to the keyframes count - 1 (last keyframe)
+            """
+            keys = numpy.asarray(keys, dtype=numpy.float64)
+            ps = numpy.asarray(ps, dtype=numpy.float64)
+            points = numpy.concatenate([2 * keys[:1] - keys[1:2], keys, 2 * keys[-1:] - keys[-2:-1]])
+
+            span = numpy.minimum(ps.astype(numpy.int64), len(keys) - 2)
+            weights = self.splineWeights(ps - span)
+
+            return sum(w[:, numpy.newaxis] * points[span + k] for k, w in enumerate(weights))
+
+        def composeTransforms(self, matrix, transforms):
+            """
+            Replace decomposed transform matrices of an interpolation
+            matrix by their affine matrix, for all steps and transforms
+            at once.
+
+            Parameters
+            ----------
+            matrix : numpy.ndarray
+                (steps, values) interpolation matrix
+            transforms : int[]
+                Positions of the (tx, ty, rotation, sx, sy, skew)
+                decompositions in rows
+            """
+            if not len(transforms):
+                return matrix
+
+            i = numpy.asarray(transforms)
+            tx, ty, rotation, sx, sy, skew = (matrix[:, i + k] for k in range(6))
+            cos = numpy.cos(rotation)
+            sin = numpy.sin(rotation)
+
+            matrix[:, i] = sx * cos
+            matrix[:, i + 1] = sx * sin
+            matrix[:, i + 2] = cos * sx * skew - sin * sy
+            matrix[:, i + 3] = sin * sx * skew + cos * sy
+            matrix[:, i + 4] = tx
+            matrix[:, i + 5] = ty
+
+            return matrix
+
+        def curveLengths(self, curves):
+            """
+            Estimate cubic Bézier curves lengths from sampled chords.
+
+            Parameters
+            ----------
+            curves : float[]
+                Chained curves: start point then 6 values by curve
+            """
+            points = self.curvePoints(curves)
+            t = numpy.linspace(0.0, 1.0, self.samples + 1)
+            weights = numpy.stack([(1 - t) ** 3, 3 * t * (1 - t) ** 2, 3 * t * t * (1 - t), t ** 3], axis=1)
+
+            # (curves, samples, 2) sampled points
+            sampled = numpy.einsum('sk,ckd->csd', weights, points)
+
+            return numpy.sqrt((numpy.diff(sampled, axis=1) ** 2).sum(axis=2)).sum(axis=1)
+
+        def distribute(self, lengths, n):
+            """
+            Get the number of pieces of each curve to get n curves,
+            spreading pieces by curve length. Each curve has at least
+            one piece.
+
+            Parameters
+            ----------
+            lengths : float[]
+                Curves lengths
+            n : int
+                Total number of pieces, not lower than curves count
+            """
+            lengths = numpy.asarray(lengths, dtype=numpy.float64)
+            total = lengths.sum()
+            if not total:
+                lengths = numpy.ones(len(lengths))
+                total = float(len(lengths))
+
+            shares = (n - len(lengths)) * lengths / total
+            counts = 1 + numpy.floor(shares).astype(numpy.int64)
+
+            # Give remaining pieces to the largest share remainders
+            remaining = n - int(counts.sum())
+            if remaining > 0:
+                counts[numpy.argsort(numpy.floor(shares) - shares, kind='stable')[:remaining]] += 1
+
+            return counts
+
+        def splitCurves(self, curves, counts):
+            """
+            Split each cubic Bézier curve into counts[i] curves of same
+            parameter length.
+
+            Parameters
+            ----------
+            curves : float[]
+                Chained curves: start point then 6 values by curve
+            counts : int[]
+                Number of pieces of each curve
+            """
+            points = self.curvePoints(curves)
+            counts = numpy.asarray(counts, dtype=numpy.int64)
+
+            # Piece curve and piece index in its curve
+            curve = numpy.repeat(numpy.arange(len(counts)), counts)
+            j = numpy.arange(len(curve)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+            a = j / counts[curve]
+            b = (j + 1) / counts[curve]
+
+            pieces = numpy.empty((len(curve), 3, 2))
+            for i, (t1, t2, t3) in enumerate(((a, a, b), (a, b, b), (b, b, b))):
+                weights = numpy.stack(Engine.Python.blossom(t1, t2, t3), axis=1)
+                pieces[:, i] = numpy.einsum('pk,pkd->pd', weights, points[curve])
+
+            return list(curves[:2]) + pieces.ravel().tolist()
+
+        def correlation(self, points1, points2):
+            """
+            Get the circular cross-correlation of two point sequences:
+            sum of the dot products of points1[i] and points2[i + k]
+            for each shift k, computed by FFT.
+
+            Parameters
+            ----------
+            points1 : float[]
+                Flat x, y points list
+            points2 : float[]
+                Flat x, y points list, with the same length
+            """
+            a = numpy.asarray(points1, dtype=numpy.float64).view(numpy.complex128)
+            b = numpy.asarray(points2, dtype=numpy.float64).view(numpy.complex128)
+
+            return numpy.fft.ifft(numpy.conj(numpy.fft.fft(a)) * numpy.fft.fft(b)).real
+
+        def subpathCosts(self, features1, features2):
+            """
+            Get the subpaths matching cost matrix: squared distance of
+            their mean point and of their size. Matching open and
+            closed subpaths costs more than any other assignment.
+
+            Parameters
+            ----------
+            features1 : tuple[]
+                Subpaths (x, y, size, closed) features
+            features2 : tuple[]
+                Subpaths (x, y, size, closed) features
+            """
+            features1 = numpy.asarray(features1, dtype=numpy.float64).reshape(-1, 4)
+            features2 = numpy.asarray(features2, dtype=numpy.float64).reshape(-1, 4)
+
+            costs = ((features1[:, None, :3] - features2[None, :, :3]) ** 2).sum(axis=2)
+            penalty = ((costs.max() if costs.size else 0.0) + 1) * (len(costs) + 1)
+
+            return costs + penalty * (features1[:, None, 3] != features2[None, :, 3])
+
+        def assignment(self, costs):
+            """
+            Get the minimal cost assignment of a (n, m) cost matrix
+            with n <= m by the Hungarian algorithm, with vectorized
+            column updates: the column assigned to each row.
+
+            Parameters
+            ----------
+            costs : float[][]
+                Cost matrix
+            """
+            costs = numpy.asarray(costs, dtype=numpy.float64)
+            n = len(costs)
+            m = costs.shape[1] if n else 0
+
+            u = numpy.zeros(n + 1)
+            v = numpy.zeros(m + 1)
+            rows = numpy.zeros(m + 1, dtype=numpy.int64)
+            way = numpy.zeros(m + 1, dtype=numpy.int64)
+            for i in range(1, n + 1):
+                rows[0] = i
+                j0 = 0
+                minv = numpy.full(m + 1, numpy.inf)
+                used = numpy.zeros(m + 1, dtype=bool)
+                while rows[j0]:
+                    used[j0] = True
+                    i0 = rows[j0]
+                    free = ~used
+                    free[0] = False
+
+                    cur = numpy.full(m + 1, numpy.inf)
+                    cur[1:] = costs[i0 - 1] - u[i0] - v[1:]
+                    better = free & (cur < minv)
+                    minv[better] = cur[better]
+                    way[better] = j0
+
+                    j1 = int(numpy.argmin(numpy.where(free, minv, numpy.inf)))
+                    delta = minv[j1]
+                    u[rows[used]] += delta
+                    v[used] -= delta
+                    minv[~used] -= delta
+                    j0 = j1
+
+                # Augment along the path
+                while j0:
+                    j1 = way[j0]
+                    rows[j0] = rows[j1]
+                    j0 = j1
+
+            matches = [None] * n
+            for j in numpy.nonzero(rows[1:])[0]:
+                matches[rows[j + 1] - 1] = int(j)
+
+            return matches
+
+        def transformPoints(self, values, matrix):
+            """
+            Get points transformed by an affine matrix.
+
+            Parameters
+            ----------
+            values : float[]
+                Flat x, y points list
+            matrix : float[]
+                (a, b, c, d, e, f) affine matrix
+            """
+            a, b, c, d, e, f = matrix
+            points = numpy.asarray(values, dtype=numpy.float64).reshape(-1, 2)
+
+            return (points @ numpy.array([[a, b], [c, d]]) + numpy.array([e, f])).ravel().tolist()
+
+        @staticmethod
+        def curvePoints(curves):
+            """
+            Get the (curves, 4, 2) control points array of chained
+            curves.
+
+            Parameters
+            ----------
+            curves : float[]
+                Chained curves: start point then 6 values by curve
+            """
+            curves = numpy.asarray(curves, dtype=numpy.float64)
+            following = curves[2:].reshape(-1, 3, 2)
+
+            points = numpy.empty((len(following), 4, 2))
+            points[:, 1:] = following
+            points[0, 0] = curves[:2]
+            points[1:, 0] = following[:-1, 2]
+
+            return points
+
+    # Default engine name
+    default = 'numpy' if numpy else 'python'
+
+    @staticmethod
+    def factors(steps):
+        """
+        Get the interpolation factors of steps evenly spaced steps.
+
+        Parameters
+        ----------
+        steps : int
+            Number of interpolations
+        """
+        return [(i + 1) / (steps + 1) for i in range(steps)]
+
+    @staticmethod
+    def get(engine = None):
+        """
+        Get an interpolation engine.
+
+        Parameters
+        ----------
+        engine : None|str|Engine.Python
+            Engine name or object. Default engine if None.
+        """
+        if engine is None:
+            engine = Engine.default
+        if isinstance(engine, Engine.Python):
+            return engine
+
+        if engine == 'python':
+            return Engine.Python()
+        if engine == 'numpy':
+            if not numpy:
+                raise RuntimeError('Numpy engine is not available')
+            return Engine.Numpy()
+
+        raise RuntimeError(f'Unknown interpolation engine "{engine}"')
+
+# Timing namespace
+class Timing:
+    """
+    ---------------------------------------------
+    |           Interpolation timing            |
+    ---------------------------------------------
+
+    A timing gives the interpolation factor of each step. It is either:
+    - None or an easing name, as "linear" or "ease-in-out";
+    - a CSS "cubic-bezier(x1, y1, x2, y2)" timing function;
+    - a function of the linear factor;
+    - an explicit list of factors, one by step.
+    """
+
+    # Named easings cubic Bézier control points, as CSS ones
+    easings = {
+        'ease': (0.25, 0.1, 0.25, 1.0),
+        'ease-in': (0.42, 0.0, 1.0, 1.0),
+        'ease-out': (0.0, 0.0, 0.58, 1.0),
+        'ease-in-out': (0.42, 0.0, 0.58, 1.0),
+    }
+
+    # CSS cubic-bezier() timing function
+    cubicBezierFunction = re.compile(r'\s*cubic-bezier\(([^\)]*)\)\s*')
+
+    @staticmethod
+    def factors(steps, timing = None):
+        """
+        Get the interpolation factors of steps steps, evaluated once
+        for all the interpolated nodes.
+
+        Parameters
+        ----------
+        steps : int
+            Number of interpolations
+        timing : None|str|callable|float[]
+            Interpolation timing
+        """
+        ps = Engine.factors(steps)
+        if timing is None or timing == 'linear':
+            return ps
+
+        if isinstance(timing, str):
+            if timing in Timing.easings:
+                return Timing.cubicBezier(*Timing.easings[timing], ps)
+
+            m = Timing.cubicBezierFunction.fullmatch(timing)
+            if not m:
+                raise RuntimeError(f'Unknown interpolation timing "{timing}"')
+            try:
+                values = [float(v) for v in re.split(r'[\s,]+', m[1].strip())]
+            except ValueError:
+                raise RuntimeError(f'Invalid interpolation timing "{timing}"') from None
+            if len(values) != 4 or not all(map(math.isfinite, values)) or not (0 <= values[0] <= 1 and 0 <= values[2] <= 1):
+                raise RuntimeError(f'Invalid interpolation timing "{timing}"')
+
+            return Timing.cubicBezier(*values, ps)
+
+        if callable(timing):
+            return [float(timing(p)) for p in ps]
+
+        timing = [float(p) for p in timing]
+        if not all(map(math.isfinite, timing)):
+            raise RuntimeError('Interpolation timing factors must be finite numbers')
+        if len(timing) != steps:
+            raise RuntimeError(f'Interpolation timing has {len(timing)} factors for {steps} steps')
+
+        return timing
+
+    @staticmethod
+    def cubicBezier(x1, y1, x2, y2, xs):
+        """
+        Evaluate a cubic Bézier timing function from (0, 0) to (1, 1).
+
+        Parameters
+        ----------
+        x1, y1, x2, y2 : float
+            Control points, x1 and x2 between 0 and 1
+        xs : float[]
+            Linear factors
+        """
+        def bezier(a, b, t):
+            return 3 * a * t * (1 - t) ** 2 + 3 * b * t * t * (1 - t) + t ** 3
+
+        ys = []
+        for x in xs:
+            # Newton iterations, bisection if the slope is too flat
+            t = x
+            for _ in range(8):
+                error = bezier(x1, x2, t) - x
+                if abs(error) < 1e-9:
+                    break
+                slope = 3 * x1 * (1 - t) ** 2 + 6 * (x2 - x1) * t * (1 - t) + 3 * (1 - x2) * t * t
+                if abs(slope) < 1e-6:
+                    break
+                t -= error / slope
+            else:
+                error = 1.0
+
+            if abs(error) >= 1e-9 or not 0 <= t <= 1:
+                low, high = 0.0, 1.0
+                t = x
+                for _ in range(64):
+                    if bezier(x1, x2, t) < x:
+                        low = t
+                    else:
+                        high = t
+                    t = (low + high) / 2
+
+            ys.append(bezier(y1, y2, t))
+
+        return ys
+
+# Phase timers and counters
+class Instrumentation:
+    """
+    Phase timers, counters and optional cProfile capture, to find where
+    the time goes in a whole interpolation. Disabled by default: phase()
+    then returns a shared no-op context manager and count() returns at
+    once.
+
+    Nested phases are timed independently, so their times overlap.
+
+    Attributes
+    ----------
+    enabled : bool
+        Record phases and counters
+    profile : bool
+        Capture a cProfile profile of each job, see startProfile()
+    timings : object
+        Phase name -> [calls, seconds] object
+    counters : object
+        Counter name -> count object
+    profiler : None|cProfile.Profile
+        Profiler of the current job, until reset()
+
+    Methods
+    -------
+    startProfile()
+        Start a new profile of the current thread.
+    stopProfile()
+        Stop the current profile.
+    phase(name: str) : context manager
+        Time a phase.
+    count(name: str, n: int)
+        Increment a counter.
+    results() : object
+        Get the recorded timings and counters.
+    report() : str
+        Get the recorded timings and counters as text.
+    """
+    # Shared phase context manager when disabled
+    disabled = contextlib.nullcontext()
+
+    # Phase timer
+    class Timer:
+        """ Phase timer context manager """
+        __slots__ = ('timing', 'start')
+
+        def __init__(self, timing):
+            """
+            Parameters
+            ----------
+            timing : list
+                Phase [calls, seconds] timing
+            """
+            self.timing = timing
+            self.start = 0.0
+
+        def __enter__(self):
+            self.start = time.perf_counter()
+            return self
+
+        def __exit__(self, *args):
+            self.timing[0] += 1
+            self.timing[1] += time.perf_counter() - self.start
+
+    def __init__(self):
+        self.enabled = False
+        self.profile = False
+        self.profiler = None
+        self.reset()
+
+    def enable(self, profile = False):
+        """
+        Start recording.
+
+        Parameters
+        ----------
+        profile : bool
+            Also capture a cProfile profile of each job, started by
+            startProfile()
+        """
+        self.enabled = True
+        self.profile = profile
+
+    def disable(self):
+        """ Stop recording, keeping the recorded results """
+        self.enabled = False
+        self.stopProfile()
+
+    def startProfile(self):
+        """
+        Start a new cProfile profile of the current job, if enabled with
+        profile. cProfile only profiles the thread it is started from.
+        """
+        if not self.enabled or not self.profile:
+            return
+
+        import cProfile
+        self.stopProfile()
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stopProfile(self):
+        """ Stop the current profile, keeping its statistics """
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    def reset(self):
+        """ Clear the recorded timings, counters and profile """
+        self.timings = {}
+        self.counters = {}
+        self.stopProfile()
+        self.profiler = None
+
+    def phase(self, name):
+        """
+        Get a phase timer context manager.
+
+        Parameters
+        ----------
+        name : str
+            Phase name
+        """
+        if not self.enabled:
+            return self.disabled
+
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = [0, 0.0]
+
+        return Instrumentation.Timer(timing)
+
+    def count(self, name, n = 1):
+        """
+        Increment a counter.
+
+        Parameters
+        ----------
+        name : str
+            Counter name
+        n : int
+            Increment
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @staticmethod
+    def segments(node):
+        """
+        Get the number of path commands of a node and its children.
+
+        Parameters
+        ----------
+        node : Node.Node
+            Counted node
+        """
+        if isinstance(node, Node.Path):
+            return len(node.data)
+        if isinstance(node, Node.Group):
+            return sum(Instrumentation.segments(child) for child in node.children)
+
+        return 0
+
+    def results(self):
+        """ Get the {timings: {phase: {calls, time}}, counters} results """
+        return {
+            'timings': {name: {'calls': calls, 'time': t} for name, (calls, t) in self.timings.items()},
+            'counters': dict(self.counters),
+        }
+
+    def report(self):
+        """ Get the recorded timings and counters as text lines """
+        lines = [f'{name}: {t * 1000:.1f} ms, {calls} calls' for name, (calls, t) in self.timings.items()]
+        lines += [f'{name}: {count}' for name, count in self.counters.items()]
+
+        return '\n'.join(lines)
+
+    def profileStats(self, sort = 'cumulative', limit = 30):
+        """
+        Get the captured profile statistics as text, or None if no
+        profile was captured.
+
+        Parameters
+        ----------
+        sort : str
+            pstats sort key
+        limit : int
+            Number of printed functions
+        """
+        if self.profiler is None:
+            return None
+
+        import io
+        import pstats
+        s = io.StringIO()
+        self.stopProfile()
+        pstats.Stats(self.profiler, stream = s).sort_stats(sort).print_stats(limit)
+
+        return s.getvalue()
+
+# Shared instrumentation, disabled by default
+instrumentation = Instrumentation()
+
+# Node namespace
+class Node:
+    """
+    -----------------------------------------------
+    |                 Nodes                       |
+    -----------------------------------------------
+    """
+
+    # Node main class
+    class Node:
+        """
+        SVG node main class.
+
+        Attributes
+        ----------
+        el: ET.Element
+            DOM element.
+        transform: Attribute.Transform[]
+            List of transormations
+        paint: dict
+            Interpolated name -> (kind, values, unit) paint values
+        lastLayout: None|tuple
+            (interpolation limits, interpolated values layout) of the
+            last interpolation, see valuesLayout()
+        
+        Methods
+        -------
+        clone(): Node
+            Clone node.
+        canInterpolate(node: Node): bool
+            Inheritable. Check if the interation is compatible with the given node.
+        toString(): str
+            Transform into string.
+        """
+
+        def __init__(self, s):
+            """
+            Parameters
+            ----------
+            s : string|ET.Element
+                Node xml representation or element
+            """
+            self.el = s if type(s) == ET.Element else ET.fromstring(s)
+
+            self.transform = []
+            if self.el.attrib.get('transform'):
+                m = re.findall(r"([a-zA-Z][a-zA-Z0-9_]*\([^\)]*\))", self.el.attrib['transform'])
+                for t in m:
+                    self.transform.append(Attribute.Transform(t))
+
+            # Interpolated paint values overriding element ones
+            self.paint = {}
+
+            self.lastLayout = None
+
+        def transformKeys(self, nodes):
+            """
+            Get the transforms to interpolate between current node and
+            the given following keyframes nodes, or None if no node has
+            a transform.
+
+            Each node transform list is composed into one transform. A
+            node without transform has the identity transform. All the
+            transforms are translations if all the nodes are only
+            translated, else matrices.
+
+            Parameters
+            ----------
+            nodes : Node[]
+                Following keyframes nodes
+            """
+            keys = [self] + nodes
+            if not any(node.transform for node in keys):
+                return None
+
+            identity = list(Attribute.Transform.identity)
+            matrices = [Attribute.Transform.composed(node.transform) if node.transform else identity for node in keys]
+
+            transforms = [Attribute.Transform() for _ in keys]
+            translations = all(matrix[:4] == identity[:4] for matrix in matrices)
+            for transform, matrix in zip(transforms, matrices):
+                transform.operation = 'translate' if translations else 'matrix'
+                transform.values = matrix[4:] if translations else matrix
+
+            return transforms
+
+        def transformPair(self, node):
+            """
+            Get the transforms to interpolate between current and given
+            node, or None if both nodes have no transform. See
+            transformKeys().
+
+            Parameters
+            ----------
+            node : Node
+                Interpolation limit
+            """
+            return self.transformKeys([node])
+
+        def transformColumns(self, node):
+            """
+            Get the positions in interpolation values of the decomposed
+            matrices to compose back once interpolated.
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes nodes
+            """
+            return [0] if self.valuesLayout(node)[0] == 'matrix' else []
+
+        def valuesCount(self, node):
+            """
+            Get the number of interpolated values of the node.
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes nodes
+            """
+            _, count, paint = self.valuesLayout(node)
+
+            return count + sum(n for _, _, n, _ in paint)
+
+        def valuesLayout(self, node):
+            """
+            Get the (transform operation, transform values count, paint
+            (name, kind, values count, unit) list) layout of the node
+            interpolated values, computed once by interpolation. Only
+            the last interpolation layout is kept, so nodes do not keep
+            their past interpolation limits alive. The transform
+            operation is None if no node has a transform.
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes nodes
+            """
+            nodes = node if type(node) == list else [node]
+            key = tuple(nodes)
+            if self.lastLayout is None or self.lastLayout[0] != key:
+                transforms = self.transformKeys(nodes)
+                paint = [(name, values[0][0], len(values[0][1]), values[0][2]) for name, values in self.paintKeys(nodes)]
+                self.lastLayout = (key, (
+                    transforms[0].operation if transforms else None,
+                    len(transforms[0].values) if transforms else 0,
+                    paint,
+                ))
+
+            return self.lastLayout[1]
+
+        def paintValues(self):
+            """
+            Get the name -> (kind, values, unit) paint values of the
+            node, from its style and presentation attributes.
+            """
+            attrib = self.el.attrib
+            declarations = Attribute.Style.parse(attrib['style']) if 'style' in attrib else {}
+
+            values = {}
+            for name in Attribute.Paint.properties:
+                if name in self.paint:
+                    values[name] = self.paint[name]
+                    continue
+
+                s = declarations.get(name, attrib.get(name))
+                value = Attribute.Paint.parse(name, s) if s is not None else None
+                if value:
+                    values[name] = value
+
+            return values
+
+        def paintKeys(self, nodes):
+            """
+            Get the (name, values) of the paint properties to interpolate
+            between current node and the given following keyframes
+            nodes, values having one paint value by node: properties all
+            the nodes have with values of the same kind and unit, not all
+            equal.
+
+            Parameters
+            ----------
+            nodes : Node[]
+                Following keyframes nodes
+            """
+            keys = [self.paintValues()] + [node.paintValues() for node in nodes]
+
+            properties = []
+            for name, value in keys[0].items():
+                values = [paint.get(name) for paint in keys]
+                if all(v and v[0] == value[0] and v[2] == value[2] for v in values) and any(v != value for v in values):
+                    properties.append((name, values))
+
+            return properties
+
+        def paintPair(self, node):
+            """
+            Get the (name, start value, end value) of the paint
+            properties to interpolate between current and given node.
+            See paintKeys().
+
+            Parameters
+            ----------
+            node : Node
+                Interpolation limit
+            """
+            return [(name, values[0], values[1]) for name, values in self.paintKeys([node])]
+
+        def prepare(self, node, engine = None, bake = False, **options):
+            """
+            Get versions of current and given node that can be
+            interpolated together.
+
+            Parameters
+            ----------
+            node : Node
+                Interpolation limit
+            engine : None|str|Engine.Python
+                Interpolation engine
+            bake : bool
+                Apply the nodes transforms to their geometry, so only
+                the geometry is interpolated.
+            options : object
+                Nodes preparation options
+            """
+            if bake:
+                return self.baked(engine), node.baked(engine)
+
+            return self, node
+
+        def baked(self, engine = None):
+            """
+            Get the node with its transforms applied to its geometry.
+            Nodes without geometry are returned unchanged.
+
+            Parameters
+            ----------
+            engine : None|str|Engine.Python
+                Interpolation engine
+            """
+            return self
+
+        def prepareKeys(self, nodes, engine = None, **options):
+            """
+            Get versions of current node and the given following
+            keyframes nodes that can be interpolated together.
+
+            Current node is prepared with each node a first time, so it
+            gets the structure of all the nodes, as their curves count,
+            then each node is prepared with it.
+
+            Parameters
+            ----------
+            nodes : Node[]
+                Following keyframes nodes
+            engine : None|str|Engine.Python
+                Interpolation engine
+            options : object
+                Nodes preparation options, see prepare()
+            """
+            first = self
+            for node in nodes:
+                first, _ = first.prepare(node, engine, **options)
+
+            keys = [first]
+            for node in nodes:
+                prepared, node = first.prepare(node, engine, **options)
+                if not prepared.canInterpolate(first):
+                    raise RuntimeError('Node not compatible with node for interpolation')
+                keys.append(node)
+
+            return keys
+
+        def keyValues(self, nodes):
+            """
+            Get flat lists of the interpolated values of current node
+            and the given following keyframes nodes, one list by node:
+            transform values followed by paint values.
+
+            Parameters
+            ----------
+            nodes : Node[]
+                Following keyframes nodes
+            """
+            transforms = self.transformKeys(nodes)
+            if not transforms:
+                keys = [[] for _ in range(len(nodes) + 1)]
+            elif transforms[0].operation == 'matrix':
+                keys = Attribute.Transform.decomposedKeys([transform.values for transform in transforms])
+            else:
+                keys = [list(transform.values) for transform in transforms]
+
+            for _, values in self.paintKeys(nodes):
+                for key, value in zip(keys, values):
+                    key += value[1]
+
+            return keys
+
+        def interpolationValues(self, node):
+            """
+            Get flat lists of the interpolated values of current and
+            given node. See keyValues().
+
+            Parameters
+            ----------
+            node : Node
+                Interpolation limit
+            """
+            start, end = self.keyValues([node])
+
+            return start, end
+
+        def interpolatedNode(self, node, values):
+            """
+            Create the interpolated node from a row of interpolated
+            values.
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes nodes
+            values : float[]
+                Interpolated values, as returned by interpolationValues()
+                or keyValues(), with decomposed matrices composed back
+            """
+            operation, offset, paint = self.valuesLayout(node)
+            new = self.clone()
+
+            if operation:
+                transform = Attribute.Transform()
+                transform.operation = operation
+                transform.values = list(values[:offset])
+                new.transform = [transform]
+
+            for name, kind, n, unit in paint:
+                new.paint[name] = (kind, tuple(values[offset:offset + n]), unit)
+                offset += n
+
+            return new
+
+        def interpolated(self, node, p, engine = None):
+            """
+            Return a node interpolation between current and a given
+            node.
+
+            Create a node with its transformations interpolated
+
+            Parameters
+            ----------
+            node : Node
+                Interpolation limit
+            p : float
+                Interpolation multiplier
+            engine : None|str|Engine.Python
+                Interpolation engine
+            """
+            engine = Engine.get(engine)
+            start, end = self.interpolationValues(node)
+            matrix = engine.interpolate(start, end, [p], self.transformColumns(node))
+
+            return self.interpolatedNode(node, engine.rows(matrix)[0])
+
+        def canInterpolate(self, node):
+            """ 
+            Check if the node can interpolate the given node.
+
+            Parameters
+            ----------
+            node : Node
+                Compared node.
+            """
+            return type(node) == self.__class__
+
+        def clone(self):
+            """
+            Clone node.
+
+            The element is copied shallowly: its sub-elements are shared
+            with the cloned node and must not be modified.
+            """
+            new = self.__class__.__new__(self.__class__)
+
+            new.el = self.el.makeelement(self.el.tag, self.el.attrib)
+            new.el.text = self.el.text
+            new.el.tail = self.el.tail
+            new.el.extend(self.el)
+
+            new.transform = [t.clone() for t in self.transform]
+            new.paint = dict(self.paint)
+            new.lastLayout = None
+
+            return new
+        
+        def interpolate(self, node, steps, engine = None, timing = None, **options):
+            """
+            Return list of interpolation between current node and given node
+
+            All the steps are computed in one engine pass on the nodes
+            flattened values.
+
+            Parameters
+            -----------
+            node: Node
+                Interpreation limit node
+            steps: int
+                Number of interpretations between current node and given node
+            engine : None|str|Engine.Python
+                Interpolation engine
+            timing : None|str|callable|float[]
+                Interpolation timing, see Timing
+            options : object
+                Nodes preparation options, see prepare()
+            """
+            engine = Engine.get(engine)
+            node1, node2 = self.prepare(node, engine, **options)
+
+            if not node1.canInterpolate(node2):
+                raise RuntimeError('Node not compatible with node for interpolation')
+
+            start, end = node1.interpolationValues(node2)
+            matrix = engine.interpolate(start, end, Timing.factors(steps, timing), node1.transformColumns(node2))
+
+            return [node1.interpolatedNode(node2, row) for row in engine.rows(matrix)]
+
+        def stringAttributes(self, number = str):
+            """
+            Get list of overrided attributes by toString()
+
+            Parameters
+            ----------
+            number : callable
+                Number formatter
+            """
+            
+            # Attributes replacing self.el attributes
+            attr = {'id': None}
+
+            if len(self.transform):
+                # Build transformation attribute to override el trans attribute
+                attr['transform'] = ';'.join(t.toString(number) for t in self.transform)
+
+            if self.paint:
+                # Interpolated paint replaces the style declaration or
+                # the presentation attribute
+                style = self.el.attrib.get('style')
+                declarations = dict(Attribute.Style.parse(style)) if style else {}
+                for name, value in self.paint.items():
+                    if name in declarations:
+                        declarations[name] = Attribute.Paint.toString(value, number)
+                    else:
+                        attr[name] = Attribute.Paint.toString(value, number)
+                if style:
+                    attr['style'] = Attribute.Style.toString(declarations)
+
+            return attr
+
+        def iterString(self, serializer, addXmlns = False):
+            """
+            Generate the node string chunks
+
+            Parameters
+            ----------
+            serializer : Serializer
+                Document serializer
+            addXmlns : bool
+                Add xmlns into root node
+            """
+            tag = serializer.name(self.el.tag)
+            yield '<' + tag
+
+            if addXmlns:
+                yield from serializer.namespaces()
+
+            # Load ET.Element attributes, then override managed attributes
+            attrib = dict(self.el.attrib)
+            attrib.update(self.stringAttributes(serializer.number))
+            yield from serializer.attributes(attrib)
+
+            yield from self.iterContent(serializer, tag)
+
+        def iterContent(self, serializer, tag):
+            """
+            Generate the node content and end tag string chunks
+
+            Parameters
+            ----------
+            serializer : Serializer
+                Document serializer
+            tag : str
+                Node prefixed tag
+            """
+            yield from serializer.content(self.el, tag)
+
+        def toString(self, xmlns = {}, addXmlns = False, precision = None):
+            """ 
+            String conversion
+        
+            Parameters
+            ----------
+            self : object
+                Converted node
+            xmlns : object
+                Url -> node SVG xmlns object
+            addXmlns : bool
+                Add xmlns into root node
+            precision : None|int
+                Number of decimals of numbers. Shortest exact
+                representation if None.
+            """
+            return ''.join(self.iterString(Serializer(xmlns, precision), addXmlns))
+    
+    # <path> node
+    class Path(Node):
+        """
+        SVG node <path>
+
+        Attributes
+        ----------
+        data: Attribute.PathData
+            Path geometry
+        commands: Attribute.PathData
+            Sequence of path commands
+        
+        Methods
+        -------
+        clone(): Path
+            Clone path.
+        parseValues()
+            Parse values.
+        """
+
+        def __init__(self, s):
+            """
+            Parameters
+            ----------
+            s : string|ET.Element
+                Node xml representation or element
+            """
+            super().__init__(s)
+
+            # Parse values
+            self.data = Attribute.PathData(self.el.attrib.get('d'))
+
+        def clone(self):
+            """ Clone path. Path geometry is shared """
+            new = super().clone()
+            new.data = self.data
+
+            return new
+
+        def withData(self, data):
+            """
+            Get a clone of the path with another geometry. Krita node
+            types are removed as they describe the path commands.
+
+            Parameters
+            ----------
+            data : Attribute.PathData
+                Path geometry
+            """
+            new = self.clone()
+            new.data = data
+            new.el.attrib.pop('{http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd}nodetypes', None)
+
+            return new
+
+        def baked(self, engine = None):
+            """
+            Get the path with its transforms applied to its coordinates,
+            in one affine transformation of the coordinates array. Paths
+            with relative, horizontal, vertical or arc commands are
+            converted to cubic Bézier curves first. Stroke widths are
+            not scaled.
+
+            Parameters
+            ----------
+            engine : None|str|Engine.Python
+                Interpolation engine
+            """
+            if not self.transform:
+                return self
+
+            data = self.data.transformed(Attribute.Transform.composed(self.transform), Engine.get(engine))
+            if data.operations is self.data.operations:
+                new = self.clone()
+                new.data = data
+            else:
+                new = self.withData(data)
+            new.transform = []
+            new.el.attrib.pop('transform', None)
+
+            return new
+
+        def prepare(self, node, engine = None, resample = True, match = True, align = False, **options):
+            """
+            Get versions of current and given path that can be
+            interpolated together.
+
+            Parameters
+            ----------
+            node : Node
+                Interpolation limit
+            engine : None|str|Engine.Python
+                Interpolation engine
+            resample : bool
+                Resample paths with different commands: convert both to
+                cubic Bézier curves and split the curves of the path
+                with less curves, spreading them by curve length.
+            match : bool
+                Match resampled paths subpaths by position and size
+                instead of by order. Unmatched subpaths grow from or
+                shrink to their mean point.
+            align : bool
+                Rotate the start point and reverse the direction of the
+                given path closed subpaths to best match current path
+                ones, avoiding twisting interpolations.
+            options : object
+                Nodes preparation options
+            """
+            path1, path2 = super().prepare(node, engine, **options)
+            if isinstance(path2, Node.Shape):
+                path2 = path2.toPath()
+            if not Node.Node.canInterpolate(path1, path2):
+                return path1, path2
+
+            same = path1.canInterpolate(path2)
+            if (same and not align) or (not same and not resample):
+                return path1, path2
+
+            engine = Engine.get(engine)
+            data1, data2 = path1.data.cubic(), path2.data.cubic()
+            if data1.operations != data2.operations:
+                if not resample:
+                    return path1, path2
+                if match:
+                    data1, data2 = Attribute.PathData.matched(data1, data2, engine)
+                data1, data2 = Attribute.PathData.resampled(data1, data2, engine)
+
+            if align:
+                aligned = data2.aligned(data1, engine)
+                if same and aligned is data2:
+                    # Nothing to align: keep original commands
+                    return path1, path2
+                data2 = aligned
+
+            return path1.withData(data1), path2.withData(data2)
+
+        @property
+        def commands(self):
+            """Path commands sequence"""
+            return self.data
+
+        def canInterpolate(self, node):
+            """ 
+            Check if the node can interpolate the given node.
+
+            Parameters
+            ----------
+            node : Node
+                Compared node.
+            """
+            if not super().canInterpolate(node):
+                return False
+
+            return self.data.operations == node.data.operations
+
+        def keyValues(self, nodes):
+            """
+            Get flat lists of the interpolated values of current path
+            and the given following keyframes paths, one list by path:
+            transform and paint values followed by commands values.
+
+            Parameters
+            ----------
+            nodes : Node[]
+                Following keyframes paths
+            """
+            keys = super().keyValues(nodes)
+            for key, node in zip(keys, [self] + nodes):
+                key += node.data.values
+
+            return keys
+
+        def valuesCount(self, node):
+            """
+            Get the number of interpolated values of the path.
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes paths
+            """
+            return super().valuesCount(node) + len(self.data.values)
+
+        def interpolatedNode(self, node, values):
+            """
+            Create the interpolated path from a row of interpolated
+            values.
+
+            Parameters
+            ----------
+            node : Node
+                Interpolation limit
+            values : float[]
+                Interpolated values, as returned by interpolationValues()
+            """
+            offset = len(values) - len(self.data.values)
+            new = super().interpolatedNode(node, values[:offset])
+            new.data = self.data.withValues(values[offset:])
+
+            return new
+
+        def stringAttributes(self, number = str):
+            """
+            Get list of overrided attributes by toString()
+
+            Parameters
+            ----------
+            number : callable
+                Number formatter
+            """
+            attr = super().stringAttributes(number)
+            attr['d'] = self.data.toString(number)
+
+            return attr
+
+
+    # Basic shapes main class
+    class Shape(Node):
+        """
+        SVG basic shape main class, as <rect> or <circle>. Shapes of
+        the same type interpolate their geometry attributes. Shapes of
+        different types, or with different units, are converted into
+        paths to be interpolated. Only user unit or pixel lengths can be
+        converted.
+
+        Attributes
+        ----------
+        values : float[]
+            Geometry attributes values
+        units : str[]
+            Geometry attributes units
+
+        Methods
+        -------
+        pathData() : Attribute.PathData
+            Get the shape geometry as path commands.
+        toPath() : Path
+            Get the shape converted into a path.
+        """
+        # Geometry attribute name -> default value
+        attributes = {}
+
+        # Bézier control points distance approximating quarter ellipses
+        kappa = 0.5522847498307936
+
+        def __init__(self, s):
+            """
+            Parameters
+            ----------
+            s : string|ET.Element
+                Node xml representation or element
+            """
+            super().__init__(s)
+
+            self.parseValues()
+
+        def parseValues(self):
+            """ Parse geometry attributes """
+            self.values = []
+            self.units = []
+            for name, default in self.attributes.items():
+                m = Attribute.Paint.numberUnit.fullmatch(self.el.attrib.get(name, ''))
+                self.values.append(float(m[1]) if m else default)
+                self.units.append(m[2] if m else '')
+
+        def clone(self):
+            """ Clone shape """
+            new = super().clone()
+            new.values = list(self.values)
+            new.units = list(self.units)
+
+            return new
+
+        def canInterpolate(self, node):
+            """
+            Check if the shape can interpolate the given shape: both
+            shapes have the same type, values count and units.
+
+            Parameters
+            ----------
+            node : Node
+                Compared node.
+            """
+            return super().canInterpolate(node) and len(self.values) == len(node.values) and self.units == node.units
+
+        def pathData(self):
+            """ Get the shape geometry as path commands """
+            return Attribute.PathData()
+
+        @classmethod
+        def ellipseData(cls, cx, cy, rx, ry):
+            """
+            Get an ellipse geometry as four cubic Bézier curves.
+
+            Parameters
+            ----------
+            cx : float
+                Center x
+            cy : float
+                Center y
+            rx : float
+                Horizontal radius
+            ry : float
+                Vertical radius
+            """
+            kx = rx * cls.kappa
+            ky = ry * cls.kappa
+
+            data = Attribute.PathData()
+            data.appendCommand('M', (cx + rx, cy))
+            data.appendCommand('C', (cx + rx, cy + ky, cx + kx, cy + ry, cx, cy + ry))
+            data.appendCommand('C', (cx - kx, cy + ry, cx - rx, cy + ky, cx - rx, cy))
+            data.appendCommand('C', (cx - rx, cy - ky, cx - kx, cy - ry, cx, cy - ry))
+            data.appendCommand('C', (cx + kx, cy - ry, cx + rx, cy - ky, cx + rx, cy))
+            data.appendCommand('Z')
+
+            return data
+
+        def toPath(self):
+            """
+            Get the shape converted into a path, keeping its other
+            attributes, transforms and paint. Raise a RuntimeError if a
+            geometry attribute has a unit other than px.
+            """
+            for name, unit in zip(self.attributes, self.units):
+                if unit not in ('', 'px'):
+                    raise RuntimeError(f'Shape {name} unit "{unit}" cannot be converted into a path')
+
+            attrib = {name: value for name, value in self.el.attrib.items() if name not in self.attributes}
+            el = self.el.makeelement(self.el.tag[:len(self.el.tag) - len(self.el.tag.rsplit('}', 1)[-1])] + 'path', attrib)
+            el.tail = self.el.tail
+
+            path = Node.Path(el)
+            path.data = self.pathData()
+            path.transform = [t.clone() for t in self.transform]
+            path.paint = dict(self.paint)
+
+            return path
+
+        def prepare(self, node, engine = None, **options):
+            """
+            Get versions of current and given shape that can be
+            interpolated together, converting them into paths when they
+            cannot be interpolated as shapes.
+
+            Parameters
+            ----------
+            node : Node
+                Interpolation limit
+            engine : None|str|Engine.Python
+                Interpolation engine
+            options : object
+                Nodes preparation options, see Node.prepare() and
+                Path.prepare()
+            """
+            shape1, shape2 = super().prepare(node, engine, **options)
+            if shape1.canInterpolate(shape2) or not isinstance(shape2, (Node.Shape, Node.Path)):
+                return shape1, shape2
+
+            path1 = shape1.toPath() if isinstance(shape1, Node.Shape) else shape1
+
+            return path1.prepare(shape2, engine, **options)
+
+        def prepareKeys(self, nodes, engine = None, **options):
+            """
+            Get versions of current shape and the given following
+            keyframes nodes that can be interpolated together. Unless
+            all the nodes are interpolable shapes, shapes are converted
+            into paths first, so the paths get the structure of all the
+            nodes.
+
+            Parameters
+            ----------
+            nodes : Node[]
+                Following keyframes nodes
+            engine : None|str|Engine.Python
+                Interpolation engine
+            options : object
+                Nodes preparation options, see prepare()
+            """
+            if all(self.canInterpolate(node) for node in nodes):
+                return super().prepareKeys(nodes, engine, **options)
+
+            nodes = [node.toPath() if isinstance(node, Node.Shape) else node for node in nodes]
+
+            return self.toPath().prepareKeys(nodes, engine, **options)
+
+        def baked(self, engine = None):
+            """
+            Get the shape with its transforms applied to its geometry,
+            converted into a path.
+
+            Parameters
+            ----------
+            engine : None|str|Engine.Python
+                Interpolation engine
+            """
+            if not self.transform:
+                return self
+
+            return self.toPath().baked(engine)
+
+        def keyValues(self, nodes):
+            """
+            Get flat lists of the interpolated values of current shape
+            and the given following keyframes shapes, one list by shape.
+
+            Parameters
+            ----------
+            nodes : Node[]
+                Following keyframes shapes
+            """
+            keys = super().keyValues(nodes)
+            for key, node in zip(keys, [self] + nodes):
+                key += node.values
+
+            return keys
+
+        def valuesCount(self, node):
+            """
+            Get the number of interpolated values of the shape.
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes shapes
+            """
+            return super().valuesCount(node) + len(self.values)
+
+        def interpolatedNode(self, node, values):
+            """
+            Create the interpolated shape from a row of interpolated
+            values.
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes shapes
+            values : float[]
+                Interpolated values, as returned by interpolationValues()
+                or keyValues(), with decomposed matrices composed back
+            """
+            offset = len(values) - len(self.values)
+            new = super().interpolatedNode(node, values[:offset])
+            new.values = list(values[offset:])
+
+            return new
+
+        def stringAttributes(self, number = str):
+            """
+            Get list of overrided attributes by toString(). Geometry
+            attributes are written if present or not default.
+
+            Parameters
+            ----------
+            number : callable
+                Number formatter
+            """
+            attr = super().stringAttributes(number)
+            for (name, default), value, unit in zip(self.attributes.items(), self.values, self.units):
+                if name in self.el.attrib or value != default:
+                    attr[name] = number(value) + unit
+
+            return attr
+
+    # <rect> node
+    class Rect(Shape):
+        """ SVG node <rect> """
+        attributes = {'x': 0.0, 'y': 0.0, 'width': 0.0, 'height': 0.0, 'rx': 0.0, 'ry': 0.0}
+
+        def parseValues(self):
+            """ Parse geometry attributes, resolving auto corner radii """
+            super().parseValues()
+
+            attrib = self.el.attrib
+            if 'rx' not in attrib and 'ry' in attrib:
+                self.values[4], self.units[4] = self.values[5], self.units[5]
+            elif 'ry' not in attrib and 'rx' in attrib:
+                self.values[5], self.units[5] = self.values[4], self.units[4]
+
+        def pathData(self):
+            """ Get the rectangle geometry, with curves on rounded corners """
+            x, y, width, height, rx, ry = self.values
+            rx = min(abs(rx), width / 2)
+            ry = min(abs(ry), height / 2)
+
+            data = Attribute.PathData()
+            if rx <= 0 or ry <= 0:
+                data.appendCommand('M', (x, y))
+                data.appendCommand('L', (x + width, y))
+                data.appendCommand('L', (x + width, y + height))
+                data.appendCommand('L', (x, y + height))
+                data.appendCommand('Z')
+                return data
+
+            kx = rx * self.kappa
+            ky = ry * self.kappa
+            right = x + width
+            bottom = y + height
+            data.appendCommand('M', (x + rx, y))
+            data.appendCommand('L', (right - rx, y))
+            data.appendCommand('C', (right - rx + kx, y, right, y + ry - ky, right, y + ry))
+            data.appendCommand('L', (right, bottom - ry))
+            data.appendCommand('C', (right, bottom - ry + ky, right - rx + kx, bottom, right - rx, bottom))
+            data.appendCommand('L', (x + rx, bottom))
+            data.appendCommand('C', (x + rx - kx, bottom, x, bottom - ry + ky, x, bottom - ry))
+            data.appendCommand('L', (x, y + ry))
+            data.appendCommand('C', (x, y + ry - ky, x + rx - kx, y, x + rx, y))
+            data.appendCommand('Z')
+
+            return data
+
+    # <circle> node
+    class Circle(Shape):
+        """ SVG node <circle> """
+        attributes = {'cx': 0.0, 'cy': 0.0, 'r': 0.0}
+
+        def pathData(self):
+            """ Get the circle geometry """
+            cx, cy, r = self.values
+
+            return self.ellipseData(cx, cy, r, r)
+
+    # <ellipse> node
+    class Ellipse(Shape):
+        """ SVG node <ellipse> """
+        attributes = {'cx': 0.0, 'cy': 0.0, 'rx': 0.0, 'ry': 0.0}
+
+        def pathData(self):
+            """ Get the ellipse geometry """
+            return self.ellipseData(*self.values)
+
+    # <line> node
+    class Line(Shape):
+        """ SVG node <line> """
+        attributes = {'x1': 0.0, 'y1': 0.0, 'x2': 0.0, 'y2': 0.0}
+
+        def pathData(self):
+            """ Get the line geometry """
+            data = Attribute.PathData()
+            data.appendCommand('M', self.values[:2])
+            data.appendCommand('L', self.values[2:])
+
+            return data
+
+    # <polyline> node
+    class Polyline(Shape):
+        """
+        SVG node <polyline>. Polylines with the same points count
+        interpolate their points.
+        """
+        attributes = {'points': None}
+
+        # Closed shape
+        closed = False
+
+        def parseValues(self):
+            """ Parse points coordinates """
+            values = [float(v) for v in Attribute.Transform.number.findall(self.el.attrib.get('points', ''))]
+            self.values = values[:len(values) // 2 * 2]
+            self.units = []
+
+        def pathData(self):
+            """ Get the polyline geometry """
+            data = Attribute.PathData()
+            for i in range(0, len(self.values), 2):
+                data.appendCommand('L' if i else 'M', self.values[i:i + 2])
+            if self.closed and self.values:
+                data.appendCommand('Z')
+
+            return data
+
+        def stringAttributes(self, number = str):
+            """
+            Get list of overrided attributes by toString()
+
+            Parameters
+            ----------
+            number : callable
+                Number formatter
+            """
+            attr = Node.Node.stringAttributes(self, number)
+            values = list(map(number, self.values))
+            attr['points'] = ' '.join(values[i] + ',' + values[i + 1] for i in range(0, len(values), 2))
+
+            return attr
+
+    # <polygon> node
+    class Polygon(Polyline):
+        """ SVG node <polygon> """
+        closed = True
+
+    # <g> node
+    class Group(Node):
+        """
+        SVG node <g>
+
+        Group children are interpolated with the group, paired by id if
+        all the children ids are found in the other group, else by
+        position. Definitions and metadata children are not
+        interpolated, see Node.Children. The values of the whole subtree
+        are interpolated in the same flattened values.
+
+        Attributes
+        ----------
+        children : Node.Children
+            Group children nodes, created on first access
+        lastChildrenLayout : None|tuple
+            (interpolation limits, children values layout) of the last
+            interpolation, see childrenLayout()
+        """
+
+        def __init__(self, s):
+            """
+            Parameters
+            ----------
+            s : string|ET.Element
+                Node xml representation or element
+            """
+            super().__init__(s)
+
+            self.children = Node.Children(self.el)
+            self.lastChildrenLayout = None
+
+        def clone(self):
+            """ Clone group. Children nodes are shared """
+            new = super().clone()
+            new.children = self.children.copy()
+            new.lastChildrenLayout = None
+
+            return new
+
+        def withChildren(self, children):
+            """
+            Get a clone of the group with other children.
+
+            Parameters
+            ----------
+            children : Node[]
+                Group children
+            """
+            new = self.clone()
+            new.children = Node.Children.fromNodes(children)
+
+            return new
+
+        def childrenPairs(self, node):
+            """
+            Get the (child, other group child) pairs of current and
+            given group, or None if they have a different shape
+            children count.
+
+            Parameters
+            ----------
+            node : Group
+                Other group
+            """
+            return self.children.pairs(node.children)
+
+        def childrenKeys(self, nodes):
+            """
+            Get the (child, following keyframes children) of current
+            group and the given following keyframes groups.
+
+            Parameters
+            ----------
+            nodes : Group[]
+                Following keyframes groups
+            """
+            pairs = [self.childrenPairs(node) for node in nodes]
+
+            return [(child, [p[i][1] for p in pairs]) for i, (child, _) in enumerate(pairs[0])]
+
+        def childrenLayout(self, node):
+            """
+            Get the group own values count and the (child, following
+            keyframes children, values count) of each child. Only the
+            last interpolation layout is cached, as in valuesLayout().
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes groups
+            """
+            nodes = node if type(node) == list else [node]
+            key = tuple(nodes)
+            if self.lastChildrenLayout is None or self.lastChildrenLayout[0] != key:
+                children = [(child, keys, child.valuesCount(keys)) for child, keys in self.childrenKeys(nodes)]
+                self.lastChildrenLayout = (key, (super().valuesCount(nodes), children))
+
+            return self.lastChildrenLayout[1]
+
+        def canInterpolate(self, node):
+            """
+            Check if the group can interpolate the given group: both
+            groups have children that can be interpolated together.
+
+            Parameters
+            ----------
+            node : Node
+                Compared node.
+            """
+            if not super().canInterpolate(node):
+                return False
+
+            pairs = self.childrenPairs(node)
+
+            return pairs is not None and all(child1.canInterpolate(child2) for child1, child2 in pairs)
+
+        def prepare(self, node, engine = None, **options):
+            """
+            Get versions of current and given group that can be
+            interpolated together, with their children prepared by
+            pair.
+
+            Parameters
+            ----------
+            node : Node
+                Interpolation limit
+            engine : None|str|Engine.Python
+                Interpolation engine
+            options : object
+                Nodes preparation options, see Node.prepare() and
+                Path.prepare()
+            """
+            group1, group2 = super().prepare(node, engine, **options)
+            if not Node.Node.canInterpolate(group1, group2):
+                return group1, group2
+
+            pairs = group1.childrenPairs(group2)
+            if pairs is None:
+                return group1, group2
+
+            prepared = [child1.prepare(child2, engine, **options) for child1, child2 in pairs]
+
+            return group1.withChildren([p[0] for p in prepared]), group2.withChildren([p[1] for p in prepared])
+
+        def baked(self, engine = None):
+            """
+            Get the group with its transforms applied to its children:
+            group transforms are composed with each child transforms,
+            then children are baked.
+
+            Parameters
+            ----------
+            engine : None|str|Engine.Python
+                Interpolation engine
+            """
+            children = []
+            for child in self.children:
+                if self.transform:
+                    child = child.clone()
+                    child.transform = [t.clone() for t in self.transform] + child.transform
+                children.append(child.baked(engine))
+
+            new = self.withChildren(children)
+            new.transform = []
+            new.el.attrib.pop('transform', None)
+
+            return new
+
+        def keyValues(self, nodes):
+            """
+            Get flat lists of the interpolated values of current group
+            and the given following keyframes groups, one list by group:
+            group values followed by each child values.
+
+            Parameters
+            ----------
+            nodes : Node[]
+                Following keyframes groups
+            """
+            keys = super().keyValues(nodes)
+            for child, childKeys in self.childrenKeys(nodes):
+                for key, values in zip(keys, child.keyValues(childKeys)):
+                    key += values
+
+            return keys
+
+        def valuesCount(self, node):
+            """
+            Get the number of interpolated values of the group subtree.
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes groups
+            """
+            count, children = self.childrenLayout(node)
+
+            return count + sum(n for _, _, n in children)
+
+        def transformColumns(self, node):
+            """
+            Get the positions in interpolation values of the decomposed
+            matrices of the group subtree.
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes groups
+            """
+            columns = super().transformColumns(node)
+            offset, children = self.childrenLayout(node)
+            for child, keys, n in children:
+                columns += [offset + column for column in child.transformColumns(keys)]
+                offset += n
+
+            return columns
+
+        def interpolatedNode(self, node, values):
+            """
+            Create the interpolated group from a row of interpolated
+            values.
+
+            Parameters
+            ----------
+            node : Node|Node[]
+                Interpolation limit, or following keyframes groups
+            values : float[]
+                Interpolated values, as returned by interpolationValues()
+                or keyValues(), with decomposed matrices composed back
+            """
+            offset, children = self.childrenLayout(node)
+            new = super().interpolatedNode(node, values[:offset])
+
+            interpolated = []
+            for child, keys, n in children:
+                interpolated.append(child.interpolatedNode(keys, values[offset:offset + n]))
+                offset += n
+            new.children = Node.Children.fromNodes(interpolated)
+
+            return new
+
+        def iterContent(self, serializer, tag):
+            """
+            Generate the group children and end tag string chunks
+
+            Parameters
+            ----------
+            serializer : Serializer
+                Document serializer
+            tag : str
+                Node prefixed tag
+            """
+            if not len(self.children) and not self.el.text:
+                yield ' />'
+                return
+
+            yield '>'
+            if self.el.text:
+                yield serializer.escape(self.el.text)
+            for child in self.children:
+                yield from child.iterString(serializer)
+                if child.el.tail:
+                    yield serializer.escape(child.el.tail)
+            yield f'</{tag}>'
+
+    # Lazy nodes sequence
+    class Children:
+        """
+        Sequence of nodes created from their elements on first access,
+        indexed by id and by node. Definitions and metadata elements, as
+        <defs> or <style>, are not shapes and are never paired.
+
+        Attributes
+        ----------
+        items : (ET.Element|Node)[]
+            Not yet created node elements, or created nodes
+        ids : object
+            Node id -> position object. On duplicated ids, the first
+            node is indexed.
+        positions : object
+            Created node -> position object
+
+        Methods
+        -------
+        append(node: Node)
+            Append a node.
+        shapes(): int[]
+            Get the positions of the shape nodes.
+        pairs(children: Node.Children): (Node, Node)[]|None
+            Pair shape nodes with another sequence shape nodes.
+        find(id: str): Node|None
+            Get a node by id.
+        index(node: Node): int
+            Get a node position.
+        loaded(i: int): bool
+            Check if node i is created.
+        """
+        # Tag names of the elements that are not shapes
+        definitions = {'defs', 'metadata', 'style', 'script', 'title', 'desc'}
+
+        def __init__(self, elements = ()):
+            """
+            Parameters
+            ----------
+            elements : ET.Element[]
+                Nodes elements
+            """
+            self.items = list(elements)
+            self.ids = {}
+            self.positions = {}
+
+            for i, el in enumerate(self.items):
+                id = el.attrib.get('id')
+                if id is not None and id not in self.ids:
+                    self.ids[id] = i
+
+        @classmethod
+        def fromNodes(cls, nodes):
+            """
+            Create a sequence of created nodes.
+
+            Parameters
+            ----------
+            nodes : Node[]
+                Sequence nodes
+            """
+            new = cls()
+            new.items = list(nodes)
+            new.positions = {node: i for i, node in enumerate(new.items)}
+            for i, node in enumerate(new.items):
+                id = node.el.attrib.get('id')
+                if id is not None and id not in new.ids:
+                    new.ids[id] = i
+
+            return new
+
+        def copy(self):
+            """ Get a copy of the sequence, sharing its nodes """
+            new = self.__class__()
+            new.items = list(self.items)
+            new.ids = dict(self.ids)
+            new.positions = dict(self.positions)
+
+            return new
+
+        def __len__(self):
+            return len(self.items)
+
+        def __getitem__(self, i):
+            """Get node i, creating it on first access"""
+            if type(i) == slice:
+                return [self[j] for j in range(*i.indices(len(self.items)))]
+
+            item = self.items[i]
+            if type(item) == ET.Element:
+                if i < 0:
+                    i += len(self.items)
+                with instrumentation.phase('create'):
+                    item = Node.create(item)
+                self.items[i] = item
+                self.positions[item] = i
+
+            return item
+
+        def __iter__(self):
+            for i in range(len(self.items)):
+                yield self[i]
+
+        def append(self, node):
+            """
+            Append a node
+
+            Parameters
+            ----------
+            node : Node
+                Appended node
+            """
+            id = node.el.attrib.get('id')
+            if id is not None and id not in self.ids:
+                self.ids[id] = len(self.items)
+            self.positions[node] = len(self.items)
+            self.items.append(node)
+
+        def extend(self, nodes):
+            """
+            Append nodes
+
+            Parameters
+            ----------
+            nodes : Node[]
+                Appended nodes
+            """
+            for node in nodes:
+                self.append(node)
+
+        def shapes(self):
+            """
+            Get the positions of the shape nodes, skipping definitions
+            and metadata elements, without creating the nodes.
+            """
+            positions = []
+            for i, item in enumerate(self.items):
+                el = item if type(item) == ET.Element else item.el
+                if isinstance(el.tag, str) and el.tag.rsplit('}', 1)[-1] not in self.definitions:
+                    positions.append(i)
+
+            return positions
+
+        def pairs(self, children):
+            """
+            Get the (node, other sequence node) pairs of the shape nodes
+            of current and given sequences, paired by id if all the
+            shapes ids are found among the other sequence shapes, else
+            by position. Return None if the sequences have a different
+            number of shapes.
+
+            Parameters
+            ----------
+            children : Node.Children
+                Other nodes sequence
+            """
+            positions = self.shapes()
+            others = children.shapes()
+            if len(positions) != len(others):
+                return None
+
+            items = [self.items[i] for i in positions]
+            ids = [item.attrib.get('id') if type(item) == ET.Element else item.el.attrib.get('id') for item in items]
+            shapes = set(others)
+            if len(set(ids)) == len(ids) and all(children.ids.get(id) in shapes for id in ids):
+                return [(self[i], children.find(id)) for i, id in zip(positions, ids)]
+
+            return [(self[i], children[j]) for i, j in zip(positions, others)]
+
+        def find(self, id):
+            """
+            Get a node by id, or None if no node has this id
+
+            Parameters
+            ----------
+            id : str
+                Node id
+            """
+            i = self.ids.get(id)
+
+            return None if i is None else self[i]
+
+        def index(self, node):
+            """
+            Get a node position
+
+            Parameters
+            ----------
+            node : Node
+                Searched node
+            """
+            try:
+                return self.positions[node]
+            except KeyError:
+                raise ValueError('Node is not in children')
+
+        def loaded(self, i):
+            """
+            Check if node i is created
+
+            Parameters
+            ----------
+            i : int
+                Node position
+            """
+            return type(self.items[i]) != ET.Element
+
+    # Node classes by element tag name
+    classes = {
+        'path': Path,
+        'g': Group,
+        'rect': Rect,
+        'circle': Circle,
+        'ellipse': Ellipse,
+        'line': Line,
+        'polyline': Polyline,
+        'polygon': Polygon,
+    }
+
+    @staticmethod
+    def create(el):
+        """
+        Create the node of an element, by its tag name ignoring its
+        namespace.
+
+        Parameters
+        ----------
+        el : ET.Element
+            DOM element
+        """
+        tag = el.tag.rsplit('}', 1)[-1] if isinstance(el.tag, str) else None
+
+        return Node.classes.get(tag, Node.Node)(el)
+
+# Xml serializer
+class Serializer:
+    """
+    Streaming XML serializer
+
+    Namespaced names are resolved once by name and cached, numbers are
+    formatted by one formatter.
+
+    Properties
+    ----------
+    xmlns : object
+        Url -> namespace name object
+    number : callable
+        Number formatter
+    """
+
+    def __init__(self, xmlns = {}, precision = None):
+        """
+        Parameters
+        ----------
+        xmlns : object
+            Url -> namespace name object
+        precision : None|int
+            Number of decimals of numbers. Shortest exact
+            representation if None.
+        """
+        self.xmlns = xmlns
+        self.names = {}
+        self.number = str if precision is None else ('%.' + str(int(precision)) + 'f').__mod__
+
+    def name(self, name):
+        """
+        Get the prefixed name of an ElementTree "{url}name" name. Names
+        of unknown namespaces are left unchanged.
+
+        Parameters
+        ----------
+        name : str
+            Tag or attribute name
+        """
+        try:
+            return self.names[name]
+        except KeyError:
+            pass
+
+        qname = name
+        if name[:1] == '{':
+            url, local = name[1:].split('}', 1)
+            if url in self.xmlns:
+                qname = f'{self.xmlns[url]}:{local}' if self.xmlns[url] else local
+        self.names[name] = qname
+
+        return qname
+
+    def namespaces(self):
+        """Generate xmlns attributes"""
+        for url, ns in self.xmlns.items():
+            yield f' xmlns{":" if ns else ""}{ns}="{url}"'
+
+    def attributes(self, attrib):
+        """
+        Generate attributes, ignoring None values
+
+        Parameters
+        ----------
+        attrib : object
+            Name -> value object
+        """
+        for a, v in attrib.items():
+            if v is not None:
+                yield f' {self.name(a)}="{self.escape(v, True)}"'
+
+    def content(self, el, tag):
+        """
+        Generate element content and end tag, or self-closing end.
+
+        Parameters
+        ----------
+        el : ET.Element
+            Element
+        tag : str
+            Element prefixed tag
+        """
+        if not len(el) and not el.text:
+            yield ' />'
+            return
+
+        yield '>'
+        if el.text:
+            yield self.escape(el.text)
+        for child in el:
+            yield from self.element(child)
+            if child.tail:
+                yield self.escape(child.tail)
+        yield f'</{tag}>'
+
+    def element(self, el):
+        """
+        Generate an element string, without its tail
+
+        Parameters
+        ----------
+        el : ET.Element
+            Element
+        """
+        if not isinstance(el.tag, str):
+            # Comments and processing instructions
+            return
+
+        tag = self.name(el.tag)
+        yield '<' + tag
+        yield from self.attributes(el.attrib)
+        yield from self.content(el, tag)
+
+    @staticmethod
+    def escape(s, attribute = False):
+        """
+        Escape XML text or attribute value
+
+        Parameters
+        ----------
+        s : str
+            Escaped string
+        attribute : bool
+            Escape an attribute value
+        """
+        if '&' in s:
+            s = s.replace('&', '&amp;')
+        if '<' in s:
+            s = s.replace('<', '&lt;')
+        if '>' in s:
+            s = s.replace('>', '&gt;')
+        if attribute and '"' in s:
+            s = s.replace('"', '&quot;')
+
+        return s
+
+# Svg file
+class Svg:
+    """
+    SVG file
+
+    Properties
+    ----------
+    children : Node.Children
+        SVG children nodes, created on first access
+    el : ET.Element
+        DOM Element
+    """
+
+    # Krita exported document namespaces
+    namespaces = {
+        '': 'http://www.w3.org/2000/svg',
+        'xlink': 'http://www.w3.org/1999/xlink',
+        'krita': 'http://krita.org/namespaces/svg/krita',
+        'sodipodi': 'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd',
+    }
 
     def __init__(self, s = None):
         """
@@ -459,8 +4099,9 @@ class Svg:
         s : string
           svg string representation
         """
-        self.children = []
+        self.children = Node.Children()
         self.el = ET.Element('svg')
+        self.xmlns = []
 
         if s :
             # Load xmlns
@@ -470,15 +4111,48 @@ class Svg:
                 ET.register_namespace(x[0], x[1])
         
             # Parse xml
-            self.el = ET.fromstring(s)
+            with instrumentation.phase('parse'):
+                self.el = ET.fromstring(s)
 
-            # Search in children list ignoring namespaves
-            for child in self.el:
-                if re.search(r'{?[^}]*}?path', child.tag):
-                    self.children.append(Node.Path(child))
-                else:
-                    self.children.append(Node.Node(child))
+            # Children nodes are created on first access
+            self.children = Node.Children(self.el)
+
+    @classmethod
+    def fromShapes(cls, shapes, attrib = {}, xmlns = None):
+        """
+        Create a document from shapes svg strings, as given by Krita
+        shape.toSvg(), so only these shapes are parsed instead of the
+        whole layer.
+
+        Parameters
+        ----------
+        shapes : str[]
+            Shapes svg elements strings
+        attrib : object
+            Document <svg> attributes
+        xmlns : None|object
+            Namespace name -> url object, default to Krita namespaces
+        """
+        if xmlns is None:
+            xmlns = cls.namespaces
+
+        s = '<svg'
+        for ns, url in xmlns.items():
+            s += f' xmlns{":" if ns else ""}{ns}="{url}"'
+        for a, v in attrib.items():
+            s += f' {a}="{Serializer.escape(str(v), True)}"'
+        s += '>' + ''.join(shapes) + '</svg>'
+
+        try:
+            return cls(s)
+        except ET.ParseError as e:
+            raise RuntimeError(f'Cannot parse shapes: {e}')
     
+    def iterchildren(self):
+        """ Generate children nodes, creating them on the fly """
+        for i in range(len(self.children)):
+            yield self.children[i]
+
     def clone(self):
         """ Clone svg object """
         new = self.__class__()
@@ -495,7 +4169,27 @@ class Svg:
             xmlns[x[1]] = x[0]
         return xmlns
     
-    def interpolate(self, node1, node2, steps, new = True, debug = False):
+    def getNode(self, node):
+        """
+        Get a child node
+
+        Parameters
+        ----------
+        node : int|string|Node.Node
+            Node position in children, or id, or object
+        """
+        if type(node) == int:
+            return self.children[node]
+
+        if type(node) == str:
+            found = self.children.find(node)
+            if found is None:
+                raise RuntimeError(f'Cannot find node "{node}"')
+            return found
+
+        return node
+
+    def interpolate(self, node1, node2, steps, new = True, debug = False, engine = None, timing = None, **options):
         """
         Generate nodes interpolation, into current Svg object
         or into a new one.
@@ -512,76 +4206,441 @@ class Svg:
             If False, generate interpolations in current object
         debug: bool
             If True, raise verbose errors.
+        engine : None|str|Engine.Python
+            Interpolation engine, default to Engine.default
+        timing : None|str|callable|float[]
+            Interpolation timing, see Timing
+        options : object
+            Nodes preparation options, as Node.Path.prepare() resample
         """
 
-        # Get destination Svg
-        if not new:
-            svg = self
-        else:
-            # Same Svg but without children
-            svg = self.clone()
+        return self.interpolateMany([(node1, node2)], steps, new, debug, engine, timing = timing, **options)
 
-        # Get nodes objects
-        if type(node1) == int:
-            node1 = self.children[node1]
-        if type(node2) == int:
-            node2 = self.children[node2]
-        
-        if type(node1) == str:
-            for node in self.children:
-                if node.el.attrib.get('id') == node1:
-                    node1 = node
-                    break
+    def interpolateMany(self, pairs, steps, new = True, debug = False, engine = None, split = False, timing = None, **options):
+        """
+        Generate interpolations of many node pairs, into current Svg
+        object, into a new one or into one new Svg object by step.
 
-        if type(node2) == str:
-            for node in self.children:
-                if node.el.attrib.get('id') == node2:
-                    node2 = node
-                    break
+        All the pairs are checked before interpolating, then all their
+        steps are computed in one engine pass.
 
-        # Interpolate & add interpolated nodes
-        if debug:
+        Parameters
+        ----------
+        pairs : (int|string|Node.Node)[][]
+            List of (first node, second node) pairs. Nodes are given
+            as position in children, or id, or object.
+        steps: int
+            Number of interpolations
+        new: bool
+            If False, generate interpolations in current object. Ignored
+            if split is True.
+        debug: bool
+            If True, raise verbose errors.
+        engine : None|str|Engine.Python
+            Interpolation engine, default to Engine.default
+        split : bool
+            If True, return one new Svg object by step, with one node
+            by pair. Else return one Svg object with the steps of each
+            pair following each other.
+        timing : None|str|callable|float[]
+            Interpolation timing, see Timing
+        options : object
+            Nodes preparation options, as Node.Path.prepare() resample
+        """
+        if split:
+            return list(self.frames(pairs, steps, debug, engine, timing = timing, **options))
+
+        engine = Engine.get(engine)
+        nodes, slices, start, end, columns = self.interpolationPairs(pairs, debug, engine, **options)
+
+        with instrumentation.phase('interpolate'):
+            # Interpolate all the pairs at once
+            rows = engine.rows(engine.interpolate(start, end, Timing.factors(steps, timing), columns))
+
+            # Get destination Svg
+            if not new:
+                svg = self
+            else:
+                # Same Svg but without children
+                svg = self.clone()
+
+            for (node1, node2), (a, b) in zip(nodes, slices):
+                for row in rows:
+                    svg.children.append(node1.interpolatedNode(node2, row[a:b]))
+
+        instrumentation.count('steps', steps)
+
+        return svg
+
+    def frames(self, pairs, steps, debug = False, engine = None, chunk = 16, timing = None, **options):
+        """
+        Generate one new Svg object by step, with one interpolated node
+        by pair.
+
+        Steps are computed by chunks when the next frame is requested,
+        so frames are never all in memory. Frames share the same
+        document shell.
+
+        Parameters
+        ----------
+        pairs : (int|string|Node.Node)[][]
+            List of (first node, second node) pairs. Nodes are given
+            as position in children, or id, or object.
+        steps: int
+            Number of interpolations
+        debug: bool
+            If True, raise verbose errors.
+        engine : None|str|Engine.Python
+            Interpolation engine, default to Engine.default
+        chunk : int
+            Number of steps computed by engine pass
+        timing : None|str|callable|float[]
+            Interpolation timing, see Timing
+        options : object
+            Nodes preparation options, as Node.Path.prepare() resample
+        """
+        engine = Engine.get(engine)
+        nodes, slices, start, end, columns = self.interpolationPairs(pairs, debug, engine, **options)
+        ps = Timing.factors(steps, timing)
+
+        instrumentation.count('steps', len(ps))
+
+        yield from self.preparedFrames(nodes, slices, start, end, columns, ps, engine, chunk)
+
+    def preparedFrames(self, nodes, slices, start, end, columns, ps, engine = None, chunk = 16):
+        """
+        Generate one new Svg object by step of node pairs prepared by
+        interpolationPairs(), so preparation can be done once for frames
+        generated elsewhere, as in worker processes. See frames().
+
+        Parameters
+        ----------
+        nodes : (Node.Node, Node.Node)[]
+            Prepared pairs
+        slices : (int, int)[]
+            Each pair (start, end) slice of the values
+        start : float[]
+            Concatenated start values
+        end : float[]
+            Concatenated end values
+        columns : int[]
+            Positions of the decomposed matrices in values
+        ps : float[]
+            Interpolation factors, one by generated step
+        engine : None|str|Engine.Python
+            Interpolation engine, default to Engine.default
+        chunk : int
+            Number of steps computed by engine pass
+        """
+        engine = Engine.get(engine)
+        shell = self.clone()
+
+        for i in range(0, len(ps), chunk):
+            frames = []
+            with instrumentation.phase('interpolate'):
+                for row in engine.rows(engine.interpolate(start, end, ps[i:i + chunk], columns)):
+                    frame = self.__class__()
+                    frame.xmlns = shell.xmlns
+                    frame.el = shell.el
+                    for (node1, node2), (a, b) in zip(nodes, slices):
+                        frame.children.append(node1.interpolatedNode(node2, row[a:b]))
+                    frames.append(frame)
+
+            yield from frames
+
+    def interpolateKeys(self, keys, steps, new = True, debug = False, engine = None, split = False, timing = None, **options):
+        """
+        Generate the spline interpolation through keyframes nodes, into
+        current Svg object, into a new one or into one new Svg object by
+        step.
+
+        Steps are generated between each keyframe and the next one, in
+        one engine evaluation for all the spans.
+
+        Parameters
+        ----------
+        keys : (int|string|Node.Node)[]
+            Keyframes nodes, at least two. Nodes are given as position
+            in children, or id, or object.
+        steps: int
+            Number of interpolations between two keyframes
+        new: bool
+            If False, generate interpolations in current object. Ignored
+            if split is True.
+        debug: bool
+            If True, raise verbose errors.
+        engine : None|str|Engine.Python
+            Interpolation engine, default to Engine.default
+        split : bool
+            If True, return one new Svg object by step.
+        timing : None|str|callable|float[]
+            Interpolation timing of each span, see Timing
+        options : object
+            Nodes preparation options, as Node.Path.prepare() resample
+        """
+        if split:
+            return list(self.keyFrames(keys, steps, debug, engine, timing = timing, **options))
+
+        engine = Engine.get(engine)
+        nodes, values, columns = self.keyInterpolation(keys, debug, engine, **options)
+        with instrumentation.phase('interpolate'):
+            rows = engine.rows(engine.composeTransforms(engine.spline(values, self.keyFactors(len(keys), steps, timing)), columns))
+
+            svg = self if not new else self.clone()
+            for row in rows:
+                svg.children.append(nodes[0].interpolatedNode(nodes[1:], row))
+
+        instrumentation.count('steps', len(rows))
+
+        return svg
+
+    def keyFrames(self, keys, steps, debug = False, engine = None, chunk = 16, timing = None, **options):
+        """
+        Generate one new Svg object by step of the spline interpolation
+        through keyframes nodes. See interpolateKeys() and frames().
+
+        Parameters
+        ----------
+        keys : (int|string|Node.Node)[]
+            Keyframes nodes, at least two.
+        steps: int
+            Number of interpolations between two keyframes
+        debug: bool
+            If True, raise verbose errors.
+        engine : None|str|Engine.Python
+            Interpolation engine, default to Engine.default
+        chunk : int
+            Number of steps computed by engine pass
+        timing : None|str|callable|float[]
+            Interpolation timing of each span, see Timing
+        options : object
+            Nodes preparation options, as Node.Path.prepare() resample
+        """
+        engine = Engine.get(engine)
+        nodes, values, columns = self.keyInterpolation(keys, debug, engine, **options)
+        ps = self.keyFactors(len(keys), steps, timing)
+
+        instrumentation.count('steps', len(ps))
+
+        yield from self.preparedKeyFrames(nodes, values, columns, ps, engine, chunk)
+
+    def preparedKeyFrames(self, nodes, values, columns, ps, engine = None, chunk = 16):
+        """
+        Generate one new Svg object by step of keyframes nodes prepared
+        by keyInterpolation(). See keyFrames() and preparedFrames().
+
+        Parameters
+        ----------
+        nodes : Node.Node[]
+            Prepared keyframes nodes
+        values : float[][]
+            Keyframes values, one list by keyframe
+        columns : int[]
+            Positions of the decomposed matrices in values
+        ps : float[]
+            Spline interpolation factors, one by generated step, see
+            keyFactors()
+        engine : None|str|Engine.Python
+            Interpolation engine, default to Engine.default
+        chunk : int
+            Number of steps computed by engine pass
+        """
+        engine = Engine.get(engine)
+        shell = self.clone()
+
+        for i in range(0, len(ps), chunk):
+            frames = []
+            with instrumentation.phase('interpolate'):
+                for row in engine.rows(engine.composeTransforms(engine.spline(values, ps[i:i + chunk]), columns)):
+                    frame = self.__class__()
+                    frame.xmlns = shell.xmlns
+                    frame.el = shell.el
+                    frame.children.append(nodes[0].interpolatedNode(nodes[1:], row))
+                    frames.append(frame)
+
+            yield from frames
+
+    @staticmethod
+    def keyFactors(keys, steps, timing = None):
+        """
+        Get the spline interpolation factors of steps steps between
+        each keyframe and the next one.
+
+        Parameters
+        ----------
+        keys : int
+            Number of keyframes
+        steps : int
+            Number of interpolations between two keyframes
+        timing : None|str|callable|float[]
+            Interpolation timing of each span, see Timing
+        """
+        ps = Timing.factors(steps, timing)
+
+        return [span + p for span in range(keys - 1) for p in ps]
+
+    def keyInterpolation(self, keys, debug = False, engine = None, **options):
+        """
+        Get keyframes nodes objects, their values and the decomposed
+        matrices positions in values, checking the nodes can be
+        interpolated together.
+
+        Parameters
+        ----------
+        keys : (int|string|Node.Node)[]
+            Keyframes nodes, at least two.
+        debug: bool
+            If True, raise verbose errors.
+        engine : None|str|Engine.Python
+            Interpolation engine, default to Engine.default
+        options : object
+            Nodes preparation options, as Node.Path.prepare() resample
+        """
+        if len(keys) < 2:
+            raise RuntimeError('Interpolation needs at least two keyframes')
+
+        with instrumentation.phase('prepare'):
+            keys = [self.getNode(key) for key in keys]
             try:
-                intp = node1.interpolate(node2, steps)
+                nodes = keys[0].prepareKeys(keys[1:], engine, **options)
+                for node in nodes[1:]:
+                    if not nodes[0].canInterpolate(node):
+                        raise RuntimeError('Node not compatible with node for interpolation')
+                values = nodes[0].keyValues(nodes[1:])
             except RuntimeError:
+                if not debug:
+                    raise
                 raise RuntimeError(
                     'Nodes are not compatible for interpolation' + "\n\n" +
-                    'node 1 : ' + node1.toString() + "\n"
-                    'node 2 : ' + node2.toString()
+                    "\n".join(f'node {i + 1} : ' + key.toString() for i, key in enumerate(keys))
                 )
-        else:
-            intp = node1.interpolate(node2, steps)
-        
-        for node in intp:
-            svg.children.append(node)
 
-        return svg
+        if instrumentation.enabled:
+            instrumentation.count('nodes', len(nodes))
+            instrumentation.count('segments', sum(Instrumentation.segments(node) for node in nodes))
+            instrumentation.count('values', len(values[0]))
 
-    def toString(self):
-        """ String conversion """
-        s = '<svg'
+        return nodes, values, nodes[0].transformColumns(nodes[1:])
+
+    def interpolationPairs(self, pairs, debug = False, engine = None, **options):
+        """
+        Get node pairs objects and their concatenated values, checking
+        all the pairs can be interpolated.
 
-        # Load xmlns
-        xmlns = self.getXmlns()
-        for url in xmlns:
-            ns = xmlns[url]
-            s += f' xmlns{':' if ns else ''}{ns}="{url}"'
+        Return the (node1, node2) pairs, each pair (start, end) slice of
+        the values, the concatenated start and end values and the
+        decomposed matrices positions in values.
+
+        Parameters
+        ----------
+        pairs : (int|string|Node.Node)[][]
+            List of (first node, second node) pairs.
+        debug: bool
+            If True, raise verbose errors.
+        engine : None|str|Engine.Python
+            Interpolation engine, default to Engine.default
+        options : object
+            Nodes preparation options, as Node.Path.prepare() resample
+        """
+        nodes = []
+        start = []
+        end = []
+        slices = []
+        columns = []
+        with instrumentation.phase('prepare'):
+            for node1, node2 in pairs:
+                node1 = self.getNode(node1)
+                node2 = self.getNode(node2)
+
+                try:
+                    prepared1, prepared2 = node1.prepare(node2, engine, **options)
+                    if not prepared1.canInterpolate(prepared2):
+                        raise RuntimeError('Node not compatible with node for interpolation')
+                    values = prepared1.interpolationValues(prepared2)
+                except RuntimeError:
+                    if not debug:
+                        raise
+                    raise RuntimeError(
+                        'Nodes are not compatible for interpolation' + "\n\n" +
+                        'node 1 : ' + node1.toString() + "\n"
+                        'node 2 : ' + node2.toString()
+                    )
+
+                nodes.append((prepared1, prepared2))
+                slices.append((len(start), len(start) + len(values[0])))
+                columns += [len(start) + column for column in prepared1.transformColumns(prepared2)]
+                start += values[0]
+                end += values[1]
+
+        if instrumentation.enabled:
+            instrumentation.count('nodes', 2 * len(nodes))
+            instrumentation.count('segments', sum(Instrumentation.segments(node) for pair in nodes for node in pair))
+            instrumentation.count('values', len(start))
+
+        return nodes, slices, start, end, columns
+
+    def iterString(self, precision = None, children = None):
+        """
+        Generate the document string chunks
+
+        Parameters
+        ----------
+        precision : None|int
+            Number of decimals of numbers. Shortest exact
+            representation if None.
+        children : None|iterable
+            Nodes, or nodes strings, written instead of the document
+            children, as a generator of frames nodes, consumed while
+            writing
+        """
+        serializer = Serializer(self.getXmlns(), precision)
+
+        yield '<svg'
+        yield from serializer.namespaces()
+        yield from serializer.attributes(self.el.attrib)
 
-        # Load attributes
-        for a  in self.el.attrib:
-            s += f' {a}="{self.el.attrib[a]}"'
-        
         # Load children
-        if len(self.children):
-            s += '>'
-            for child in self.children:
-                s += f"\n\t{child.toString(xmlns)}"
-            s += "\n</svg>"
-        else:
-            s += ' />'
-
-        # Replace namespace link by namepace names
-        for url in xmlns:
-            s = s.replace(f'{{url}}', f'{xmlns[url]}:' if xmlns[url] else '')
-        
-        return s
\ No newline at end of file
+        empty = True
+        for child in self.children if children is None else children:
+            if empty:
+                yield '>'
+                empty = False
+            yield '\n\t'
+            if type(child) == str:
+                yield child
+            else:
+                yield from child.iterString(serializer)
+
+        yield ' />' if empty else '\n</svg>'
+
+    def write(self, f, precision = None, children = None):
+        """
+        Write the document into a file object
+
+        Parameters
+        ----------
+        f : file
+            Text file object, as an io.StringIO or an opened file
+        precision : None|int
+            Number of decimals of numbers. Shortest exact
+            representation if None.
+        children : None|iterable
+            Nodes, or nodes strings, written instead of the document
+            children, see iterString()
+        """
+        with instrumentation.phase('toString'):
+            for chunk in self.iterString(precision, children):
+                f.write(chunk)
+
+    def toString(self, precision = None):
+        """
+        String conversion
+
+        Parameters
+        ----------
+        precision : None|int
+            Number of decimals of numbers. Shortest exact
+            representation if None.
+        """
+        with instrumentation.phase('toString'):
+            return ''.join(self.iterString(precision))
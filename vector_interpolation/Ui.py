@@ -1,7 +1,10 @@
 from PyQt5 import QtWidgets, uic
 import os
+import re
 import sys
 
+from .Svg import Timing
+
 class InterpolationDialog(QtWidgets.QDialog):
     def __init__(self):
         super(InterpolationDialog, self).__init__()
@@ -12,12 +15,45 @@ class InterpolationDialog(QtWidgets.QDialog):
         # Set forcus on stepsSpinBox
         self.stepsSpinBox.setFocus()
 
+        # Timing errors are shown on accept
+        self.timingErrorLabel.hide()
+
         self.show()
     
     def get_steps(self):
         """Return the value of stepsSpinBox"""
         return self.stepsSpinBox.value()
 
+    def get_timing(self):
+        """
+        Return the timing entered in easingComboBox: an easing name, a
+        cubic-bezier() function, or a list of factors, one by step
+        """
+        timing = self.easingComboBox.currentText().strip()
+        try:
+            return [float(p) for p in re.split(r'[\s,]+', timing)]
+        except ValueError:
+            return timing
+
+    def accept(self):
+        """Check the timing before closing the dialog"""
+        try:
+            Timing.factors(self.get_steps(), self.get_timing())
+        except RuntimeError as e:
+            self.timingErrorLabel.setText(str(e))
+            self.timingErrorLabel.show()
+            return
+
+        super(InterpolationDialog, self).accept()
+
+    def get_frames(self):
+        """Return True if framesCheckBox is checked"""
+        return self.framesCheckBox.isChecked()
+
+    def get_align(self):
+        """Return True if alignCheckBox is checked"""
+        return self.alignCheckBox.isChecked()
+
 class ErrorDialog(QtWidgets.QDialog):
     def __init__(self, msg):
         super(ErrorDialog, self).__init__()
@@ -0,0 +1,121 @@
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+import logging
+
+from .Svg import instrumentation
+
+logger = logging.getLogger(__name__)
+
+class InterpolationWorker(QObject):
+    """
+    Shapes interpolation run in a worker thread.
+
+    Steps are generated one frame at a time, so progress is reported
+    and cancellation is checked after each step. Cancellation is also
+    checked before and after the nodes preparation, which has no
+    progress of its own. The interpolation result is given as svg
+    strings, to be added into Krita layers in the GUI thread.
+
+    Signals
+    -------
+    prepared()
+        Nodes are prepared, steps progress starts
+    progress(int)
+        Number of generated steps
+    finished(list)
+        Svg strings: one by step if split, else one for all the steps
+    failed(str)
+        Error message
+    canceled()
+        Interruption was requested before the end
+    """
+    prepared = pyqtSignal()
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(list)
+    failed = pyqtSignal(str)
+    canceled = pyqtSignal()
+
+    def __init__(self, svg, nodes, steps, split = False, **options):
+        """
+        Parameters
+        ----------
+        svg : Svg
+            Document of the interpolated nodes
+        nodes : int[]
+            Nodes positions, interpolated through keyframes if more
+            than two
+        steps : int
+            Number of interpolations
+        split : bool
+            Return one svg string by step
+        options : object
+            Svg.frames() options, as timing or align
+        """
+        super().__init__()
+
+        self.svg = svg
+        self.nodes = nodes
+        self.steps = steps
+        self.split = split
+        self.options = options
+        self.interrupted = False
+
+        # Number of frames: steps between each keyframe and the next one
+        self.total = steps * (len(nodes) - 1)
+
+    def interruption_requested(self):
+        """Check if interruption is requested, remembering it"""
+        if QThread.currentThread().isInterruptionRequested():
+            self.interrupted = True
+
+        return self.interrupted
+
+    def frames(self):
+        """Generate frames, stopping when interruption is requested"""
+        if self.interruption_requested():
+            return
+
+        # Nodes are prepared when the first frame is requested
+        if len(self.nodes) == 2:
+            frames = self.svg.frames([self.nodes], self.steps, chunk = 1, **self.options)
+        else:
+            frames = self.svg.keyFrames(self.nodes, self.steps, chunk = 1, **self.options)
+
+        for i, frame in enumerate(frames):
+            if i == 0:
+                self.prepared.emit()
+            if self.interruption_requested():
+                return
+            yield frame
+            self.progress.emit(i + 1)
+
+    def nodes_frames(self):
+        """Generate frames nodes, see frames()"""
+        for frame in self.frames():
+            yield from frame.children
+
+    @pyqtSlot()
+    def run(self):
+        """Interpolate, then emit finished, failed or canceled"""
+        # Profiles only capture the thread they are started from
+        instrumentation.startProfile()
+        try:
+            if self.split:
+                result = [frame.toString() for frame in self.frames()]
+            else:
+                # Frames nodes are written as they are generated
+                result = [''.join(self.svg.clone().iterString(children = self.nodes_frames()))]
+        except RuntimeError as e:
+            self.failed.emit(str(e))
+            return
+        except Exception:
+            logger.exception("Interpolation failed")
+            self.failed.emit("An error occured")
+            return
+        finally:
+            instrumentation.stopProfile()
+
+        if self.interrupted:
+            self.canceled.emit()
+        else:
+            self.finished.emit(result)
@@ -1,3 +1,11 @@
-from .vector_interpolation import VectorInterpolation
-
-Krita.instance().addExtension(VectorInterpolation(Krita.instance()))
+# Krita is only available when loaded as a Krita plugin: the Svg module
+# and the command line entry point work without it
+try:
+    import krita
+except ImportError:
+    krita = None
+
+if krita:
+    from .vector_interpolation import VectorInterpolation
+
+    Krita.instance().addExtension(VectorInterpolation(Krita.instance()))
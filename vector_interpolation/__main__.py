@@ -0,0 +1,363 @@
+import argparse
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from multiprocessing.shared_memory import SharedMemory
+
+from .Svg import Svg, Engine, Node, Serializer, Timing, instrumentation
+
+
+def parser():
+    """Get the command line arguments parser"""
+    parser = argparse.ArgumentParser(
+        prog = 'python -m vector_interpolation',
+        description = 'Generate vector shapes interpolations outside Krita. '
+            'With two files, the shapes of the first file are interpolated to the shapes of the second one, '
+            'paired by id if all ids are found, else by position. With one file, the given ids are '
+            'interpolated, through keyframes if more than two ids are given.',
+    )
+    parser.add_argument('files', nargs = '+', metavar = 'file', help = 'keyframe svg files, one or two')
+    parser.add_argument('-i', '--ids', nargs = '+', default = None, help = 'interpolated node ids')
+    parser.add_argument('-n', '--steps', type = int, default = 1, help = 'number of interpolations (default: 1)')
+    parser.add_argument(
+        '-o', '--output', default = '-',
+        help = 'output file, or file pattern with a "{}" frame number field to write one file by step, '
+            'as "frame-{:04d}.svg" (default: standard output)'
+    )
+    parser.add_argument('-t', '--timing', default = None, help = 'easing name or cubic-bezier(x1, y1, x2, y2) timing')
+    parser.add_argument('-e', '--engine', choices = ['python', 'numpy'], default = None, help = 'interpolation engine')
+    parser.add_argument('-w', '--workers', type = int, default = 1, help = 'number of worker processes, each one interpolating and writing a range of the prepared frames (default: 1)')
+    parser.add_argument('-p', '--precision', type = int, default = None, help = 'number of decimals of written numbers')
+    parser.add_argument('--chunk', type = int, default = 16, help = 'number of steps computed by engine pass (default: 16)')
+    parser.add_argument('--align', action = 'store_true', help = 'align closed paths start points')
+    parser.add_argument('--bake', action = 'store_true', help = 'apply transforms to the paths coordinates')
+    parser.add_argument('--no-resample', dest = 'resample', action = 'store_false', help = 'do not resample paths with different commands')
+    parser.add_argument('--no-match', dest = 'match', action = 'store_false', help = 'match subpaths by order')
+    parser.add_argument('--debug', action = 'store_true', help = 'verbose incompatible nodes errors')
+    parser.add_argument('--stats', action = 'store_true', help = 'print phase timings and counters to standard error')
+    parser.add_argument('--profile', action = 'store_true', help = 'print a cProfile profile to standard error')
+
+    return parser
+
+
+def load(name):
+    """
+    Load a svg file
+
+    Parameters
+    ----------
+    name : str
+        File name
+    """
+    try:
+        with open(name, encoding = 'utf-8') as f:
+            return Svg(f.read())
+    except OSError as e:
+        raise RuntimeError(f'Cannot read "{name}": {e.strerror}')
+    except SyntaxError as e:
+        raise RuntimeError(f'Cannot parse "{name}": {e}')
+
+
+def keys(args):
+    """
+    Get the document and the interpolated (node1, node2) pairs, or the
+    keyframes nodes list, from command line arguments
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Command line arguments
+    """
+    if len(args.files) > 2:
+        raise RuntimeError('Interpolation takes one or two files')
+
+    svg = load(args.files[0])
+    if len(args.files) == 1:
+        if not args.ids or len(args.ids) < 2:
+            raise RuntimeError('Interpolating one file needs at least two node ids')
+        if len(args.ids) == 2:
+            return svg, [args.ids], None
+
+        return svg, None, args.ids
+
+    end = load(args.files[1])
+    if args.ids:
+        return svg, [(svg.getNode(id), end.getNode(id)) for id in args.ids], None
+
+    pairs = svg.children.pairs(end.children)
+    if pairs is None:
+        raise RuntimeError('Files have a different number of shapes')
+
+    return svg, pairs, None
+
+
+def definitions(svg):
+    """
+    Get the document children that are not shapes, as <defs>, written
+    once at the start of each output document instead of being
+    interpolated
+
+    Parameters
+    ----------
+    svg : Svg
+        Start document
+    """
+    shapes = set(svg.children.shapes())
+
+    return [svg.children[i] for i in range(len(svg.children)) if i not in shapes]
+
+
+def withDefinitions(svg, nodes):
+    """
+    Get an output document with the given definitions nodes before its
+    interpolated nodes
+
+    Parameters
+    ----------
+    svg : Svg
+        Output document
+    nodes : Node.Node[]
+        Definitions nodes, see definitions()
+    """
+    if nodes:
+        svg.children = Node.Children.fromNodes(nodes + svg.children[:])
+
+    return svg
+
+
+def write(svg, name, precision, children = None):
+    """
+    Write a document into a file, or into standard output if name is "-"
+
+    Parameters
+    ----------
+    svg : Svg
+        Written document
+    name : str
+        File name
+    precision : None|int
+        Number of decimals of numbers
+    children : None|iterable
+        Nodes, or nodes strings, written instead of the document
+        children
+    """
+    if name == '-':
+        svg.write(sys.stdout, precision, children)
+        sys.stdout.write('\n')
+        return
+
+    with open(name, 'w', encoding = 'utf-8') as f:
+        svg.write(f, precision, children)
+
+
+def options(args):
+    """
+    Get the nodes preparation and engine options of command line
+    arguments
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Command line arguments
+    """
+    return {
+        'engine': Engine.get(args.engine),
+        'debug': args.debug,
+        'align': args.align,
+        'bake': args.bake,
+        'resample': args.resample,
+        'match': args.match,
+    }
+
+
+# Worker process job, set by setup()
+job = None
+
+
+def setup(state):
+    """
+    Set the job of a worker process, once by process
+
+    Parameters
+    ----------
+    state : object
+        Job object, see parallel()
+    """
+    global job
+    job = state
+
+
+def render(first, ps):
+    """
+    Interpolate a range of frames in a worker process, from the
+    prepared nodes of the job and the values in its shared memory.
+    Frame files are written by the worker. For a single output, return
+    the serialized interpolated nodes, one list by pair.
+
+    Parameters
+    ----------
+    first : int
+        First rendered frame position
+    ps : float[]
+        Interpolation factors of the rendered frames
+    """
+    count, n = job['shape']
+    memory = SharedMemory(name = job['memory'])
+    try:
+        values = []
+        for i in range(count):
+            value = array('d')
+            with memory.buf[8 * n * i:8 * n * (i + 1)] as view:
+                value.frombytes(view)
+            values.append(value)
+    finally:
+        memory.close()
+
+    svg = job['svg']
+    if job['slices'] is not None:
+        frames = svg.preparedFrames(job['nodes'], job['slices'], values[0], values[1], job['columns'], ps, job['engine'], job['chunk'])
+    else:
+        frames = svg.preparedKeyFrames(job['nodes'], values, job['columns'], ps, job['engine'], job['chunk'])
+
+    if '{' in job['output']:
+        for i, frame in enumerate(frames, first):
+            write(withDefinitions(frame, job['head']), job['output'].format(i + 1), job['precision'])
+        return []
+
+    serializer = Serializer(svg.getXmlns(), job['precision'])
+    nodes = [[] for _ in range(len(job['slices']) if job['slices'] is not None else 1)]
+    for frame in frames:
+        for strings, node in zip(nodes, frame.children):
+            strings.append(''.join(node.iterString(serializer)))
+
+    return nodes
+
+
+def parallel(args, svg, pairs, keyframes):
+    """
+    Prepare the interpolated nodes once, then interpolate frames in
+    worker processes, each one computing and serializing a range of
+    frames. Workers get the prepared nodes once, the start and end or
+    keyframes values through shared memory, and only their frames
+    factors by task. Single output nodes are written in the serial
+    order.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Command line arguments
+    svg : Svg
+        Start document
+    pairs : None|(Node, Node)[]
+        Interpolated pairs, see keys()
+    keyframes : None|str[]
+        Keyframes ids, see keys()
+    """
+    if pairs is not None:
+        nodes, slices, start, end, columns = svg.interpolationPairs(pairs, **options(args))
+        values = [start, end]
+        ps = Timing.factors(args.steps, args.timing)
+    else:
+        nodes, values, columns = svg.keyInterpolation(keyframes, **options(args))
+        slices = None
+        ps = svg.keyFactors(len(keyframes), args.steps, args.timing)
+
+    count, n = len(values), len(values[0])
+    memory = SharedMemory(create = True, size = max(1, 8 * n * count))
+    try:
+        for i, value in enumerate(values):
+            memory.buf[8 * n * i:8 * n * (i + 1)] = memoryview(value if type(value) == array else array('d', value)).cast('B')
+
+        state = {
+            'svg': svg.clone(),
+            'head': definitions(svg),
+            'nodes': nodes,
+            'slices': slices,
+            'columns': columns,
+            'memory': memory.name,
+            'shape': (count, n),
+            'engine': Engine.get(args.engine).name,
+            'chunk': args.chunk,
+            'output': args.output,
+            'precision': args.precision,
+        }
+        size = -(-len(ps) // args.workers)
+        firsts = range(0, len(ps), size)
+        with ProcessPoolExecutor(len(firsts), initializer = setup, initargs = (state,)) as pool:
+            shards = list(pool.map(render, firsts, [ps[i:i + size] for i in firsts]))
+    finally:
+        memory.close()
+        memory.unlink()
+
+    if '{' not in args.output:
+        # Steps of each pair follow each other, as in Svg.interpolateMany()
+        nodes = (node for i in range(len(shards[0])) for shard in shards for node in shard[i])
+        write(svg.clone(), args.output, args.precision, chain(definitions(svg), nodes))
+
+
+def main(argv = None):
+    """
+    Run the command line
+
+    Parameters
+    ----------
+    argv : None|str[]
+        Command line arguments, default to sys.argv
+    """
+    arguments = parser()
+    args = arguments.parse_args(argv)
+    if args.steps < 1:
+        arguments.error('argument -n/--steps: must be at least 1')
+    if args.chunk < 1:
+        arguments.error('argument --chunk: must be at least 1')
+    if '{' in args.output:
+        try:
+            args.output.format(1)
+        except (IndexError, KeyError, ValueError):
+            arguments.error(f'argument -o/--output: invalid frame file pattern "{args.output}"')
+
+    if args.stats or args.profile:
+        instrumentation.enable(profile = args.profile)
+        instrumentation.startProfile()
+
+    try:
+        svg, pairs, keyframes = keys(args)
+        count = args.steps if pairs is not None else args.steps * (len(keyframes) - 1)
+        if args.workers > 1 and count > 1:
+            parallel(args, svg, pairs, keyframes)
+            return 0
+
+        head = definitions(svg)
+        if '{' not in args.output:
+            if pairs is not None:
+                result = svg.interpolateMany(pairs, args.steps, timing = args.timing, **options(args))
+            else:
+                result = svg.interpolateKeys(keyframes, args.steps, timing = args.timing, **options(args))
+            write(withDefinitions(result, head), args.output, args.precision)
+            return 0
+
+        # Frames are computed by chunks and written as they come
+        if pairs is not None:
+            frames = svg.frames(pairs, args.steps, chunk = args.chunk, timing = args.timing, **options(args))
+        else:
+            frames = svg.keyFrames(keyframes, args.steps, chunk = args.chunk, timing = args.timing, **options(args))
+        for i, frame in enumerate(frames):
+            write(withDefinitions(frame, head), args.output.format(i + 1), args.precision)
+    except (RuntimeError, OSError) as e:
+        print(f'error: {e}', file = sys.stderr)
+        return 1
+    finally:
+        if instrumentation.enabled:
+            instrumentation.disable()
+            if args.stats:
+                print(instrumentation.report(), file = sys.stderr)
+            if args.profile:
+                print(instrumentation.profileStats(), file = sys.stderr)
+            instrumentation.reset()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
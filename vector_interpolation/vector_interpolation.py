@@ -1,91 +1,257 @@
-from krita import *
-from PyQt5.QtWidgets import QWidget, QAction, QMessageBox
-
-from .Svg import Svg
-from .Ui import ErrorDialog, InterpolationDialog
-
-class VectorInterpolation(Extension):
-    messages = {
-        'fr_FR': {
-            'Generate shape interpolation': 'Générer les formes vectorielles interpolées',
-            'created interpolation': 'interpolation créé',
-            'created interpolations': 'interpolations créés',
-            'Please select two vector shapes.': 'Veuillez sélectionner exactement 2 formes vectrorielles.',
-            'Current layer is not a vector layer.': 'Le calque selectionné n\'est pas un calque vectoriel.',
-            'Cannot find krita current document.': 'Impossible de charger le document courant.',
-            'Cannot interpolate a different transform operation': 'Impossible d\'interpoler 2 opération "transform" différentes.',
-            'Interpolation can only manage a maximum of one transform' : 'L\'interpolation ne gère qu\'un maximum d\'une opération "transform".',
-            'Node not compatible with node for interpolation': 'Formes incompatibles pour l\'interpolation.',
-        }
-    }
-
-
-    """Vector interpolation extension"""
-    def __init__(self, parent):
-        """Initialize extension"""
-        super().__init__(parent)
-
-    # called after setup(self)
-    def createActions(self, window):
-        """Create extension actions"""
-        action = window.createAction("vector_interpolation.interpolate", self.trans('Generate shape interpolation'))
-        action.triggered.connect(self.vector_interpolation)
-        pass
-
-    # Krita.instance() exists, so do any setup work
-    def setup(self):
-        """Setup extension"""
-        pass
-
-    def trans(self, msg):
-        locale = QLocale().name()
-
-        try:
-            messages = self.messages[locale]
-            return messages[msg]
-        except KeyError:
-            return msg
-
-    def vector_interpolation(self):
-        # Get Krita instance and document
-        app = Krita.instance()
-        doc = app.activeDocument()
-
-        # Check the document contains a vector layer
-        try :
-            if doc:
-                layer = doc.activeNode()
-
-                if layer.type() == "vectorlayer":
-                    # Get the Svg object for the layer
-                    svg = Svg(layer.toSvg())
-
-                    # Get selected shapes
-                    # We add one to the result index as layer.toSvg() return a <deps /> node not present in layer.shapes() 
-                    selected_shapes = [[s + 1, shape] for s, shape in enumerate(layer.shapes()) if shape.isSelected()]
-
-                    # Check 2 shapes are selected
-                    if len(selected_shapes) == 2:
-                        dialog = InterpolationDialog()
-                        if dialog.exec_():
-                            steps = dialog.get_steps()
-                            print(f"Interpolation steps: {steps}")
-                            # Interpolate paths
-                            interpolated = svg.interpolate(selected_shapes[0][0], selected_shapes[1][0], steps)
-
-                            # Add & select generated svg into layer
-                            shapes = layer.addShapesFromSvg(interpolated.toString())
-                            selected_shapes[0][1].deselect()
-                            selected_shapes[1][1].deselect()
-                            for shape in shapes:
-                                shape.select()
-
-                            print(f"{len(shapes)} {self.trans('interpolation created' if len(shapes) < 2 else 'interpolations created')}")
-                    else:
-                        ErrorDialog("Please select two vector shapes.").exec_()
-                else:
-                    ErrorDialog("Current layer is not a vector layer.").exec_()
-            else:
-                ErrorDialog("Cannot find krita current document.").exec_()
-        except RuntimeError:
+from krita import *
+from PyQt5.QtCore import Qt, QThread, pyqtSlot
+from PyQt5.QtWidgets import QWidget, QAction, QMessageBox, QProgressDialog
+
+import logging
+import os
+
+from .Svg import Svg, instrumentation
+from .Ui import ErrorDialog, InterpolationDialog
+from .Worker import InterpolationWorker
+
+logger = logging.getLogger(__name__)
+
+class VectorInterpolation(Extension):
+    messages = {
+        'fr_FR': {
+            'Generate shape interpolation': 'Générer les formes vectorielles interpolées',
+            'created interpolation': 'interpolation créé',
+            'created interpolations': 'interpolations créés',
+            'Please select at least two vector shapes.': 'Veuillez sélectionner au moins 2 formes vectorielles.',
+            'Current layer is not a vector layer.': 'Le calque selectionné n\'est pas un calque vectoriel.',
+            'Cannot find krita current document.': 'Impossible de charger le document courant.',
+            'Cannot interpolate a different transform operation': 'Impossible d\'interpoler 2 opération "transform" différentes.',
+            'Interpolation can only manage a maximum of one transform' : 'L\'interpolation ne gère qu\'un maximum d\'une opération "transform".',
+            'Node not compatible with node for interpolation': 'Formes incompatibles pour l\'interpolation.',
+            'Interpolating shapes...': 'Interpolation des formes...',
+            'Cancel': 'Annuler',
+        }
+    }
+
+
+    """Vector interpolation extension"""
+    def __init__(self, parent):
+        """Initialize extension"""
+        super().__init__(parent)
+
+        # Running interpolation job
+        self.job = None
+
+    # called after setup(self)
+    def createActions(self, window):
+        """Create extension actions"""
+        action = window.createAction("vector_interpolation.interpolate", self.trans('Generate shape interpolation'))
+        action.triggered.connect(self.vector_interpolation)
+        pass
+
+    # Krita.instance() exists, so do any setup work
+    def setup(self):
+        """
+        Setup extension. Phase timings are logged if the
+        VECTOR_INTERPOLATION_INSTRUMENTATION environment variable is
+        set, with a cProfile profile if it is "profile".
+        """
+        mode = os.environ.get('VECTOR_INTERPOLATION_INSTRUMENTATION')
+        if mode:
+            instrumentation.enable(profile = mode == 'profile')
+            logger.setLevel(logging.INFO)
+            if not logger.handlers:
+                logger.addHandler(logging.StreamHandler())
+
+    def log_instrumentation(self):
+        """Log and reset the recorded phase timings and counters"""
+        if not instrumentation.enabled:
+            return
+
+        logger.info("Interpolation phases:\n%s", instrumentation.report())
+        stats = instrumentation.profileStats()
+        if stats:
+            logger.info("Interpolation profile:\n%s", stats)
+        instrumentation.reset()
+
+    def trans(self, msg):
+        locale = QLocale().name()
+
+        try:
+            messages = self.messages[locale]
+            return messages[msg]
+        except KeyError:
+            return msg
+
+    def selected_svg(self, doc, layer, shapes):
+        """
+        Get the Svg object of the selected shapes and their nodes
+        positions. Nodes are created when interpolated.
+
+        Only the selected shapes are serialized and parsed. Fallback to
+        the whole layer svg if the shapes svg cannot be parsed.
+        """
+        # Page size in pt, as written by layer.toSvg()
+        width = doc.width() * 72.0 / doc.xRes()
+        height = doc.height() * 72.0 / doc.yRes()
+
+        try:
+            with instrumentation.phase('toSvg'):
+                shapes_svg = [shape.toSvg() for shape in shapes]
+            svg = Svg.fromShapes(shapes_svg, {
+                'width': f'{width:g}pt',
+                'height': f'{height:g}pt',
+                'viewBox': f'0 0 {width:g} {height:g}',
+            })
+            if len(svg.children) == len(shapes):
+                return svg, list(range(len(shapes)))
+        except RuntimeError:
+            pass
+
+        # We add one to the result index as layer.toSvg() return a <deps /> node not present in layer.shapes()
+        with instrumentation.phase('toSvg'):
+            layer_svg = layer.toSvg()
+        svg = Svg(layer_svg)
+        indexes = [s + 1 for s, shape in enumerate(layer.shapes()) if shape.isSelected()]
+
+        return svg, indexes
+
+    def add_frame_layers(self, doc, layer, frames):
+        """
+        Add each frame svg string into a new vector layer, above the
+        given layer and the previous frame layer.
+        """
+        layers = []
+        above = layer
+        for i, frame_svg in enumerate(frames):
+            frame_layer = doc.createVectorLayer(f"{layer.name()} {i + 1}")
+            layer.parentNode().addChildNode(frame_layer, above)
+            with instrumentation.phase('addShapesFromSvg'):
+                frame_layer.addShapesFromSvg(frame_svg)
+            layers.append(frame_layer)
+            above = frame_layer
+
+        return layers
+
+    def start_job(self, doc, layer, selected_shapes, worker):
+        """
+        Run an interpolation worker in a new thread, with a progress
+        dialog to cancel it. The dialog shows a busy indicator until
+        the nodes are prepared. The result is added into the document
+        when the worker is finished.
+        """
+        progress = QProgressDialog(self.trans('Interpolating shapes...'), self.trans('Cancel'), 0, 0, Krita.instance().activeWindow().qwindow())
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+
+        thread = QThread()
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.prepared.connect(self.job_prepared)
+        worker.progress.connect(progress.setValue)
+        progress.canceled.connect(thread.requestInterruption)
+        worker.finished.connect(self.job_finished)
+        worker.failed.connect(self.job_failed)
+        worker.canceled.connect(self.job_canceled)
+
+        self.job = {
+            'doc': doc,
+            'layer': layer,
+            'selected_shapes': selected_shapes,
+            'worker': worker,
+            'thread': thread,
+            'progress': progress,
+        }
+        thread.start()
+
+    def end_job(self):
+        """Stop the job thread and close its progress dialog"""
+        job = self.job
+        self.job = None
+
+        job['progress'].close()
+        job['thread'].quit()
+        job['thread'].wait()
+
+        return job
+
+    @pyqtSlot()
+    def job_prepared(self):
+        """Switch the progress dialog from busy to steps progress"""
+        if self.job:
+            self.job['progress'].setMaximum(self.job['worker'].total)
+
+    @pyqtSlot(list)
+    def job_finished(self, result):
+        """Add the interpolation svg strings into the document"""
+        job = self.end_job()
+        layer = job['layer']
+
+        if job['worker'].split:
+            # Add each step into a new layer
+            layers = self.add_frame_layers(job['doc'], layer, result)
+            logger.info("%d %s", len(layers), self.trans('interpolation created' if len(layers) < 2 else 'interpolations created'))
+        else:
+            # Add & select generated svg into layer
+            with instrumentation.phase('addShapesFromSvg'):
+                shapes = layer.addShapesFromSvg(result[0])
+            for shape in job['selected_shapes']:
+                shape.deselect()
+            for shape in shapes:
+                shape.select()
+
+            logger.info("%d %s", len(shapes), self.trans('interpolation created' if len(shapes) < 2 else 'interpolations created'))
+
+        self.log_instrumentation()
+
+    @pyqtSlot(str)
+    def job_failed(self, msg):
+        """Show the interpolation error"""
+        self.end_job()
+        self.log_instrumentation()
+        ErrorDialog(self.trans(msg)).exec_()
+
+    @pyqtSlot()
+    def job_canceled(self):
+        """Drop the canceled interpolation"""
+        self.end_job()
+        self.log_instrumentation()
+        logger.info("Interpolation canceled")
+
+    def vector_interpolation(self):
+        # Get Krita instance and document
+        app = Krita.instance()
+        doc = app.activeDocument()
+
+        # Wait for the running interpolation
+        if self.job:
+            return
+
+        # Check the document contains a vector layer
+        try :
+            if doc:
+                layer = doc.activeNode()
+
+                if layer.type() == "vectorlayer":
+                    # Get selected shapes
+                    selected_shapes = [shape for shape in layer.shapes() if shape.isSelected()]
+
+                    # Check at least 2 shapes are selected
+                    if len(selected_shapes) >= 2:
+                        dialog = InterpolationDialog()
+                        if dialog.exec_():
+                            steps = dialog.get_steps()
+                            align = dialog.get_align()
+                            timing = dialog.get_timing()
+                            logger.info("Interpolation steps: %d", steps)
+
+                            # Get the Svg object for the selected shapes only
+                            svg, nodes = self.selected_svg(doc, layer, selected_shapes)
+
+                            # Interpolate shapes in a worker thread, through keyframes shapes if more than 2
+                            self.start_job(doc, layer, selected_shapes, InterpolationWorker(
+                                svg, nodes, steps, dialog.get_frames(), timing = timing, align = align
+                            ))
+                    else:
+                        ErrorDialog(self.trans("Please select at least two vector shapes.")).exec_()
+                else:
+                    ErrorDialog("Current layer is not a vector layer.").exec_()
+            else:
+                ErrorDialog("Cannot find krita current document.").exec_()
+        except RuntimeError:
             ErrorDialog("An error occured").exec_()
\ No newline at end of file